@@ -1,46 +1,95 @@
-import multiprocessing
-import matplotlib.pyplot as plt
 from collections import Counter
-from app import PokerGame, HAND_RANKS
+from poker import Table, Player, HAND_RANKS
 import time
-from tqdm import tqdm
 from datetime import datetime
 import os
+from simulation import (chunk_rng, checkpoint_path, new_seed, run_job, serve_job, shared_authkey, coordinator_ready,
+                        parse_address)
 
-def run_single_round(game_id):
-    start_time = time.time()
-    game = PokerGame()
-    game.create_deck()
-    game.deal_cards(5)
-    game.deal_community_cards()
-    winner, winning_hand, hand_evaluation = game.determine_winner()
-    end_time = time.time()
-    run_time = end_time - start_time
-    return winner, hand_evaluation, run_time
-
-def main():
-    num_rounds = 350  # Adjust the number of rounds as needed
-    num_processes = 12  # Adjust this number based on your system's capability
-    num_players = 5  # Number of players in the game
-
-    date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    stats_folder = "Statistics"
-    date_player_folder = os.path.join(stats_folder, f"{date_str}_{num_players}players")
+# matplotlib and tqdm are imported in main() only, so pool workers import nothing beyond the poker package
+# and the simulation driver
 
-    # Create directories if they don't exist
-    os.makedirs(stats_folder, exist_ok=True)
-    os.makedirs(date_player_folder, exist_ok=True)
 
-    with multiprocessing.Pool(processes=num_processes) as pool:
-        # Use tqdm to display a progress bar
-        results = list(tqdm(pool.imap(run_single_round, range(num_rounds)), total=num_rounds))
+def new_table(num_players):
+    table = Table(name="Simulation", max_players=max(num_players, 2), min_buy_in=1, max_buy_in=1000)
+    for seat in range(num_players):
+        player = Player(name=f"Player {seat + 1}", bankroll=1000)
+        player.join_table(table)
+        player.sit_down(table, seat, 100)
+    return table
 
-    win_counts = Counter([result[0] for result in results])
-    hand_type_counts = Counter([result[1][0] for result in results])
-    run_times = [result[2] for result in results]
-    average_run_time = sum(run_times) / len(run_times)
+def check_down(table):
+    # Simulated hands are not bet: everyone checks so the next street can be dealt
+    while table.to_act is not None:
+        table.player_action(table.seats[table.to_act].name, 'check')
 
-    # Plotting the distribution of wins between the 3 players
+def run_single_round(game_id, num_players=5, rng=None):
+    start_time = time.time()
+    table = new_table(num_players)
+    table.create_deck(rng)
+    table.deal_cards(num_players)
+    for deal in (table.deal_flop, table.deal_turn, table.deal_river):
+        check_down(table)
+        deal()
+    check_down(table)
+    result = table.showdown()
+    players = table.active_players
+    table.close()  # Every round is a throwaway table: hand its ledger accounts back
+    for player in players:
+        player.close()
+    winner = result.winners[0].name if len(result.winners) == 1 else "Tie"
+    end_time = time.time()
+    run_time = end_time - start_time
+    return winner, result.category, run_time
+
+class HandsJob:
+    # Seeded, chunked rounds for simulation.run_job; the aggregate holds win and hand-type counters
+    def __init__(self, seed, chunk_size, num_players=5):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.num_players = num_players
+        self.name = f"hands{num_players}p"
+
+    def empty(self):
+        return {'winners': Counter(), 'categories': Counter(), 'run_time': 0.0}
+
+    def run_chunk(self, chunk):
+        rng = chunk_rng(self.seed, chunk)
+        part = self.empty()
+        for _ in range(self.chunk_size):
+            winner, category, run_time = run_single_round(None, self.num_players, rng)
+            part['winners'][winner] += 1
+            part['categories'][category] += 1
+            part['run_time'] += run_time
+        return part
+
+    def merge(self, total, part):
+        total['winners'].update(part['winners'])
+        total['categories'].update(part['categories'])
+        total['run_time'] += part['run_time']
+        return total
+
+    def to_arrays(self, total):
+        import numpy as np
+        names = sorted(total['winners'])
+        return {
+            'winner_names': np.array(names, dtype=str),
+            'winner_counts': np.array([total['winners'][name] for name in names], dtype=np.int64),
+            'categories': np.array([total['categories'][category] for category in range(11)], dtype=np.int64),
+            'run_time': np.array([total['run_time']]),
+        }
+
+    def from_arrays(self, arrays):
+        categories = {category: int(count) for category, count in enumerate(arrays['categories'].tolist()) if count}
+        return {
+            'winners': Counter(dict(zip(arrays['winner_names'].tolist(), arrays['winner_counts'].tolist()))),
+            'categories': Counter(categories),
+            'run_time': float(arrays['run_time'][0]),
+        }
+
+def plot_wins(win_counts, num_rounds, path):
+    import matplotlib.pyplot as plt
+    # Plotting the distribution of wins between the players
     plt.figure(figsize=(10, 5))
     players = list(win_counts.keys())
     win_values = list(win_counts.values())
@@ -54,13 +103,11 @@ def main():
     for i, v in enumerate(win_values):
         plt.text(i, v + 1, win_percentages[i], ha='center')
 
-    wins_filename = f"wins_distribution_{date_str}_{num_players}players_{num_rounds}rounds.png"
-
-    plt.savefig(os.path.join(date_player_folder, wins_filename))
+    plt.savefig(path)
     plt.close()
 
-    # Sorting hand types by their counts
-    sorted_hand_types = sorted(hand_type_counts.items(), key=lambda item: item[1], reverse=True)
+def plot_hand_types(sorted_hand_types, num_rounds, path):
+    import matplotlib.pyplot as plt
     sorted_hand_keys = [item[0] for item in sorted_hand_types]
     sorted_hand_values = [item[1] for item in sorted_hand_types]
     sorted_hand_percentages = [f'{v}/{num_rounds} ({(v/num_rounds)*100:.4f}%)' for v in sorted_hand_values]
@@ -78,24 +125,82 @@ def main():
     for i, v in enumerate(hand_type_values):
         plt.text(i, v + 1, sorted_hand_percentages[i], ha='center')
 
-    hands_filename = f"hand_distribution_{date_str}_{num_players}players_{num_rounds}rounds.png"
-
-    plt.savefig(os.path.join(date_player_folder, hands_filename))
+    plt.savefig(path)
     plt.close()
 
+def plot_hand_pie(sorted_hand_types, num_rounds, path):
+    import matplotlib.pyplot as plt
     # Plotting the pie chart of total hands won from each type
     plt.figure(figsize=(10, 5))
     pie_labels = [f'{HAND_RANKS[hand]}: {count}/{num_rounds} ({(count/num_rounds)*100:.1f}%)' for hand, count in sorted_hand_types]
-    plt.pie(hand_type_values, labels=pie_labels, autopct='%1.1f%%', startangle=140)
+    plt.pie([count for _, count in sorted_hand_types], labels=pie_labels, autopct='%1.1f%%', startangle=140)
     plt.title('Pie Chart of Winning Hand Types')
 
-    pie_filename = f"pie_chart_{date_str}_{num_players}players_{num_rounds}rounds.png"
-
-    plt.savefig(os.path.join(date_player_folder, pie_filename))
+    plt.savefig(path)
     plt.close()
 
+def main(num_rounds=350, num_processes=12, num_players=5, render=True, seed=None, chunk_size=50,
+         checkpoint_every=30.0, serve=None):
+    date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    stats_folder = "Statistics"
+    date_player_folder = os.path.join(stats_folder, f"{date_str}_{num_players}players")
+
+    # Create directories if they don't exist
+    os.makedirs(stats_folder, exist_ok=True)
+    os.makedirs(date_player_folder, exist_ok=True)
+
+    from tqdm import tqdm
+
+    num_chunks = -(-num_rounds // chunk_size)
+    num_rounds = num_chunks * chunk_size
+    # Imported by module name so the job pickles as MultiRunHands.HandsJob for workers, not __main__
+    import MultiRunHands
+    job = MultiRunHands.HandsJob(seed if seed is not None else new_seed(), chunk_size, num_players)
+    path = checkpoint_path(job, num_chunks, os.path.join(stats_folder, 'checkpoints'))
+    print(f"Seed {job.seed}, checkpoint {path}")
+
+    # Use tqdm to display a progress bar
+    progress_bar = tqdm(total=num_chunks, unit="chunk")
+    def progress(done):
+        progress_bar.update(done - progress_bar.n)
+    if serve:
+        total = serve_job(job, num_chunks, parse_address(serve), shared_authkey(), path, checkpoint_every,
+                          progress=progress, ready=coordinator_ready)
+    else:
+        total = run_job(job, num_chunks, path, checkpoint_every, num_processes, progress)
+    progress_bar.close()
+
+    win_counts = Counter(dict(sorted(total['winners'].items())))
+    hand_type_counts = total['categories']
+    average_run_time = total['run_time'] / num_rounds
+
+    # Sorting hand types by their counts
+    sorted_hand_types = sorted(hand_type_counts.items(), key=lambda item: item[1], reverse=True)
+
+    if render:
+        from reporting import render_all
+        suffix = f"{date_str}_{num_players}players_{num_rounds}rounds.png"
+        render_all([
+            (plot_wins, (win_counts, num_rounds, os.path.join(date_player_folder, f"wins_distribution_{suffix}"))),
+            (plot_hand_types, (sorted_hand_types, num_rounds,
+                               os.path.join(date_player_folder, f"hand_distribution_{suffix}"))),
+            (plot_hand_pie, (sorted_hand_types, num_rounds, os.path.join(date_player_folder, f"pie_chart_{suffix}"))),
+        ], num_processes)
+
     # Print average run time
     print(f'Average time per single run: {average_run_time:.6f} seconds')
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulate showdowns and chart the winners")
+    parser.add_argument('--rounds', type=int, default=350)
+    parser.add_argument('--processes', type=int, default=12)
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--no-render', action='store_true', help="skip the charts (headless benchmark runs)")
+    parser.add_argument('--seed', type=int, default=None, help="rerun with the printed seed to resume a run")
+    parser.add_argument('--chunk-size', type=int, default=50, help="rounds per chunk")
+    parser.add_argument('--checkpoint-every', type=float, default=30.0, help="seconds between checkpoints")
+    parser.add_argument('--serve', metavar='HOST:PORT', help="hand chunks to remote workers instead of local processes")
+    args = parser.parse_args()
+    main(args.rounds, args.processes, args.players, not args.no_render, args.seed, args.chunk_size,
+         args.checkpoint_every, args.serve)
@@ -1,98 +1,151 @@
 import secrets
 import time
 import os
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-import seaborn as sns
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from tqdm import tqdm  # Import tqdm for progress bar
-from scipy.stats import chisquare, kstest, rankdata
-from statsmodels.sandbox.stats.runs import runstest_1samp
-import threading
+import numpy as np
+from simulation import (chunk_rng, checkpoint_path, new_seed, run_job, serve_job, shared_authkey,
+                        coordinator_ready, parse_address)
+
+# Plotting and statistics packages are imported inside the functions that use them, so the simulation
+# itself starts without paying for matplotlib, seaborn, scipy and statsmodels
 
 RANKS = '23456789TJQKA'
 SUITS = 'HDCS'
+CARDS = [rank + suit for rank in RANKS for suit in SUITS]
+CARD_INDEX = {card: i for i, card in enumerate(CARDS)}
+# Every statistic works on one int64 matrix: row = card (CARDS order), column = position 1-52 (column 0 unused)
+POSITION_COLUMNS = np.arange(1, 53)
+
+
+def new_position_matrix():
+    return np.zeros((52, 53), dtype=np.int64)
 
 
 class Deck:
-    def create_deck(self):
+    def create_deck(self, rng=None):
         deck = [rank + suit for rank in RANKS for suit in SUITS]
        #seed = secrets.randbits(64) ^ int(time.time() * 1000000) ^ os.getpid()
         #seed = secrets.randbits(64) ^ int(time.time() * 1000000) ^ os.getpid()
-        rng = secrets.SystemRandom()#seed)
+        if rng is None:
+            rng = secrets.SystemRandom()#seed)
         rng.shuffle(deck)
         return deck
 
 
 def run_simulation(deck_instance, num_simulations, progress_bar, lock):
-    card_positions = {card: [0] * 53 for card in [rank + suit for rank in RANKS for suit in SUITS]}
-    
+    card_positions = new_position_matrix()
+
     for _ in range(num_simulations):
         deck = deck_instance.create_deck()
-        for position, card in enumerate(deck):
-            card_positions[card][position + 1] += 1
-        
+        # Each card appears once per deck, so one fancy-indexed add counts the whole deck
+        card_positions[[CARD_INDEX[card] for card in deck], POSITION_COLUMNS] += 1
+
         with lock:
             progress_bar.update(1)
-    
-    return card_positions
 
+    return card_positions
 
 
 def merge_results(results):
-    merged_positions = {card: [0] * 53 for card in [rank + suit for rank in RANKS for suit in SUITS]}
-    for result in tqdm(results, desc="Merging results"):
-        for card, positions in result.items():
-            merged_positions[card] = [sum(x) for x in zip(merged_positions[card], positions)]
+    merged_positions = new_position_matrix()
+    for result in results:
+        merged_positions += result
     return merged_positions
 
 
+class ShuffleJob:
+    # Seeded, chunked version of run_simulation for simulation.run_job. Each chunk shuffles with its own
+    # random.Random stream, which runs the same Fisher-Yates shuffle as SystemRandom, only reproducibly.
+    name = 'shuffle'
+
+    def __init__(self, seed, chunk_size):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.deck = Deck()
+
+    def empty(self):
+        return new_position_matrix()
+
+    def run_chunk(self, chunk):
+        card_positions = new_position_matrix()
+        rng = chunk_rng(self.seed, chunk)
+        for _ in range(self.chunk_size):
+            deck = self.deck.create_deck(rng)
+            card_positions[[CARD_INDEX[card] for card in deck], POSITION_COLUMNS] += 1
+        return card_positions
+
+    def merge(self, total, part):
+        total += part
+        return total
+
+    def to_arrays(self, total):
+        return {'positions': total}
+
+    def from_arrays(self, arrays):
+        return arrays['positions']
+
+
+def position_moments(card_positions):
+    # Per-card mean and variance of the position (1-52), weighted by how often the card landed there
+    counts = card_positions[:, 1:]
+    totals = counts.sum(axis=1)
+    means = counts @ POSITION_COLUMNS / totals
+    variances = counts @ (POSITION_COLUMNS ** 2) / totals - means ** 2
+    return means, variances
+
+
 def plot_distribution(card_positions, output_dir, cards_per_page=16):
-    cards = list(card_positions.keys())
+    import matplotlib.pyplot as plt
+    cards = CARDS
     num_pages = (len(cards) + cards_per_page - 1) // cards_per_page
+    positions = range(1, 53)
+
+    # One figure for every page: the bars are drawn once and only their heights and titles change per page
+    fig, axs = plt.subplots(cards_per_page // 4, 4, figsize=(20, 10), constrained_layout=True)
+    containers = []
+    for ax in axs.flat:
+        containers.append(ax.bar(positions, [0] * 52))
+        ax.set_xlabel('Position')
+        ax.set_ylabel('Frequency')
+        ax.set_xlim(1, 52)
 
     for page in range(num_pages):
-        fig, axs = plt.subplots(cards_per_page // 4, 4, figsize=(20, 10), constrained_layout=True)
         fig.suptitle(f'Distribution of Each Card Over All 52 Positions (Page {page + 1})', fontsize=16)
-
-        start_idx = page * cards_per_page
-        end_idx = min(start_idx + cards_per_page, len(cards))
-
-        for i, card in enumerate(cards[start_idx:end_idx]):
-            ax = axs[i // 4, i % 4]
-            ax.bar(range(1, 53), card_positions[card][1:])  # Skip the 0th position
-            ax.set_title(card)
-            ax.set_xlabel('Position')
-            ax.set_ylabel('Frequency')
-            ax.set_xlim(1, 52)
-
-        plt.savefig(os.path.join(output_dir, f'card_distribution_page_{page + 1}.png'))
-        plt.close(fig)
+        page_cards = cards[page * cards_per_page:(page + 1) * cards_per_page]
+        for i, (ax, container) in enumerate(zip(axs.flat, containers)):
+            ax.set_visible(i < len(page_cards))
+            if i >= len(page_cards):
+                continue
+            counts = card_positions[page * cards_per_page + i, 1:]  # Skip the 0th position
+            for rect, count in zip(container, counts.tolist()):
+                rect.set_height(count)
+            ax.set_ylim(0, max(counts.max(), 1) * 1.05)
+            ax.set_title(page_cards[i])
+
+        fig.savefig(os.path.join(output_dir, f'card_distribution_page_{page + 1}.png'))
+    plt.close(fig)
 
 
 def save_avg_location_to_csv(card_positions, filename):
-    df = pd.DataFrame(card_positions).iloc[1:]  # Skip the 0th position
-    avg_locations = df.apply(lambda x: np.average(range(1, 53), weights=x), axis=0) - 0.5  # Correctly calculate weighted average position
-    avg_locations = avg_locations.reset_index()
-    avg_locations.columns = ['Card', 'Avg Location']
-    avg_locations.to_csv(filename, index=False)
+    means, _ = position_moments(card_positions)
+    with open(filename, 'w') as f:
+        f.write("Card,Avg Location\n")
+        f.writelines(f"{card},{mean - 0.5}\n" for card, mean in zip(CARDS, means.tolist()))
 
 
 def plot_statistical_analysis(card_positions, output_dir):
-    df = pd.DataFrame(card_positions).iloc[1:]
-    means = df.apply(lambda x: np.average(range(1, 53), weights=x), axis=0)  # Correctly calculate weighted average position
-    std_devs = df.std(axis=0)
+    import matplotlib.pyplot as plt
+    means, variances = position_moments(card_positions)
+    std_devs = np.sqrt(variances)
 
     fig, axs = plt.subplots(2, 1, figsize=(15, 10), constrained_layout=True)
 
-    axs[0].bar(means.index.astype(str), means.values)
+    axs[0].bar(CARDS, means)
     axs[0].set_title('Mean Position of Each Card')
     axs[0].set_xlabel('Card')
     axs[0].set_ylabel('Mean Position')
 
-    axs[1].bar(std_devs.index.astype(str), std_devs.values)
+    axs[1].bar(CARDS, std_devs)
     axs[1].set_title('Standard Deviation of Each Card\'s Position')
     axs[1].set_xlabel('Card')
     axs[1].set_ylabel('Standard Deviation')
@@ -101,9 +154,8 @@ def plot_statistical_analysis(card_positions, output_dir):
     plt.close(fig)
 
 
-def plot_heatmap(card_positions, output_dir, num_simulations):
-    # Create a DataFrame skipping the 0th position
-    df = pd.DataFrame(card_positions).iloc[1:]
+def plot_heatmap(card_positions, output_dir, num_simulations, annotate=False):
+    import matplotlib.pyplot as plt
 
     if num_simulations < 10000:
         vmin = 0
@@ -116,9 +168,18 @@ def plot_heatmap(card_positions, output_dir, num_simulations):
         vmin = num_simulations / 59
         vmax = num_simulations / 45
 
+    matrix = card_positions[:, 1:].T  # Positions down, cards across; skip the 0th position
     plt.figure(figsize=(20, 15))
-    sns.heatmap(df, annot=True, fmt='d', cmap='coolwarm', cbar=True, xticklabels=df.columns, yticklabels=range(1, 53),
-                annot_kws={"size": 5},vmin=vmin, vmax=vmax)
+    if annotate:
+        # Writes all 2,704 counts into the cells; slow, mostly useful for small runs
+        import seaborn as sns
+        sns.heatmap(matrix, annot=True, fmt='d', cmap='coolwarm', cbar=True, xticklabels=CARDS,
+                    yticklabels=range(1, 53), annot_kws={"size": 5}, vmin=vmin, vmax=vmax)
+    else:
+        image = plt.imshow(matrix, aspect='auto', cmap='coolwarm', vmin=vmin, vmax=vmax, interpolation='nearest')
+        plt.colorbar(image)
+        plt.xticks(range(len(CARDS)), CARDS, rotation=90)
+        plt.yticks(range(52), range(1, 53))
     plt.title('Heatmap of Card Positions in the Deck')
     plt.xlabel('Card')
     plt.ylabel('Position in Deck')
@@ -127,7 +188,8 @@ def plot_heatmap(card_positions, output_dir, num_simulations):
 
 
 def chi_squared_test(card_positions, num_simulations):
-    observed_frequencies = np.array([card_positions[card][1:] for card in card_positions]).flatten()
+    from scipy.stats import chisquare
+    observed_frequencies = card_positions[:, 1:].flatten()
     expected_frequencies = np.full_like(observed_frequencies, num_simulations / 52)
     
     # Normalize observed frequencies to match the sum of expected frequencies
@@ -140,6 +202,7 @@ def chi_squared_test(card_positions, num_simulations):
 
 
 def runs_test(deck_instance, num_simulations):
+    from statsmodels.sandbox.stats.runs import runstest_1samp
     sequences = []
     for _ in range(num_simulations):
         deck = deck_instance.create_deck()
@@ -149,20 +212,33 @@ def runs_test(deck_instance, num_simulations):
     return z_stat, p_value
 
 
-def kolmogorov_smirnov_test(deck_instance, num_simulations):
-    positions = np.zeros((52, 52))
-    for _ in range(num_simulations):
-        deck = deck_instance.create_deck()
-        for position, card in enumerate(deck):
-            rank_index = RANKS.index(card[:-1])
-            positions[rank_index][position] += 1
-    cdf_values = np.cumsum(positions, axis=1) / num_simulations
+def kolmogorov_smirnov_test(card_positions):
+    from scipy.stats import kstest
+    # Empirical CDF of every card's position against the uniform one, straight from the shared matrix
+    counts = card_positions[:, 1:]
+    cdf_values = np.cumsum(counts, axis=1) / counts.sum(axis=1, keepdims=True)
     expected_cdf = np.linspace(1 / 52, 1, 52)
     ks_stat, p_value = kstest(cdf_values.flatten(), expected_cdf)
     return ks_stat, p_value
 
 
 if __name__ == "__main__":
+    import argparse
+    from tqdm import tqdm
+    from reporting import render_all
+
+    parser = argparse.ArgumentParser(description="Shuffle quality analysis")
+    parser.add_argument('--simulations', type=int, default=6000000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=None, help="rerun with the printed seed to resume a run")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="shuffles per chunk")
+    parser.add_argument('--checkpoint-every', type=float, default=30.0, help="seconds between checkpoints")
+    parser.add_argument('--serve', metavar='HOST:PORT', help="hand chunks to remote workers instead of local processes")
+    parser.add_argument('--no-render', action='store_true', help="skip every chart (headless benchmark runs)")
+    parser.add_argument('--annotate-heatmap', action='store_true', help="write the counts into the heatmap cells")
+    parser.add_argument('--render-processes', type=int, default=None)
+    args = parser.parse_args()
+
     start_time = time.time()  # Start time measurement
 
     base_output_dir = 'Statistics'
@@ -173,26 +249,32 @@ if __name__ == "__main__":
     os.makedirs(output_dir, exist_ok=True)
 
     deck_instance = Deck()
-    num_simulations = 6000000
-    num_threads = 12
-    simulations_per_thread = num_simulations // num_threads
-
-    lock = threading.Lock()
-    progress_bar = tqdm(total=num_simulations, desc="Running simulations")
-
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = [executor.submit(run_simulation, deck_instance, simulations_per_thread, progress_bar, lock) for _ in range(num_threads)]
-        results = [future.result() for future in futures]
-
+    num_chunks = -(-args.simulations // args.chunk_size)
+    num_simulations = num_chunks * args.chunk_size
+    # Imported by module name so the job pickles as Random_Shuffler_Sim.ShuffleJob for workers, not __main__
+    import Random_Shuffler_Sim
+    job = Random_Shuffler_Sim.ShuffleJob(args.seed if args.seed is not None else new_seed(), args.chunk_size)
+    path = checkpoint_path(job, num_chunks, os.path.join(base_output_dir, 'checkpoints'))
+    print(f"Seed {job.seed}, checkpoint {path}")
+
+    progress_bar = tqdm(total=num_chunks, desc="Running simulations", unit="chunk")
+    def progress(done):
+        progress_bar.update(done - progress_bar.n)
+    if args.serve:
+        card_positions = serve_job(job, num_chunks, parse_address(args.serve), shared_authkey(), path,
+                                   args.checkpoint_every, progress=progress, ready=coordinator_ready)
+    else:
+        card_positions = run_job(job, num_chunks, path, args.checkpoint_every, args.processes, progress)
     progress_bar.close()
 
-    card_positions = merge_results(results)
-
-    plot_distribution(card_positions, output_dir)
     save_avg_location_to_csv(card_positions, os.path.join(output_dir, 'avg_card_locations.csv'))
 
-    plot_statistical_analysis(card_positions, output_dir)
-    plot_heatmap(card_positions, output_dir, num_simulations)
+    if not args.no_render:
+        render_all([
+            (plot_distribution, (card_positions, output_dir)),
+            (plot_statistical_analysis, (card_positions, output_dir)),
+            (plot_heatmap, (card_positions, output_dir, num_simulations, args.annotate_heatmap)),
+        ], args.render_processes)
 
     # Chi-Squared Test
     chi2_stat, chi2_p_value = chi_squared_test(card_positions, num_simulations)
@@ -203,13 +285,13 @@ if __name__ == "__main__":
     print(f"Runs Test Z-Statistic: {runs_z_stat}, P-Value: {runs_p_value}")
 
     # Kolmogorov-Smirnov Test
-    ks_stat, ks_p_value = kolmogorov_smirnov_test(deck_instance, num_simulations)
+    ks_stat, ks_p_value = kolmogorov_smirnov_test(card_positions)
     print(f"Kolmogorov-Smirnov Statistic: {ks_stat}, P-Value: {ks_p_value}")
 
     # Checking the average positions
-    df = pd.DataFrame(card_positions).iloc[1:]
-    avg_locations = df.apply(lambda x: np.average(range(1, 53), weights=x) , axis=0)  - 0.5 # Adjust to 1-52 range
-    print("Average positions:\n", avg_locations)
+    avg_locations = position_moments(card_positions)[0] - 0.5  # Adjust to 1-52 range
+    print("Average positions:")
+    print("\n".join(f"{card:<4}{avg:.4f}" for card, avg in zip(CARDS, avg_locations.tolist())))
     print("Mean of averages:", avg_locations.mean())
 
     end_time = time.time()  # End time measurement
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from itertools import combinations
+
+from poker import (HOLDEM, OMAHA, Table, Player, RANKS, SUITS, OmahaBoardEvaluator, evaluate_strength, icm_equity,
+                   Auditor, Ledger)
+from poker.ledger import BUY_IN, COMMIT, DEPOSIT, HOUSE
+
+DECK = [rank + suit for rank in RANKS for suit in SUITS]
+DEFAULT_OUTPUT_DIR = os.path.join('Statistics', 'Benchmarks')
+
+
+def make_corpus(seed, size, cards):
+    rng = random.Random(seed)
+    return [rng.sample(DECK, cards) for _ in range(size)]
+
+
+def make_showdowns(seed, size, num_players, hole_cards=2):
+    rng = random.Random(seed)
+    showdowns = []
+    for _ in range(size):
+        cards = rng.sample(DECK, hole_cards * num_players + 5)
+        showdowns.append(([cards[hole_cards * i:hole_cards * (i + 1)] for i in range(num_players)], cards[-5:]))
+    return showdowns
+
+
+def showdown_table(num_players, game_type=HOLDEM):
+    table = Table(name=f"bench{num_players}", game_type=game_type, max_players=9, min_buy_in=1, max_buy_in=1000)
+    for seat in range(num_players):
+        player = Player(name=f"p{seat}", bankroll=1000)
+        player.join_table(table)
+        player.sit_down(table, seat, 100)
+    table.create_deck()
+    table.deal_cards(num_players)
+    return table
+
+
+def bench_determine_winner(num_players, showdowns, game_type=HOLDEM):
+    table = showdown_table(num_players, game_type)
+    seated = [table.seats[seat] for seat in range(num_players)]
+
+    def run():
+        for hands, board in showdowns:
+            for player, hand in zip(seated, hands):
+                player.hand = hand
+            table.community_cards = board
+            table.in_hand = table.seat_ring.copy()
+            table.determine_winner()
+    return run
+
+
+def audit_ledger(num_scopes):
+    # A private ledger holding num_scopes heads-up tables, each with its blinds in the pot
+    book = Ledger()
+    for i in range(num_scopes):
+        scope = book.open_scope(f"bench{i}")
+        pot = book.open_account(scope)
+        for blind in (10, 20):
+            bankroll = book.open_account()
+            stack = book.open_account(scope)
+            book.transfer(HOUSE, bankroll, 200, DEPOSIT)
+            book.transfer(bankroll, stack, 200, BUY_IN)
+            book.transfer(stack, pot, blind, COMMIT)
+    return book
+
+
+def build_cases(seed, size):
+    reference = Table(name="reference")
+    five = make_corpus(seed, size, 5)
+    seven = make_corpus(seed + 1, size, 7)
+    holdem = [(cards[:2], cards[2:]) for cards in seven]
+
+    def best_hand_run():
+        for hand, board in holdem:
+            reference.community_cards = board
+            reference.best_hand(hand)
+
+    cases = {
+        'evaluate_hand_5': (size, lambda: [reference.evaluate_hand(hand) for hand in five]),
+        'evaluate_strength_5': (size, lambda: [evaluate_strength(hand) for hand in five]),
+        'evaluate_strength_7': (size, lambda: [evaluate_strength(hand) for hand in seven]),
+        'best_hand_7': (size, best_hand_run),
+    }
+    for num_players in range(2, 10):
+        showdowns = make_showdowns(seed + num_players, max(size // num_players, 1), num_players)
+        cases[f'determine_winner_{num_players}p'] = (len(showdowns), bench_determine_winner(num_players, showdowns))
+
+    # Omaha against hold'em: the 2+3 evaluator against scoring all 60 two-plus-three hands, and full showdowns
+    omaha = make_showdowns(seed + 20, size, 1, hole_cards=4)
+
+    def omaha_naive_run():
+        for (hole,), board in omaha:
+            max(evaluate_strength(list(pair) + list(triple))
+                for pair in combinations(hole, 2) for triple in combinations(board, 3))
+    cases['omaha_strength_naive'] = (size, omaha_naive_run)
+    cases['omaha_strength'] = (size, lambda: [OmahaBoardEvaluator(board).strength(hole) for (hole,), board in omaha])
+    for num_players in (2, 6, 9):
+        showdowns = make_showdowns(seed + 20 + num_players, max(size // num_players, 1), num_players, hole_cards=4)
+        cases[f'determine_winner_omaha_{num_players}p'] = (len(showdowns),
+                                                            bench_determine_winner(num_players, showdowns, OMAHA))
+    final_table = [51000, 38000, 27500, 22000, 15000, 12000, 8000, 4500, 2000]
+    cases['icm_final_table_9p'] = (1, lambda: icm_equity(final_table, [1000, 650, 450, 330, 250, 190, 150, 120, 100]))
+    cases['ledger_audit_50k_scopes'] = (1, Auditor(audit_ledger(50000)).audit)
+    try:
+        import numpy as np
+        from headless_engine import evaluate_strength_batch
+    except ImportError:
+        pass
+    else:
+        batch = np.array([[DECK.index(card) for card in hand] for hand in seven], dtype=np.uint8)
+        cases['evaluate_strength_batch_7'] = (size, lambda: evaluate_strength_batch(batch))
+        from equity import equity
+        # Three weighted ranges preflop, sampled: the first has too many assignments to enumerate, the second
+        # few enough per runout but not across 5,000 runouts; the target is well under a second per call
+        cases['equity_3way_ranges'] = (2, lambda: (equity(["QQ+,AKs", "76s:0.5,88-TT", "A2s+,KTo+"], seed=seed),
+                                                   equity(["QQ+,AKs", "JJ-88,AQs", "76s:0.5,KQo"], seed=seed)))
+    return cases
+
+
+def measure(run, operations, repeats, min_time=0.1):
+    # Calibrate the loop count so each sample lasts at least min_time, then keep the median of the samples
+    loops = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            run()
+        timings.append((time.perf_counter() - start_time) / loops)
+    return {
+        'ops_per_sec': operations / statistics.median(timings),
+        'best_ops_per_sec': operations / min(timings),
+        'operations': operations,
+        'loops': loops,
+        'repeats': repeats,
+    }
+
+
+def run_suite(seed, size, repeats, selected=None):
+    results = {}
+    for name, (operations, run) in build_cases(seed, size).items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        results[name] = measure(run, operations, repeats)
+        print(f"{name:<28} {results[name]['ops_per_sec']:>14,.0f} ops/sec")
+    # How a showdown's cost grows with the table: each player's hole cards still cost one evaluation against the
+    # shared board, so 9-handed runs at about half the heads-up rate (60-70% of it with the lookup table)
+    scaling = {}
+    for game in ('determine_winner', 'determine_winner_omaha'):
+        if f'{game}_2p' in results and f'{game}_9p' in results:
+            scaling[game] = results[f'{game}_9p']['ops_per_sec'] / results[f'{game}_2p']['ops_per_sec']
+            print(f"{game + ' 9p/2p':<28} {scaling[game]:>14.0%} of the heads-up rate")
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': seed,
+        'size': size,
+        'results': results,
+        'scaling': scaling,
+    }
+
+
+def compare(baseline, current, threshold):
+    # Returns the names of benchmarks whose median throughput dropped by more than threshold (a fraction)
+    regressions = []
+    for name, base in baseline['results'].items():
+        if name not in current['results']:
+            continue
+        ratio = current['results'][name]['ops_per_sec'] / base['ops_per_sec']
+        flag = ''
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<28} {base['ops_per_sec']:>14,.0f} -> {current['results'][name]['ops_per_sec']:>14,.0f}"
+              f" ({ratio - 1:+.1%}){flag}")
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(data, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"Saved {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hand-evaluation benchmarks with saved baselines")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="run the suite and save the results as JSON")
+    compare_parser = subparsers.add_parser('compare', help="fail when throughput regressed against a baseline")
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--seed', type=int, default=1234)
+        sub.add_argument('--size', type=int, default=2000, help="hands per corpus")
+        sub.add_argument('--repeats', type=int, default=5)
+        sub.add_argument('--only', nargs='*', help="run only benchmarks whose name contains one of these")
+    run_parser.add_argument('--output', default=None)
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current', nargs='?', help="saved results to compare; runs the suite if omitted")
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="allowed throughput drop as a fraction (default 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        data = run_suite(args.seed, args.size, args.repeats, args.only)
+        output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, datetime.now().strftime("bench_%Y%m%d_%H%M%S.json"))
+        save(data, output)
+        return 0
+
+    baseline = load(args.baseline)
+    if args.current:
+        current = load(args.current)
+    else:
+        current = run_suite(baseline.get('seed', args.seed), baseline.get('size', args.size), args.repeats, args.only)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
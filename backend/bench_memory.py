@@ -0,0 +1,89 @@
+import argparse
+import gc
+import inspect
+import tracemalloc
+
+from poker import Ledger, Player, Table
+
+
+def without_slots(cls):
+    # Same class body with a per-instance __dict__, i.e. the layout before __slots__ was introduced
+    slots = getattr(cls, '__slots__', ())
+    namespace = {key: value for key, value in vars(cls).items()
+                 if key not in slots and key not in ('__slots__', '__dict__', '__weakref__')}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def measure(build, count):
+    # Every Player and Table opens accounts in the shared ledger; its arrays are left out of the count (and the
+    # objects are closed afterwards), so only the object layout is compared
+    exclude = (tracemalloc.Filter(False, inspect.getfile(Ledger)),)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(exclude)
+    objects, close = build(count)
+    after = tracemalloc.take_snapshot().filter_traces(exclude)
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    close()
+    del objects
+    return size / count
+
+
+def build_players(player_cls, table_cls):
+    def build(count):
+        table = table_cls(name="Lobby")
+        players = []
+        for i in range(count):
+            player = player_cls(f"player{i}", 1000)
+            player.join_table(table)
+            players.append(player)
+
+        def close():
+            table.close()
+            for player in players:
+                player.close()
+        return (players, table), close
+    return build
+
+
+def build_tables(player_cls, table_cls):
+    def build(count):
+        tables = []
+        players = []
+        for i in range(count):
+            table = table_cls(name=f"table{i}")
+            for seat in range(table.max_players):
+                player = player_cls(f"t{i}s{seat}", 1000)
+                player.join_table(table)
+                player.sit_down(table, seat, 100)
+                players.append(player)
+            tables.append(table)
+
+        def close():
+            for table in tables:
+                table.close()
+            for player in players:
+                player.close()
+        return (tables, players), close
+    return build
+
+
+def report(players, tables):
+    layouts = [("__dict__", without_slots(Player), without_slots(Table)), ("__slots__", Player, Table)]
+    print(f"{'layout':<10} {'bytes/player':>14} {'bytes/table (9 seated)':>24}")
+    results = {}
+    for label, player_cls, table_cls in layouts:
+        per_player = measure(build_players(player_cls, table_cls), players)
+        per_table = measure(build_tables(player_cls, table_cls), tables)
+        results[label] = (per_player, per_table)
+        print(f"{label:<10} {per_player:>14.1f} {per_table:>24.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report memory used per Player and per Table")
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--tables', type=int, default=10000)
+    args = parser.parse_args()
+    report(args.players, args.tables)
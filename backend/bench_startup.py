@@ -0,0 +1,58 @@
+import argparse
+import importlib
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+
+# What a simulation worker imported before the poker core was split out of app.py, and what it imports now
+VARIANTS = {
+    'before': ['matplotlib.pyplot', 'app'],
+    'after': ['poker'],
+}
+
+
+def load(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"skipping {name}: {e}", file=sys.stderr)
+
+
+def first_hand(_=None):
+    from MultiRunHands import run_single_round
+    return run_single_round(0)
+
+
+def fresh_process(modules):
+    # Wall time from launching a new interpreter to the end of its first hand
+    code = f"import bench_startup; bench_startup.load({modules!r}); bench_startup.first_hand()"
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True)
+    return time.perf_counter() - start_time
+
+
+def pool_startup(modules, processes):
+    # Wall time to spawn a pool, import the variant's modules in every worker, play one hand each and shut down
+    context = multiprocessing.get_context('spawn')
+    start_time = time.perf_counter()
+    with context.Pool(processes=processes, initializer=load, initargs=(modules,)) as pool:
+        pool.map(first_hand, range(processes), chunksize=1)
+        pool.close()
+        pool.join()
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Worker spawn plus first-hand latency, before and after the split")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    for variant, modules in VARIANTS.items():
+        single = statistics.median(fresh_process(modules) for _ in range(args.repeats))
+        pool = statistics.median(pool_startup(modules, args.processes) for _ in range(args.repeats))
+        print(f"{variant:<7} {'+'.join(modules):<24} process to first hand {single * 1000:8.1f} ms   "
+              f"{args.processes}-worker pool {pool * 1000:8.1f} ms")
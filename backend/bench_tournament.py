@@ -0,0 +1,36 @@
+import argparse
+import time
+
+from poker import Player, Tournament
+
+
+class TimedTournament(Tournament):
+    # Keeps the time spent breaking and balancing tables apart from the time spent playing hands
+    balance_time = 0.0
+
+    def balance(self):
+        start_time = time.perf_counter()
+        super().balance()
+        self.balance_time += time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play a multi-table tournament to the end with push/fold players")
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--stack', type=int, default=1500)
+    parser.add_argument('--hands-per-level', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    players = [Player(name=f"p{i}", bankroll=0) for i in range(args.players)]
+    start_time = time.perf_counter()
+    tournament = TimedTournament("Bench", players, starting_stack=args.stack, hands_per_level=args.hands_per_level,
+                                 seed=args.seed)
+    setup_time = time.perf_counter() - start_time
+    standings = tournament.run()
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.players} players on {len(tournament.tables)} tables, winner {standings[0]}")
+    print(f"{tournament.rounds} rounds, {tournament.hands_played} hands, {tournament.moves} players moved, "
+          f"final level {tournament.level + 1}")
+    print(f"setup {setup_time:.2f}s, total {elapsed:.2f}s ({tournament.hands_played / elapsed:,.0f} hands/sec), "
+          f"balancing {tournament.balance_time * 1000:.1f}ms")
@@ -0,0 +1,29 @@
+import argparse
+import os
+import random
+import time
+
+from poker import RANKS, SUITS, evaluate_strength
+from poker.lookup import TABLE_PATH, LookupTable, build_table
+
+DECK = [rank + suit for rank in RANKS for suit in SUITS]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate the memory-mapped hand lookup table")
+    parser.add_argument('--output', default=TABLE_PATH, help="table file (default: %(default)s, or "
+                        "$POKER_LOOKUP_TABLE)")
+    parser.add_argument('--verify', type=int, default=100000, help="random 5-7 card hands to check against "
+                        "evaluate_strength after building")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    path = build_table(args.output)
+    print(f"Wrote {path} ({os.path.getsize(path) / 2 ** 20:.1f} MiB) in {time.perf_counter() - start_time:.1f}s")
+
+    table = LookupTable(path)
+    rng = random.Random(0)
+    for _ in range(args.verify):
+        cards = rng.sample(DECK, rng.choice((5, 6, 7)))
+        if table.strength(cards) != evaluate_strength(cards):
+            raise SystemExit(f"Table disagrees with evaluate_strength on {cards}")
+    print(f"Checked {args.verify} hands against evaluate_strength")
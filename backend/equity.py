@@ -0,0 +1,229 @@
+import argparse
+import time
+from collections import namedtuple
+from itertools import combinations
+from math import comb, prod
+
+import numpy as np
+
+from poker import RANKS, SUITS, CARD_INDEX
+from headless_engine import evaluate_strength_batch
+
+# The 1,326 two-card combos, each a pair of card indexes (low, high) in the app's numbering (rank * 4 + suit)
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.uint8)
+COMBO_INDEX = {(int(low), int(high)): i for i, (low, high) in enumerate(COMBOS)}
+COMBO_MASKS = (np.uint64(1) << COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBOS[:, 1].astype(np.uint64))
+
+EquityResult = namedtuple('EquityResult', ['equity', 'win', 'tie', 'exact', 'runouts', 'samples'])
+
+# Caps that keep a query around a second: evaluations per query, joint range assignments enumerated exactly,
+# and showdowns compared (runouts times enumerated assignments) before assignments are sampled instead
+MAX_EVALUATIONS = 1500000
+MAX_ASSIGNMENTS = 20000
+MAX_RUNOUTS = 2000
+MAX_SHOWDOWNS = 4000000
+
+
+def _combos_of(high, low, kind):
+    # Combo indexes of a hand class: a pair (kind None), suited ('s'), offsuit ('o') or both ('')
+    high_cards = [RANKS.index(high) * 4 + s for s in range(4)]
+    low_cards = [RANKS.index(low) * 4 + s for s in range(4)]
+    combos = []
+    for a in high_cards:
+        for b in low_cards:
+            if a == b or (high == low and a > b):
+                continue
+            suited = a % 4 == b % 4
+            if kind == 's' and not suited or kind == 'o' and suited:
+                continue
+            combos.append(COMBO_INDEX[(min(a, b), max(a, b))])
+    return combos
+
+
+def _parse_class(text):
+    # "AKs" -> ('A', 'K', 's'), "QQ" -> ('Q', 'Q', None); the higher rank always comes first
+    text = text[:2].upper() + text[2:].lower()
+    if len(text) not in (2, 3) or text[0] not in RANKS or text[1] not in RANKS:
+        raise ValueError(f"Invalid hand class {text!r}")
+    high, low = sorted(text[:2], key=RANKS.index, reverse=True)
+    kind = text[2] if len(text) == 3 else ('' if high != low else None)
+    if kind not in ('s', 'o', '', None) or (high == low and kind):
+        raise ValueError(f"Invalid hand class {text!r}")
+    return high, low, kind
+
+
+def _expand(token):
+    token = token.strip()
+    if token.lower() in ('any', 'random', '*'):
+        return list(range(len(COMBOS)))
+    if len(token) == 4 and token[1].upper() in SUITS and token[3].upper() in SUITS:
+        cards = sorted(CARD_INDEX[token[i].upper() + token[i + 1].upper()] for i in (0, 2))
+        if cards[0] == cards[1]:
+            raise ValueError(f"Invalid combo {token!r}")
+        return [COMBO_INDEX[tuple(cards)]]
+    if token.endswith('+'):
+        high, low, kind = _parse_class(token[:-1])
+        if kind is None:  # "QQ+": QQ, KK, AA
+            ranks = RANKS[RANKS.index(low):]
+            return [c for rank in ranks for c in _combos_of(rank, rank, None)]
+        # "A2s+": raise the kicker up to one below the top card
+        return [c for rank in RANKS[RANKS.index(low):RANKS.index(high)] for c in _combos_of(high, rank, kind)]
+    if '-' in token:
+        first, last = (_parse_class(part) for part in token.split('-'))
+        if first[2] is None and last[2] is None:  # "99-QQ"
+            low, high = sorted((first[0], last[0]), key=RANKS.index)
+            return [c for rank in RANKS[RANKS.index(low):RANKS.index(high) + 1] for c in _combos_of(rank, rank, None)]
+        if first[0] != last[0] or first[2] != last[2]:
+            raise ValueError(f"Invalid range {token!r}")
+        low, high = sorted((first[1], last[1]), key=RANKS.index)  # "A2s-A5s": same top card, kicker range
+        return [c for rank in RANKS[RANKS.index(low):RANKS.index(high) + 1] for c in _combos_of(first[0], rank, first[2])]
+    return _combos_of(*_parse_class(token))
+
+
+def parse_range(text):
+    # "QQ+, AKs, 76s:0.5, AhKh" -> weights over the 1,326 combos; a later token overrides an earlier weight
+    weights = np.zeros(len(COMBOS))
+    for token in text.split(','):
+        if not token.strip():
+            continue
+        hand, _, weight = token.partition(':')
+        weight = float(weight) if weight else 1.0
+        if not 0 <= weight <= 1:
+            raise ValueError(f"Weight must be between 0 and 1 in {token.strip()!r}")
+        weights[_expand(hand)] = weight
+    return weights
+
+
+def card_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= 1 << CARD_INDEX[card]
+    return mask
+
+
+def _blocked(mask):
+    # Combos that share a card with mask
+    return (COMBO_MASKS & np.uint64(mask)) != 0
+
+
+def equity(ranges, board=(), dead=(), boards=5000, samples_per_board=64, seed=None):
+    # Equity of each seat's range. Every runout's strengths are computed once for all combos in any range and
+    # shared by every assignment of combos to seats. Runouts are enumerated when there are few (turn, river),
+    # otherwise sampled; assignments are enumerated when the ranges are small and runouts times assignments stays
+    # under MAX_SHOWDOWNS, otherwise sampled per runout. Combos blocked by the board or dead cards are removed, and
+    # assignments whose combos overlap are skipped.
+    rng = np.random.default_rng(seed)
+    known = list(board) + list(dead)
+    if len(set(known)) != len(known) or len(board) > 5 or any(card not in CARD_INDEX for card in known):
+        raise ValueError("Invalid board or dead cards")
+    known_mask = card_mask(known)
+    seat_combos, seat_weights = [], []
+    for seat_range in ranges:
+        weights = parse_range(seat_range) if isinstance(seat_range, str) else np.asarray(seat_range, dtype=float)
+        weights = np.where(_blocked(known_mask), 0.0, weights)
+        combos = np.flatnonzero(weights)
+        if not len(combos):
+            raise ValueError(f"Range {seat_range!r} has no combos left after card removal")
+        seat_combos.append(combos)
+        seat_weights.append(weights[combos])
+    num_seats = len(seat_combos)
+    if num_seats < 2:
+        raise ValueError("At least two ranges are needed")
+
+    union, positions = np.unique(np.concatenate(seat_combos), return_inverse=True)
+    seat_positions = np.split(positions, np.cumsum([len(c) for c in seat_combos])[:-1])
+
+    # Runouts: the missing board cards, drawn from cards not on the board or dead (hole cards are removed below)
+    deck = np.array([i for i in range(52) if not known_mask >> i & 1], dtype=np.uint8)
+    missing = 5 - len(board)
+    budget = max(MAX_EVALUATIONS // len(union), 1)
+    exact_runouts = comb(len(deck), missing) <= min(MAX_RUNOUTS, budget)
+    if exact_runouts:
+        runouts = np.array(list(combinations(deck, missing)), dtype=np.uint8).reshape(-1, missing) if missing else \
+            np.zeros((1, 0), dtype=np.uint8)
+    else:
+        num_boards = min(boards, budget)
+        runouts = deck[np.argsort(rng.random((num_boards, len(deck))), axis=1)[:, :missing]]
+    board_cards = np.array([CARD_INDEX[card] for card in board], dtype=np.uint8)
+    full_boards = np.hstack([np.broadcast_to(board_cards, (len(runouts), len(board))), runouts])
+    runout_masks = np.bitwise_or.reduce(np.uint64(1) << runouts.astype(np.uint64), axis=1) if missing else \
+        np.zeros(len(runouts), dtype=np.uint64)
+
+    # Shared strengths: one evaluation per (runout, combo), -1 where the combo holds a runout card
+    hole = COMBOS[union]
+    seven = np.concatenate([np.repeat(full_boards, len(union), axis=0), np.tile(hole, (len(runouts), 1))], axis=1)
+    strengths = evaluate_strength_batch(seven).reshape(len(runouts), len(union))
+    strengths[(runout_masks[:, None] & COMBO_MASKS[union][None, :]) != 0] = -1
+
+    num_assignments = prod(len(c) for c in seat_combos)
+    exact_assignments = num_assignments <= MAX_ASSIGNMENTS and len(runouts) * num_assignments <= MAX_SHOWDOWNS
+    if exact_assignments:
+        grids = np.meshgrid(*[np.arange(len(c)) for c in seat_combos], indexing='ij')
+        picks = np.stack([grid.ravel() for grid in grids], axis=1)
+        assignment = np.stack([seat_positions[s][picks[:, s]] for s in range(num_seats)], axis=1)
+        weight = np.prod([seat_weights[s][picks[:, s]] for s in range(num_seats)], axis=0)
+        masks = [COMBO_MASKS[seat_combos[s][picks[:, s]]] for s in range(num_seats)]
+        overlap = np.zeros(len(assignment), dtype=bool)
+        for a in range(num_seats):
+            for b in range(a + 1, num_seats):
+                overlap |= (masks[a] & masks[b]) != 0
+        assignment, weight = assignment[~overlap], weight[~overlap]
+
+    equity_sum = np.zeros(num_seats)
+    win_sum = np.zeros(num_seats)
+    tie_sum = np.zeros(num_seats)
+    total = 0.0
+    samples = 0
+    block = max(1, 2000000 // (num_seats * (len(assignment) if exact_assignments else samples_per_board)))
+    for start in range(0, len(runouts), block):
+        rows = np.arange(start, min(start + block, len(runouts)))
+        if exact_assignments:
+            seat_strengths = strengths[rows][:, assignment]  # (runouts, assignments, seats)
+            weights = np.broadcast_to(weight, seat_strengths.shape[:2])
+        else:
+            # Independent draws per seat; rejecting overlaps leaves the right joint distribution
+            picks = np.stack([rng.choice(len(seat_combos[s]), size=(len(rows), samples_per_board),
+                                         p=seat_weights[s] / seat_weights[s].sum()) for s in range(num_seats)], axis=2)
+            positions = np.stack([seat_positions[s][picks[:, :, s]] for s in range(num_seats)], axis=2)
+            seat_strengths = strengths[rows[:, None, None], positions]
+            masks = [COMBO_MASKS[seat_combos[s][picks[:, :, s]]] for s in range(num_seats)]
+            overlap = np.zeros(seat_strengths.shape[:2], dtype=bool)
+            for a in range(num_seats):
+                for b in range(a + 1, num_seats):
+                    overlap |= (masks[a] & masks[b]) != 0
+            weights = np.where(overlap, 0.0, 1.0)
+        weights = np.where((seat_strengths < 0).any(axis=2), 0.0, weights)
+        best = seat_strengths.max(axis=2, keepdims=True)
+        winners = seat_strengths == best
+        num_winners = winners.sum(axis=2, keepdims=True)
+        weighted = weights[:, :, None]
+        equity_sum += (weighted * winners / num_winners).sum(axis=(0, 1))
+        win_sum += (weighted * (winners & (num_winners == 1))).sum(axis=(0, 1))
+        tie_sum += (weighted * (winners & (num_winners > 1))).sum(axis=(0, 1))
+        total += weights.sum()
+        samples += int(np.count_nonzero(weights))
+    if total == 0:
+        raise ValueError("No runout is possible with these ranges")
+    return EquityResult((equity_sum / total).tolist(), (win_sum / total).tolist(), (tie_sum / total).tolist(),
+                        exact_runouts and exact_assignments, len(runouts), samples)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Range-vs-range equity")
+    parser.add_argument('ranges', nargs='+', help='one range per seat, e.g. "QQ+,AKs" "76s:0.5,88-TT"')
+    parser.add_argument('--board', default='', help="board cards, e.g. AH7D2C")
+    parser.add_argument('--dead', default='', help="dead cards")
+    parser.add_argument('--boards', type=int, default=5000, help="sampled runouts when not enumerating")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    def cards(text):
+        return [text[i:i + 2].upper() for i in range(0, len(text), 2)]
+
+    start_time = time.perf_counter()
+    result = equity(args.ranges, cards(args.board), cards(args.dead), args.boards, seed=args.seed)
+    elapsed = time.perf_counter() - start_time
+    for seat_range, share, win, tie in zip(args.ranges, result.equity, result.win, result.tie):
+        print(f"{seat_range:<30} equity {share:7.2%}   win {win:7.2%}   tie {tie:7.2%}")
+    print(f"{'exact' if result.exact else 'sampled'}: {result.runouts} runouts, {result.samples} matchups, "
+          f"{elapsed:.2f}s")
@@ -0,0 +1,99 @@
+import argparse
+import multiprocessing
+import sys
+import time
+from collections import Counter
+from itertools import combinations
+
+from poker import Table, RANKS, SUITS, HAND_RANKS, evaluate_strength
+
+DECK = [rank + suit for rank in RANKS for suit in SUITS]
+TOTAL_HANDS = 2598960
+# Number of five-card hands in each category (royal flushes counted apart from other straight flushes)
+EXPECTED_COUNTS = {
+    10: 4, 9: 36, 8: 624, 7: 3744, 6: 5108, 5: 10200, 4: 54912, 3: 123552, 2: 1098240, 1: 1302540
+}
+EXPECTED_CLASSES = 7462
+
+_reference = Table(name="oracle")
+
+
+def _evaluate_scalar(hands):
+    return [evaluate_strength(hand) for hand in hands]
+
+
+def _evaluate_batch(hands):
+    import numpy as np
+    from headless_engine import evaluate_strength_batch
+    cards = np.array([[DECK.index(card) for card in hand] for hand in hands], dtype=np.uint8)
+    return evaluate_strength_batch(cards).tolist()
+
+
+EVALUATORS = {'strength': _evaluate_scalar, 'batch': _evaluate_batch}
+
+
+def check_chunk(job):
+    # All hands whose lowest card index is `first`: category counts and the reference-key -> fast-value mapping
+    first, evaluator = job
+    hands = [[DECK[first]] + [DECK[i] for i in rest] for rest in combinations(range(first + 1, 52), 4)]
+    fast_values = EVALUATORS[evaluator](hands)
+    counts = Counter()
+    mapping = {}
+    conflicts = []
+    for hand, fast in zip(hands, fast_values):
+        category, ranks = _reference.evaluate_hand(hand)
+        key = (category, tuple(ranks))
+        counts[category] += 1
+        known = mapping.setdefault(key, fast)
+        if known != fast:
+            conflicts.append((hand, key, known, fast))
+    return counts, mapping, conflicts
+
+
+def verify(evaluator='strength', processes=None):
+    start_time = time.perf_counter()
+    counts = Counter()
+    mapping = {}
+    errors = []
+    jobs = [(first, evaluator) for first in range(48)]
+    with multiprocessing.Pool(processes=processes) as pool:
+        for chunk_counts, chunk_mapping, conflicts in pool.imap_unordered(check_chunk, jobs):
+            counts.update(chunk_counts)
+            for hand, key, known, fast in conflicts[:5]:
+                errors.append(f"{hand}: reference {key} gave both {known} and {fast}")
+            for key, fast in chunk_mapping.items():
+                known = mapping.setdefault(key, fast)
+                if known != fast:
+                    errors.append(f"reference {key} maps to {known} and {fast}")
+
+    if sum(counts.values()) != TOTAL_HANDS:
+        errors.append(f"enumerated {sum(counts.values())} hands, expected {TOTAL_HANDS}")
+    for category, expected in EXPECTED_COUNTS.items():
+        if counts[category] != expected:
+            errors.append(f"{HAND_RANKS[category]}: {counts[category]} hands, expected {expected}")
+    if len(mapping) != EXPECTED_CLASSES:
+        errors.append(f"{len(mapping)} distinct reference classes, expected {EXPECTED_CLASSES}")
+
+    # Strict ordering: the fast values must rise exactly as the reference keys rise
+    ordered = sorted(mapping.items())
+    for (lower_key, lower), (higher_key, higher) in zip(ordered, ordered[1:]):
+        if not lower < higher:
+            errors.append(f"order broken: {lower_key} -> {lower} is not below {higher_key} -> {higher}")
+
+    return counts, errors, time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check a fast evaluator against Table.evaluate_hand on all "
+                                                 "2,598,960 five-card hands")
+    parser.add_argument('--evaluator', choices=sorted(EVALUATORS), default='strength')
+    parser.add_argument('--processes', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    counts, errors, elapsed = verify(args.evaluator, args.processes)
+    for category in sorted(EXPECTED_COUNTS, reverse=True):
+        print(f"{HAND_RANKS[category]:<16} {counts[category]:>9}")
+    print(f"Checked {sum(counts.values())} hands in {elapsed:.1f}s")
+    for error in errors[:50]:
+        print("ERROR:", error)
+    sys.exit(1 if errors else 0)
@@ -1,80 +1,11 @@
-from collections import Counter
+from poker import Table
 
-def evaluate_hand(hand):
-    """
-    Evaluate the strength of a poker hand.
-
-    Args:
-        hand (list): A list of 5 cards in the format 'RS' where 'R' is the rank and 'S' is the suit.
-
-    Returns:
-        tuple: A tuple where the first element is the hand's rank (0-9) and the second is a list of card ranks for tie-breaking.
-    """
-    # Define the order of ranks and suits
-    values = '--23456789TJQKA'
-    suits = 'CDHS'
-
-    # Check for invalid cards
-    if any(len(card) != 2 or card[0] not in values or card[1] not in suits for card in hand):
-        raise ValueError("Invalid card in hand")
-
-    # Check for duplicate cards
-    if len(hand) != len(set(hand)):
-        raise ValueError("Duplicate cards in hand")
-
-    # Convert card ranks to numerical values and sort them in descending order
-    sorted_ranks = sorted([values.index(r) for r, s in hand], reverse=True)
-    rank_counts = Counter(sorted_ranks)
-    sorted_rank_counts = sorted(rank_counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
-
-    # Check if all cards have the same suit (flush)
-    is_flush = len(set(s for r, s in hand)) == 1
-
-    # Check if the ranks form a sequence (straight)
-    is_straight = len(set(sorted_ranks)) == 5 and (sorted_ranks[0] - sorted_ranks[-1] == 4 or sorted_ranks == [14, 5, 4, 3, 2])
-
-    # Determine the hand ranking
-    if is_straight and is_flush:
-        # Straight flush
-        return (9, sorted_ranks if sorted_ranks != [14, 5, 4, 3, 2] else [5, 4, 3, 2, 1])
-    elif sorted_rank_counts[0][1] == 4:
-        # Four of a kind
-        four_kind = sorted_rank_counts[0][0]
-        kicker = sorted_rank_counts[1][0]
-        return (8, [four_kind, kicker])
-    elif sorted_rank_counts[0][1] == 3 and sorted_rank_counts[1][1] == 2:
-        # Full house
-        three_kind = sorted_rank_counts[0][0]
-        pair = sorted_rank_counts[1][0]
-        return (7, [three_kind, pair])
-    elif is_flush:
-        # Flush
-        return (6, sorted_ranks)
-    elif is_straight:
-        # Straight
-        return (5, sorted_ranks if sorted_ranks != [14, 5, 4, 3, 2] else [5, 4, 3, 2, 1])
-    elif sorted_rank_counts[0][1] == 3:
-        # Three of a kind
-        three_kind = sorted_rank_counts[0][0]
-        kickers = [rank for rank, count in sorted_rank_counts if count == 1]
-        return (4, [three_kind] + kickers)
-    elif sorted_rank_counts[0][1] == 2 and sorted_rank_counts[1][1] == 2:
-        # Two pair
-        pairs = [rank for rank, count in sorted_rank_counts if count == 2]
-        kicker = [rank for rank, count in sorted_rank_counts if count == 1][0]
-        return (3, pairs + [kicker])
-    elif sorted_rank_counts[0][1] == 2:
-        # One pair
-        pair = sorted_rank_counts[0][0]
-        kickers = [rank for rank, count in sorted_rank_counts if count == 1]
-        return (2, [pair] + kickers)
-    else:
-        # High card
-        return (1, sorted_ranks)
+# Check the evaluator the app actually uses instead of a local copy of it
+evaluate_hand = Table(name="checker").evaluate_hand
 
 # Sample test cases
 test_hands = [
-    (['AH', 'KH', 'QH', 'JH', 'TH'], (9, [14, 13, 12, 11, 10])),  # Royal Flush
+    (['AH', 'KH', 'QH', 'JH', 'TH'], (10, [14, 13, 12, 11, 10])),  # Royal Flush
     (['9H', '8H', '7H', '6H', '5H'], (9, [9, 8, 7, 6, 5])),       # Straight Flush
     (['9H', '9D', '9S', '9C', '2D'], (8, [9, 2])),                # Four of a Kind
     (['TH', 'TD', 'TS', '3C', '3D'], (7, [10, 3])),               # Full House
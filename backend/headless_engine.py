@@ -0,0 +1,275 @@
+import argparse
+import time
+
+import numpy as np
+
+from poker import RANKS, SUITS, CATEGORY_SHIFT, TOP_RANKS, STRAIGHT_HIGH, POPCOUNT, strength_cache, lookup_table
+
+# Cards are uint8 indexes rank * 4 + suit, the same numbering as poker.CARD_INDEX
+TOP1 = np.array(TOP_RANKS[1], dtype=np.int64)
+TOP2 = np.array(TOP_RANKS[2], dtype=np.int64)
+TOP3 = np.array(TOP_RANKS[3], dtype=np.int64)
+TOP5 = np.array(TOP_RANKS[5], dtype=np.int64)
+STRAIGHT = np.array(STRAIGHT_HIGH, dtype=np.int64)
+POP = np.array(POPCOUNT, dtype=np.int64)
+
+# Per-card codes whose sum over a hand packs all counts at once (cards are distinct, so sums never carry):
+# a 3-bit count field per rank at bit 3 * rank, and a 13-bit rank mask per suit at bit 16 * suit
+RANK_COUNT_CODE = np.array([1 << 3 * (card >> 2) for card in range(52)], dtype=np.int64)
+SUIT_MASK_CODE = np.array([1 << (card >> 2) + 16 * (card & 3) for card in range(52)], dtype=np.int64)
+FIELD_LOW_BITS = sum(1 << 3 * rank for rank in range(13))
+# Squeezes five 3-bit fields (one flag bit each) into five adjacent bits
+COMPRESS = np.array([sum((value >> 3 * i & 1) << i for i in range(5)) for value in range(1 << 15)], dtype=np.int64)
+
+# Seat status flags
+SEATED = 1
+IN_HAND = 2
+
+
+def card_names(cards):
+    return [RANKS[card >> 2] + SUITS[card & 3] for card in np.asarray(cards).tolist()]
+
+
+def _rank_bit(value):
+    # Mask bit of a packed rank value (2-14), 0 when the value is 0
+    return np.where(value > 0, np.int64(1) << np.maximum(value - 2, 0), 0)
+
+
+def _compress(fields):
+    # 13 spread 3-bit fields to a 13-bit rank mask
+    return COMPRESS[fields & 0x7FFF] | COMPRESS[fields >> 15 & 0x7FFF] << 5 | COMPRESS[fields >> 30 & 0x7FFF] << 10
+
+
+def _pack_straight(high):
+    return high << 16 | (high - 1) << 12 | (high - 2) << 8 | (high - 3) << 4 | (high - 4)
+
+
+def evaluate_strength_batch(cards, table=lookup_table):
+    # Vectorized poker.evaluate_strength over an (N, 5..7) array of card indexes; no validation. Uses the
+    # memory-mapped poker.lookup table when one is built (pass table=None to compute the strengths instead).
+    cards = np.asarray(cards, dtype=np.intp)
+    if table is not None:
+        return _lookup_strength_batch(cards, *table.arrays())
+    counts = RANK_COUNT_CODE[cards].sum(axis=1)
+    suit_bits = SUIT_MASK_CODE[cards].sum(axis=1)
+    suit_masks = np.stack([suit_bits >> 16 * s & 0x1FFF for s in range(4)], axis=1)
+
+    # Count field bits: 1 = 001, 2 = 010, 3 = 011, 4 = 100
+    bit0 = counts & FIELD_LOW_BITS
+    bit1 = counts >> 1 & FIELD_LOW_BITS
+    bit2 = counts >> 2 & FIELD_LOW_BITS
+    rank_mask = _compress(bit0 | bit1 | bit2)
+    quads_mask = _compress(bit2)
+    trips_mask = _compress(bit1 & bit0)
+    pairs_mask = _compress(bit1 & ~bit0)
+
+    # At most one suit can hold five of seven cards
+    flush_mask = np.where(POP[suit_masks] >= 5, suit_masks, 0).max(axis=1)
+    flush_high = STRAIGHT[flush_mask]
+
+    quads = TOP1[quads_mask]
+    trips = TOP1[trips_mask]
+    second_trips = TOP1[trips_mask & ~_rank_bit(trips)]
+    pair = TOP1[pairs_mask]
+    second_pair = TOP1[pairs_mask & ~_rank_bit(pair)]
+    full_house_pair = np.maximum(second_trips, pair)
+    straight_high = STRAIGHT[rank_mask]
+
+    conditions = [
+        flush_high == 14,
+        flush_high > 0,
+        quads > 0,
+        (trips > 0) & (full_house_pair > 0),
+        flush_mask > 0,
+        straight_high > 0,
+        trips > 0,
+        second_pair > 0,
+        pair > 0,
+    ]
+    choices = [
+        10 << CATEGORY_SHIFT | _pack_straight(flush_high),
+        9 << CATEGORY_SHIFT | _pack_straight(flush_high),
+        8 << CATEGORY_SHIFT | quads << 16 | TOP1[rank_mask & ~_rank_bit(quads)] << 12,
+        7 << CATEGORY_SHIFT | trips << 16 | full_house_pair << 12,
+        6 << CATEGORY_SHIFT | TOP5[flush_mask],
+        5 << CATEGORY_SHIFT | _pack_straight(straight_high),
+        4 << CATEGORY_SHIFT | trips << 16 | TOP2[rank_mask & ~_rank_bit(trips)] << 8,
+        3 << CATEGORY_SHIFT | pair << 16 | second_pair << 12
+        | TOP1[rank_mask & ~(_rank_bit(pair) | _rank_bit(second_pair))] << 8,
+        2 << CATEGORY_SHIFT | pair << 16 | TOP3[rank_mask & ~_rank_bit(pair)] << 4,
+    ]
+    return np.select(conditions, choices, default=1 << CATEGORY_SHIFT | TOP5[rank_mask])
+
+
+def _lookup_strength_batch(cards, next_nodes, values, flush):
+    node = np.zeros(len(cards), dtype=np.intp)
+    for column in range(cards.shape[1]):
+        node = next_nodes[node * 13 + (cards[:, column] >> 2)]
+    suit_bits = SUIT_MASK_CODE[cards].sum(axis=1)
+    flush_value = np.max([flush[suit_bits >> 16 * s & 0x1FFF] for s in range(4)], axis=0)
+    return np.maximum(values[node], flush_value).astype(np.int64)
+
+
+def evaluate_strength_batch_cached(cards, cache=strength_cache):
+    # evaluate_strength_batch that evaluates each distinct card set once per call, and only when the shared
+    # cache (keyed by the same card masks as poker.card_mask) doesn't already hold it
+    cards = np.asarray(cards, dtype=np.intp)
+    masks = np.bitwise_or.reduce(np.uint64(1) << cards.astype(np.uint64), axis=1)
+    unique_masks, first, inverse = np.unique(masks, return_index=True, return_inverse=True)
+    strengths = np.empty(len(unique_masks), dtype=np.int64)
+    missing = []
+    for i, mask in enumerate(unique_masks.tolist()):
+        strength = cache.get(mask)
+        if strength is None:
+            missing.append(i)
+        else:
+            strengths[i] = strength
+    if missing:
+        computed = evaluate_strength_batch(cards[first[missing]])
+        strengths[missing] = computed
+        for mask, strength in zip(unique_masks[missing].tolist(), computed.tolist()):
+            cache.put(mask, strength)
+    return strengths[inverse.reshape(-1)]
+
+
+class HeadlessEngine:
+    # Many tables stored as parallel NumPy arrays and stepped together. Every hand follows Table's rules
+    # (dealer rotation over occupied seats, heads-up blinds, clockwise dealing, burn cards, side-pot settlement)
+    # with everyone calling the big blind and checking down. Seats with no chips left are treated as sitting out,
+    # and a stack too short for its blind posts what it has instead of stopping the table.
+    def __init__(self, num_tables, num_seats=9, stack=1000, small_blind=10, big_blind=20, antee=0, seed=None):
+        self.num_tables = num_tables
+        self.num_seats = num_seats
+        self.blinds = {"small_blind": small_blind, "big_blind": big_blind, "antee": antee}
+        self.rng = np.random.default_rng(seed)
+        self.chips = np.full((num_tables, num_seats), stack, dtype=np.int64)
+        self.contributions = np.zeros((num_tables, num_seats), dtype=np.int64)
+        self.hole_cards = np.zeros((num_tables, num_seats, 2), dtype=np.uint8)
+        self.board = np.zeros((num_tables, 5), dtype=np.uint8)
+        self.status = np.full((num_tables, num_seats), SEATED, dtype=np.uint8)
+        self.dealer = np.full(num_tables, -1, dtype=np.int64)
+        self.pot = np.zeros(num_tables, dtype=np.int64)
+        self.decks = np.zeros((num_tables, 52), dtype=np.uint8)
+        self.num_dealt = np.zeros(num_tables, dtype=np.int64)
+        self.hands_played = 0
+        self._seat_index = np.arange(num_seats, dtype=np.int64)
+        self._rows = np.arange(num_tables, dtype=np.int64)
+
+    def _next_seat(self, occupied, seat):
+        # First occupied seat clockwise after seat, per table (the SeatRing.next rule)
+        key = np.where(occupied, (self._seat_index - seat[:, None] - 1) % self.num_seats, self.num_seats)
+        return key.argmin(axis=1)
+
+    def _split(self, amount, winners):
+        # Chips per seat when each table's amount is shared by its winners; odd chips go one each to the first
+        # winners clockwise from the dealer (the Table._split rule)
+        count = winners.sum(axis=1)
+        share, odd = np.divmod(amount, np.maximum(count, 1))
+        key = np.where(winners, (self._seat_index - self.dealer[:, None] - 1) % self.num_seats, self.num_seats)
+        position = np.argsort(np.argsort(key, axis=1), axis=1)
+        return winners * (share[:, None] + (position < odd[:, None]))
+
+    def _pop(self, offset):
+        # Card offset positions below the top of each deck, like successive deck.pop() calls
+        return self.decks[self._rows, 51 - self.num_dealt - offset]
+
+    def start_hand(self):
+        playing = (self.status & SEATED).astype(bool) & (self.chips > 0)
+        self.status = np.where(playing, SEATED | IN_HAND, self.status & SEATED).astype(np.uint8)
+        self.dealer = np.where(playing.any(axis=1), self._next_seat(playing, self.dealer), -1)
+        self.decks = np.argsort(self.rng.random((self.num_tables, 52)), axis=1).astype(np.uint8)
+        self.num_dealt[:] = 0
+        self.contributions[:] = 0
+        self.pot[:] = 0
+        return playing
+
+    def collect_blinds(self, playing):
+        count = playing.sum(axis=1)
+        live = count >= 2
+        heads_up = count == 2
+        small = np.where(heads_up, self.dealer, self._next_seat(playing, self.dealer))
+        big = self._next_seat(playing, small)
+        bets = np.zeros_like(self.chips)
+        for seats, amount in ((small, self.blinds["small_blind"]), (big, self.blinds["big_blind"])):
+            posted = np.where(live, np.minimum(self.chips[self._rows, seats], amount), 0)
+            self.chips[self._rows, seats] -= posted
+            bets[self._rows, seats] += posted
+        antes = np.where(playing & live[:, None], np.minimum(self.chips, self.blinds["antee"]), 0)
+        self.chips -= antes
+        # Checking down pre-flop means every other player calls the big blind
+        calls = np.where(playing & live[:, None], np.minimum(self.chips, bets.max(axis=1)[:, None] - bets), 0)
+        self.chips -= calls
+        self.contributions += bets + antes + calls
+        self.pot = self.contributions.sum(axis=1)
+
+    def deal_cards(self, playing):
+        count = playing.sum(axis=1)
+        key = np.where(playing, (self._seat_index - self.dealer[:, None] - 1) % self.num_seats, self.num_seats)
+        position = np.argsort(np.argsort(key, axis=1), axis=1)
+        first = self.decks[self._rows[:, None], 51 - position]
+        second = self.decks[self._rows[:, None], 51 - count[:, None] - position]
+        self.hole_cards[:, :, 0] = np.where(playing, first, 0)
+        self.hole_cards[:, :, 1] = np.where(playing, second, 0)
+        self.num_dealt = 2 * count
+
+    def deal_board(self):
+        # Burn, flop, burn, turn, burn, river
+        for board_index, offset in ((0, 1), (1, 2), (2, 3), (3, 5), (4, 7)):
+            self.board[:, board_index] = self._pop(offset)
+        self.num_dealt += 8
+
+    def showdown(self):
+        in_hand = (self.status & IN_HAND).astype(bool)
+        seven = np.concatenate([self.hole_cards, np.repeat(self.board[:, None, :], self.num_seats, axis=1)], axis=2)
+        strengths = np.full((self.num_tables, self.num_seats), -1, dtype=np.int64)
+        strengths[in_hand] = evaluate_strength_batch(seven[in_hand])
+
+        # Mirror Table.settle_pots: pay each contribution layer to its best eligible hand, leftovers to the winners
+        levels = np.sort(self.contributions, axis=1)
+        previous = np.zeros(self.num_tables, dtype=np.int64)
+        for column in range(self.num_seats):
+            level = levels[:, column]
+            new_level = (level > previous) & (level > 0)
+            contributors = self.contributions >= level[:, None]
+            eligible = contributors & in_hand
+            best = np.where(eligible, strengths, -1).max(axis=1)
+            layer_winners = eligible & (strengths == best[:, None]) & (new_level & (best >= 0))[:, None]
+            paid = self._split((level - previous) * contributors.sum(axis=1), layer_winners)
+            self.chips += paid
+            self.pot -= paid.sum(axis=1)
+            previous = np.where(new_level, level, previous)
+
+        winners = in_hand & (strengths == strengths.max(axis=1)[:, None])
+        self.chips += self._split(self.pot, winners)
+        self.pot[:] = 0
+        self.status &= SEATED
+        return strengths, winners
+
+    def play_hand(self):
+        playing = self.start_hand()
+        self.collect_blinds(playing)
+        self.deal_cards(playing)
+        self.deal_board()
+        strengths, winners = self.showdown()
+        self.hands_played += int((playing.sum(axis=1) >= 2).sum())
+        return strengths, winners
+
+    def play(self, num_hands):
+        for _ in range(num_hands):
+            self.play_hand()
+        return self.hands_played
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulate check-down hands on many headless tables")
+    parser.add_argument('--tables', type=int, default=100000)
+    parser.add_argument('--seats', type=int, default=6)
+    parser.add_argument('--hands', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    engine = HeadlessEngine(args.tables, args.seats, seed=args.seed)
+    start_time = time.perf_counter()
+    hands = engine.play(args.hands)
+    elapsed = time.perf_counter() - start_time
+    print(f"{hands} hands in {elapsed:.2f}s ({hands / elapsed:,.0f} hands/sec)")
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import defaultdict
+
+HOST = '127.0.0.1'
+
+
+def serve(port_queue, quiet):
+    # Runs in a child process so the server and the clients don't share a GIL
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+    if quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server(HOST, 0, app, threaded=True)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, status):
+        self.latencies[route].append(seconds)
+        if status >= 400:
+            self.errors[route] += 1
+
+    @staticmethod
+    def percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self):
+        print(f"{'route':<26} {'count':>8} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9}")
+        for route, values in sorted(self.latencies.items()):
+            print(f"{route:<26} {len(values):>8} {self.errors[route]:>7} "
+                  f"{self.percentile(values, 0.5) * 1000:>9.2f} {self.percentile(values, 0.99) * 1000:>9.2f}")
+
+
+class Client:
+    def __init__(self, port, stats, limit):
+        self.port = port
+        self.stats = stats
+        self.limit = limit
+
+    async def post(self, route, payload):
+        body = json.dumps(payload).encode()
+        head = (f"POST {route} HTTP/1.1\r\nHost: {HOST}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode()
+        async with self.limit:
+            start_time = time.perf_counter()
+            reader, writer = await asyncio.open_connection(HOST, self.port)
+            writer.write(head + body)
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+            elapsed = time.perf_counter() - start_time
+        header, _, data = raw.partition(b"\r\n\r\n")
+        status = int(header.split(None, 2)[1])
+        self.stats.record(route, elapsed, status)
+        return status, json.loads(data) if data else None
+
+
+async def set_up(client, num_tables, num_players, buy_in):
+    tables = [f"load-table-{i}" for i in range(num_tables)]
+    seating = defaultdict(list)
+    await asyncio.gather(*(client.post('/create_table', {'name': name}) for name in tables))
+    await asyncio.gather(*(client.post('/add_player', {'name': f"load-player-{i}", 'bankroll': 10 * buy_in})
+                           for i in range(num_players)))
+    for i in range(num_players):
+        table = tables[i % num_tables]
+        if len(seating[table]) < 9:
+            seating[table].append(f"load-player-{i}")
+
+    async def seat(table, players):
+        for seat_number, player in enumerate(players):
+            await client.post('/add_player_to_table', {'player_name': player, 'table_name': table})
+            await client.post('/sit_down', {'player_name': player, 'table_name': table, 'seat': seat_number,
+                                            'buy_in': buy_in})
+    await asyncio.gather(*(seat(table, players) for table, players in seating.items()))
+    return {table: players for table, players in seating.items() if len(players) >= 2}
+
+
+async def betting_round(client, table, state):
+    # Passive bots: call when facing a bet, otherwise check, using the state each response returns
+    while state and state.get('to_act'):
+        action = 'call' if 'call' in state['actions'] else 'check'
+        status, body = await client.post('/bet', {'table_name': table, 'player': state['to_act'], 'action': action})
+        state = body.get('state') if body else None
+
+
+async def play_hands(client, table, players, num_hands, completed):
+    for _ in range(num_hands):
+        await client.post('/reshuffle', {'table_name': table})
+        status, _ = await client.post('/deal', {'table_name': table, 'numPlayers': len(players)})
+        if status != 200:
+            return
+        for street in ('flop', 'turn', 'river'):
+            _, state = await client.post('/legal_actions', {'table_name': table})
+            await betting_round(client, table, state)
+            await client.post(f'/community/{street}', {'table_name': table})
+        _, state = await client.post('/legal_actions', {'table_name': table})
+        await betting_round(client, table, state)
+        status, _ = await client.post('/determine_winner', {'table_name': table})
+        if status == 200:
+            completed.append(time.perf_counter())
+
+
+async def run(port, args):
+    stats = RouteStats()
+    client = Client(port, stats, asyncio.Semaphore(args.concurrency))
+    seating = await set_up(client, args.tables, args.players, args.buy_in)
+    setup_stats = stats
+    client.stats = stats = RouteStats()
+    completed = []
+    start_time = time.perf_counter()
+    await asyncio.gather(*(play_hands(client, table, players, args.hands, completed)
+                           for table, players in seating.items()))
+    elapsed = time.perf_counter() - start_time
+    print("Setup")
+    setup_stats.report()
+    print(f"\nHands ({len(seating)} tables)")
+    stats.report()
+    print(f"\n{len(completed)} hands in {elapsed:.2f}s: {len(completed) / elapsed:.1f} hands/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive full hands against a locally started poker server")
+    parser.add_argument('--tables', type=int, default=10)
+    parser.add_argument('--players', type=int, default=60)
+    parser.add_argument('--hands', type=int, default=20, help="hands per table")
+    parser.add_argument('--buy-in', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32, help="requests in flight at once")
+    parser.add_argument('--verbose', action='store_true', help="keep the server's request logging")
+    args = parser.parse_args()
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue, not args.verbose), daemon=True)
+    server.start()
+    try:
+        asyncio.run(run(port_queue.get(timeout=30), args))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Set POKER_METRICS=0 to leave the hot-path functions unwrapped
+ENABLED = os.environ.get('POKER_METRICS', '1') != '0'
+# Log one in every N info records on the request path (warnings and errors are always kept)
+LOG_SAMPLE_RATE = int(os.environ.get('POKER_LOG_SAMPLE', '100'))
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # metric name -> (help text, {label tuple: Histogram or int})
+        self.histograms = {}
+        self.counters = {}
+        # Functions called at render time that return (name, help text, value) gauge readings
+        self.collectors = []
+
+    def observe(self, name, help_text, labels, seconds):
+        with self.lock:
+            series = self.histograms.setdefault(name, (help_text, {}))[1]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, help_text, labels, amount=1):
+        with self.lock:
+            series = self.counters.setdefault(name, (help_text, {}))[1]
+            series[labels] = series.get(labels, 0) + amount
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self):
+        # Prometheus text exposition format, version 0.0.4
+        lines = []
+        for collector in self.collectors:
+            for name, help_text, value in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        with self.lock:
+            for name, (help_text, series) in sorted(self.counters.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+            for name, (help_text, series) in sorted(self.histograms.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total:.9f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+registry = Registry()
+
+
+def timed(name):
+    # Records every call's duration under poker_function_duration_seconds{function=name}
+    def decorator(func):
+        if not ENABLED:
+            return func
+        labels = (('function', name),)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe('poker_function_duration_seconds', "Time spent in hot-path game functions",
+                                 labels, time.perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+
+class SampledFilter(logging.Filter):
+    # Passes every warning and error, and one in every `rate` lower-level records
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = max(rate, 1)
+        self.seen = 0
+        self.lock = threading.Lock()  # Filters run on every request thread
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        with self.lock:
+            self.seen += 1
+            seen = self.seen
+        return seen % self.rate == 1 or self.rate == 1
+
+
+request_log = logging.getLogger('poker.requests')
+request_log.addFilter(SampledFilter(LOG_SAMPLE_RATE))
+
+
+def init_app(app):
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start_time = g.pop('metrics_start', None)
+        if start_time is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            registry.observe('poker_request_duration_seconds', "HTTP request latency by route",
+                             (('route', route), ('method', request.method)), time.perf_counter() - start_time)
+            registry.increment('poker_requests_total', "HTTP requests by route and status",
+                               (('route', route), ('method', request.method), ('status', str(response.status_code))))
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,15 @@
+# Game core without Flask: importing this package pulls in only the standard library
+from .evaluator import (RANKS, SUITS, HAND_RANKS, CATEGORY_SHIFT, CARD_INDEX, CATEGORY_PATTERNS, ShowdownResult,
+                        TOP_RANKS, STRAIGHT_HIGH, POPCOUNT, strength_from_counts, evaluate_strength, decode_strength,
+                        best_five, BoardEvaluator)
+from .cache import card_mask, StrengthCache, strength_cache
+from .ledger import Auditor, Ledger, ledger
+from .lookup import LookupTable, build_table, load_table, lookup_table
+from .omaha import OmahaBoardEvaluator, omaha_strength
+from .table import HOLDEM, OMAHA, HOLE_CARDS, SeatRing, Table
+from .tournament import DEFAULT_LEVELS, Tournament, push_fold
+from .icm import icm_equity, icm_exact, icm_monte_carlo, table_icm
+from .player import Player
+from .store import Store
+from .timing import install_timer
+from .game import PokerGame
@@ -0,0 +1,108 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from .evaluator import CARD_INDEX, evaluate_strength
+from .lookup import lookup_table
+
+# Entries kept by the shared cache; set POKER_STRENGTH_CACHE=0 to turn it off
+DEFAULT_CAPACITY = int(os.environ.get('POKER_STRENGTH_CACHE', '65536'))
+
+
+def card_mask(cards):
+    # 52-bit set of the cards, bit CARD_INDEX[card]; the same set of cards gives the same key in any order
+    mask = 0
+    for card in cards:
+        index = CARD_INDEX.get(card)
+        if index is None:
+            raise ValueError("Invalid card in hand")
+        if mask >> index & 1:
+            raise ValueError("Duplicate cards in hand")
+        mask |= 1 << index
+    return mask
+
+
+def active_evaluator():
+    # The memory-mapped lookup table when it loaded, otherwise the algorithmic evaluator
+    return lookup_table.strength if lookup_table is not None else evaluate_strength
+
+
+class StrengthCache:
+    # Bounded least-recently-used map from card mask to strength in front of an evaluator (by default the active
+    # one). Masks of 5, 6 and 7 cards never collide, so one cache serves every hand size. Showdowns don't go
+    # through it: BoardEvaluator's two-card delta against the shared board is cheaper than building a mask and
+    # looking it up, and the NumPy batch evaluators outrun per-hand lookups (evaluate_strength_batch_cached in
+    # headless_engine is there for callers whose batches repeat).
+    def __init__(self, capacity=DEFAULT_CAPACITY, evaluator=None):
+        self.capacity = capacity
+        self.evaluator = evaluator or active_evaluator()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, mask):
+        # Strength for mask, or None on a miss
+        with self.lock:
+            strength = self.entries.get(mask)
+            if strength is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(mask)
+            self.hits += 1
+            return strength
+
+    def put(self, mask, strength):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.entries[mask] = strength
+            self.entries.move_to_end(mask)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def strength(self, cards):
+        mask = card_mask(cards)
+        strength = self.get(mask)
+        if strength is None:
+            strength = self.evaluator(cards)
+            self.put(mask, strength)
+        return strength
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            # The table itself plus one key and one value object per entry (small ints are not shared)
+            entry_bytes = sys.getsizeof(1 << 51) + sys.getsizeof(1 << 30)
+            return {
+                'size': len(self.entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'memory_bytes': sys.getsizeof(self.entries) + len(self.entries) * entry_bytes,
+            }
+
+    def gauges(self):
+        # Readings for metrics.Registry.add_collector
+        stats = self.stats()
+        return [
+            ('poker_strength_cache_entries', "Hand strengths held in the cache", stats['size']),
+            ('poker_strength_cache_hits', "Strength cache hits", stats['hits']),
+            ('poker_strength_cache_misses', "Strength cache misses", stats['misses']),
+            ('poker_strength_cache_hit_ratio', "Share of strength lookups served from the cache", stats['hit_rate']),
+            ('poker_strength_cache_memory_bytes', "Estimated memory held by the strength cache",
+             stats['memory_bytes']),
+        ]
+
+
+strength_cache = StrengthCache()
@@ -0,0 +1,195 @@
+from collections import Counter, namedtuple
+
+# Constants
+RANKS = '23456789TJQKA'
+SUITS = 'HDCS'
+HAND_RANKS = {
+    1: "High card", 2: "One pair", 3: "Two pairs", 4: "Three of a kind",
+    5: "Straight", 6: "Flush", 7: "Full house", 8: "Four of a kind", 9: "Straight flush", 10: "Royal flush"
+}
+
+# Integer hand strengths: category in bits 20+, then up to five 4-bit rank values (2-14, 1 for a wheel ace)
+# in the same order as the tie-break list returned by Table.evaluate_hand, so comparing two strengths
+# gives the same answer as comparing two evaluate_hand results.
+CATEGORY_SHIFT = 20
+CARD_INDEX = {rank + suit: RANKS.index(rank) * 4 + SUITS.index(suit) for rank in RANKS for suit in SUITS}
+# Card multiplicities of the tie-break ranks for each category, used to rebuild the best five cards
+CATEGORY_PATTERNS = {
+    1: (1, 1, 1, 1, 1), 2: (2, 1, 1, 1), 3: (2, 2, 1), 4: (3, 1, 1), 5: (1, 1, 1, 1, 1),
+    6: (1, 1, 1, 1, 1), 7: (3, 2), 8: (4, 1), 9: (1, 1, 1, 1, 1), 10: (1, 1, 1, 1, 1)
+}
+
+ShowdownResult = namedtuple('ShowdownResult', ['winners', 'strengths', 'category', 'best_five', 'payouts'])
+
+
+def _build_rank_tables():
+    # Lookup tables indexed by a 13-bit rank mask (bit 0 = deuce, bit 12 = ace)
+    top_ranks = {k: [0] * 8192 for k in (1, 2, 3, 5)}
+    straight_high = [0] * 8192
+    popcount = [0] * 8192
+    for mask in range(8192):
+        ranks = [r + 2 for r in range(12, -1, -1) if mask >> r & 1]
+        popcount[mask] = len(ranks)
+        for k, table in top_ranks.items():
+            packed = 0
+            for value in ranks[:k]:
+                packed = packed << 4 | value
+            table[mask] = packed << 4 * (k - min(k, len(ranks)))
+        for high in range(12, 2, -1):
+            window = 0b11111 << (high - 4) if high >= 4 else 0b1111 | 1 << 12
+            if mask & window == window:
+                straight_high[mask] = high + 2
+                break
+    return top_ranks, straight_high, popcount
+
+
+TOP_RANKS, STRAIGHT_HIGH, POPCOUNT = _build_rank_tables()
+
+
+def _pack_straight(high):
+    return high << 16 | (high - 1) << 12 | (high - 2) << 8 | (high - 3) << 4 | (high - 4)
+
+
+def strength_from_counts(rank_counts, suit_masks):
+    for suit_mask in suit_masks:
+        if POPCOUNT[suit_mask] >= 5:
+            # A flush rules out quads and full houses with seven cards or fewer
+            return _flush_strength(suit_mask)
+    return _rank_strength(rank_counts, suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3])
+
+
+def _flush_strength(suit_mask):
+    high = STRAIGHT_HIGH[suit_mask]
+    if high == 14:
+        return 10 << CATEGORY_SHIFT | _pack_straight(14)
+    if high:
+        return 9 << CATEGORY_SHIFT | _pack_straight(high)
+    return 6 << CATEGORY_SHIFT | TOP_RANKS[5][suit_mask]
+
+
+def _rank_strength(rank_counts, rank_mask):
+    # Strength of a hand without a flush, from its rank histogram and the mask of ranks present
+    quads = trips = pair = second_pair = -1
+    for r in range(12, -1, -1):
+        count = rank_counts[r]
+        if count < 2:
+            continue
+        if count == 4 and quads < 0:
+            quads = r
+        elif count == 3 and trips < 0:
+            trips = r
+        elif pair < 0:
+            pair = r
+        elif second_pair < 0:
+            second_pair = r
+
+    if quads >= 0:
+        return 8 << CATEGORY_SHIFT | (quads + 2) << 16 | TOP_RANKS[1][rank_mask & ~(1 << quads)] << 12
+    if trips >= 0 and pair >= 0:
+        return 7 << CATEGORY_SHIFT | (trips + 2) << 16 | (pair + 2) << 12
+    high = STRAIGHT_HIGH[rank_mask]
+    if high:
+        return 5 << CATEGORY_SHIFT | _pack_straight(high)
+    if trips >= 0:
+        return 4 << CATEGORY_SHIFT | (trips + 2) << 16 | TOP_RANKS[2][rank_mask & ~(1 << trips)] << 8
+    if second_pair >= 0:
+        rest = rank_mask & ~(1 << pair | 1 << second_pair)
+        return 3 << CATEGORY_SHIFT | (pair + 2) << 16 | (second_pair + 2) << 12 | TOP_RANKS[1][rest] << 8
+    if pair >= 0:
+        return 2 << CATEGORY_SHIFT | (pair + 2) << 16 | TOP_RANKS[3][rank_mask & ~(1 << pair)] << 4
+    return 1 << CATEGORY_SHIFT | TOP_RANKS[5][rank_mask]
+
+
+def evaluate_strength(cards):
+    # Strength of the best five-card hand within 5 to 7 cards
+    seen = 0
+    rank_counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        index = CARD_INDEX.get(card)
+        if index is None:
+            raise ValueError("Invalid card in hand")
+        if seen >> index & 1:
+            raise ValueError("Duplicate cards in hand")
+        seen |= 1 << index
+        rank_counts[index >> 2] += 1
+        suit_masks[index & 3] |= 1 << (index >> 2)
+    return strength_from_counts(rank_counts, suit_masks)
+
+
+class BoardEvaluator:
+    # Board-only features worked out once per showdown: the seen-card mask, rank histogram and rank mask, and
+    # the suit masks of suits with at least three board cards (the only suits two hole cards can make a flush
+    # in). Each player's strength is then the board plus a two-card delta. With a poker.lookup table the board's
+    # rank node is found once too, and a player's non-flush strength is two more hops.
+    def __init__(self, board, table=None):
+        self.board = list(board)
+        self.seen = 0
+        self.rank_counts = [0] * 13
+        self.suit_masks = [0, 0, 0, 0]
+        for card in board:
+            index = CARD_INDEX.get(card)
+            if index is None:
+                raise ValueError("Invalid card in hand")
+            if self.seen >> index & 1:
+                raise ValueError("Duplicate cards in hand")
+            self.seen |= 1 << index
+            self.rank_counts[index >> 2] += 1
+            self.suit_masks[index & 3] |= 1 << (index >> 2)
+        self.rank_mask = self.suit_masks[0] | self.suit_masks[1] | self.suit_masks[2] | self.suit_masks[3]
+        self.flush_suits = [suit for suit in range(4) if POPCOUNT[self.suit_masks[suit]] >= 3]
+        self.table = table
+        if table is not None:
+            self.node = table.node(CARD_INDEX[card] >> 2 for card in board)
+
+    def strength(self, hole):
+        # Same result as evaluate_strength(hole + board) for two hole cards and a three to five card board
+        if len(hole) != 2:
+            raise ValueError("Invalid card in hand")
+        first, second = CARD_INDEX.get(hole[0]), CARD_INDEX.get(hole[1])
+        if first is None or second is None:
+            raise ValueError("Invalid card in hand")
+        if first == second or self.seen >> first & 1 or self.seen >> second & 1:
+            raise ValueError("Duplicate cards in hand")
+        for suit in self.flush_suits:
+            suit_mask = self.suit_masks[suit]
+            if first & 3 == suit:
+                suit_mask |= 1 << (first >> 2)
+            if second & 3 == suit:
+                suit_mask |= 1 << (second >> 2)
+            if POPCOUNT[suit_mask] >= 5:
+                return _flush_strength(suit_mask)
+        if self.table is not None:
+            next_nodes = self.table.next
+            return self.table.values[next_nodes[next_nodes[self.node * 13 + (first >> 2)] * 13 + (second >> 2)]]
+        rank_counts = self.rank_counts.copy()
+        rank_counts[first >> 2] += 1
+        rank_counts[second >> 2] += 1
+        return _rank_strength(rank_counts, self.rank_mask | 1 << (first >> 2) | 1 << (second >> 2))
+
+    def best_five(self, hole, strength):
+        return best_five(list(hole) + self.board, strength)
+
+
+def decode_strength(strength):
+    category = strength >> CATEGORY_SHIFT
+    pattern = CATEGORY_PATTERNS[category]
+    shift = 16
+    ranks = []
+    for _ in pattern:
+        ranks.append(strength >> shift & 0xF)
+        shift -= 4
+    return category, ranks
+
+
+def best_five(cards, strength):
+    category, ranks = decode_strength(strength)
+    if category in (6, 9, 10):
+        suit_counts = Counter(card[1] for card in cards)
+        flush_suit = suit_counts.most_common(1)[0][0]
+        cards = [card for card in cards if card[1] == flush_suit]
+    chosen = []
+    for value, count in zip(ranks, CATEGORY_PATTERNS[category]):
+        rank = RANKS[(value if value > 1 else 14) - 2]
+        chosen.extend([card for card in cards if card[0] == rank][:count])
+    return chosen
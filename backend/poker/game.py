@@ -0,0 +1,95 @@
+from .player import Player
+from .table import HOLDEM, Table
+from .tournament import Tournament
+
+
+class PokerGame:
+    def __init__(self, store=None):
+        self.players = []  # List to store all players
+        self.tables = []  # List to store all tables
+        self.tournaments = []
+        self.store = store  # Optional Store that players and table configs are written behind to
+        if store:
+            self.restore()
+
+    def restore(self):
+        # Loads the stored players and tables. Seats are not stored, so chips a player had at a table are back in
+        # their bankroll, and a hand that was in progress never happened.
+        for name, bankroll, in_game_chips in self.store.load_players():
+            player = Player(name, bankroll + in_game_chips)
+            player.store = self.store
+            self.players.append(player)
+        for name, game_type, max_players, min_buy_in, max_buy_in, small_blind, big_blind, antee \
+                in self.store.load_tables():
+            table = Table(name=name, game_type=game_type, max_players=max_players, min_buy_in=min_buy_in,
+                          max_buy_in=max_buy_in)
+            table.set_blinds(small_blind, big_blind, antee)
+            self.tables.append(table)
+
+    def save_player(self, player):
+        if self.store:
+            self.store.save_player(player)
+
+    def save_table(self, table):
+        # The table's config and the chips of everyone at it; called when a hand ends
+        if self.store:
+            self.store.save_table(table)
+            for player in table.players.values():
+                self.store.save_player(player)
+
+    def create_player(self, name, bankroll):
+        player = Player(name, bankroll)
+        player.store = self.store  # So stand_up, add_on and the other chip changes save themselves
+        self.players.append(player)  # Add player to the list of all players
+        self.save_player(player)
+        return player
+
+    def delete_player(self, name):
+        player = next((p for p in self.players if p.name == name), None)
+        if player:
+            self.players.remove(player)
+            player.store = None
+            for table in list(player.tables):
+                table.remove_player(player)
+            player.close()
+            if self.store:
+                self.store.delete_player(name)
+            return "Player removed", 200
+        return "Player not found", 404
+
+    def update_player_chips(self, name, chips):
+        player = next((p for p in self.players if p.name == name), None)
+        if player:
+            player.bankroll = chips
+            self.save_player(player)
+            return "Player chips updated", 200
+        return "Player not found", 404
+
+    def create_table(self, name, max_players=9, min_buy_in=50, max_buy_in=500, game_type=HOLDEM):
+        table = Table(name=name, game_type=game_type, max_players=max_players, min_buy_in=min_buy_in,
+                      max_buy_in=max_buy_in)
+        self.tables.append(table)
+        self.save_table(table)
+        return table
+
+    def delete_table(self, name):
+        table = next((t for t in self.tables if t.name == name), None)
+        if table:
+            if table.pot:
+                return "A hand is in progress", 400
+            self.tables.remove(table)
+            table.close()
+            if self.store:
+                self.store.delete_table(name)
+            return "Table removed", 200
+        return "Table not found", 404
+
+    def create_tournament(self, name, player_names, **options):
+        # Seats the named players on new tables owned by the tournament (see Tournament for the options)
+        names = set(player_names)
+        entrants = [p for p in self.players if p.name in names]
+        if len(entrants) != len(names):
+            raise ValueError("Unknown player in tournament")
+        tournament = Tournament(name, entrants, **options)
+        self.tournaments.append(tournament)
+        return tournament
@@ -0,0 +1,78 @@
+import random
+
+# Exact ICM visits every set of players that can fill the paid places, once per player; past this many steps
+# (and above EXACT_PLAYERS players) it samples finishing orders instead
+MAX_EXACT_STEPS = 200000
+EXACT_PLAYERS = 12
+MONTE_CARLO_SAMPLES = 10000
+
+
+def _placed_sets(num_players, paid):
+    # Sets of players that fill places 1..k for every k up to paid, i.e. sum of C(n, k)
+    total = 0
+    count = 1
+    for k in range(min(paid, num_players) + 1):
+        total += count
+        count = count * (num_players - k) // (k + 1)
+    return total
+
+
+def icm_exact(stacks, payouts):
+    # Malmuth-Harville: a player finishes next with probability stack / chips of players not yet placed. The
+    # probability of each set of players filling the top places is memoized by bitmask and extended one place
+    # at a time, so the work is O(sets * players) instead of one term per finishing order.
+    num_players = len(stacks)
+    total = sum(stacks)
+    equity = [0.0] * num_players
+    places = {0: (1.0, 0)}  # Mask of placed players -> (probability, their chips)
+    for payout in payouts[:num_players]:
+        following = {}
+        for mask, (probability, placed_chips) in places.items():
+            remaining = total - placed_chips
+            for i in range(num_players):
+                bit = 1 << i
+                if mask & bit or not stacks[i]:
+                    continue
+                share = probability * stacks[i] / remaining
+                equity[i] += share * payout
+                entry = following.get(mask | bit)
+                following[mask | bit] = (share + entry[0] if entry else share, placed_chips + stacks[i])
+        places = following
+        if not places:
+            break
+    return equity
+
+
+def icm_monte_carlo(stacks, payouts, samples=MONTE_CARLO_SAMPLES, seed=None):
+    # Samples finishing orders from the same model: ordering players by Exp(1) / stack draws each next place
+    # with probability proportional to stack (the exponential race is the Plackett-Luce / Harville order)
+    rng = random.Random(seed)
+    live = [i for i, stack in enumerate(stacks) if stack > 0]
+    equity = [0.0] * len(stacks)
+    paid = payouts[:len(live)]
+    for _ in range(samples):
+        order = sorted(live, key=lambda i: rng.expovariate(stacks[i]))
+        for i, payout in zip(order, paid):
+            equity[i] += payout
+    return [value / samples for value in equity]
+
+
+def icm_equity(stacks, payouts, samples=MONTE_CARLO_SAMPLES, seed=None):
+    # Prize-pool equity per stack; payouts[k] is the prize for place k + 1. Players with no chips get nothing.
+    if any(stack < 0 for stack in stacks):
+        raise ValueError("Stacks cannot be negative")
+    if any(payout < 0 for payout in payouts):
+        raise ValueError("Payouts cannot be negative")
+    live = sum(1 for stack in stacks if stack > 0)
+    if not live:
+        raise ValueError("At least one stack must have chips")
+    if live <= EXACT_PLAYERS or _placed_sets(live, len(payouts)) * live <= MAX_EXACT_STEPS:
+        return icm_exact(stacks, payouts)
+    return icm_monte_carlo(stacks, payouts, samples, seed)
+
+
+def table_icm(table, payouts, samples=MONTE_CARLO_SAMPLES, seed=None):
+    # ICM equity of each seated player at table, by seat, from Player.in_game_chips
+    seated = [player for player in table.seats if player is not None]
+    equity = icm_equity([player.in_game_chips for player in seated], payouts, samples, seed)
+    return {player.seat: value for player, value in zip(seated, equity)}
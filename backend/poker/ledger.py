@@ -0,0 +1,254 @@
+import logging
+import os
+import threading
+import time
+from array import array
+
+log = logging.getLogger(__name__)
+
+# Transfer kinds, stored as one byte per journal entry
+DEPOSIT, WITHDRAW, BUY_IN, CASH_OUT, COMMIT, PAYOUT, GRANT, MOVE, ADJUST = range(9)
+KINDS = ('deposit', 'withdraw', 'buy-in', 'cash-out', 'commit', 'payout', 'grant', 'move', 'adjust')
+
+HOUSE = 0  # Chips enter and leave the game through this account, so it holds minus every chip in play
+GLOBAL = 0  # Scope of the house, bankrolls and stacks not seated at a table
+# Journal entries kept; past this the oldest half is dropped (balances are running totals and don't need them)
+JOURNAL_LIMIT = int(os.environ.get('POKER_LEDGER_JOURNAL', '1000000'))
+
+
+class Ledger:
+    # Double-entry record of every chip movement. Accounts (a bankroll, a stack, a pot) are indexes into flat
+    # arrays of running balances, and every transfer is appended to a journal of parallel arrays. Each account
+    # belongs to a scope, one per table plus GLOBAL. A scope keeps the sum of its balances and, separately, the
+    # net chips transfers have moved into it; the two only differ if chips were created or destroyed inside the
+    # scope (an ADJUST posting), so checking a table's conservation is one comparison.
+    def __init__(self, journal_limit=JOURNAL_LIMIT):
+        self.lock = threading.Lock()
+        self.journal_limit = journal_limit
+        self.balances = array('q', [0])
+        self.account_scopes = array('l', [GLOBAL])
+        self.scope_totals = array('q', [0])
+        self.scope_flows = array('q', [0])
+        self.scope_names = ['global']  # None marks a closed scope
+        self.free_scopes = []  # Closed scopes and accounts, reused by the next open
+        self.free_accounts = set()
+        self.sources = array('l')
+        self.destinations = array('l')
+        self.amounts = array('q')
+        self.kinds = array('B')
+        self.dropped = 0  # Journal entries discarded from the front
+
+    def open_scope(self, name):
+        with self.lock:
+            if self.free_scopes:
+                scope = self.free_scopes.pop()
+                self.scope_names[scope] = name
+                return scope
+            self.scope_totals.append(0)
+            self.scope_flows.append(0)
+            self.scope_names.append(name)
+            return len(self.scope_names) - 1
+
+    def open_account(self, scope=GLOBAL):
+        with self.lock:
+            if self.free_accounts:
+                account = self.free_accounts.pop()
+                self.account_scopes[account] = scope
+                return account
+            self.balances.append(0)
+            self.account_scopes.append(scope)
+            return len(self.balances) - 1
+
+    def close_scope(self, scope):
+        # Frees an empty scope for reuse; its accounts must have been closed or moved out. Flows are reset, so a
+        # discrepancy the scope still carried is logged here and goes no further.
+        with self.lock:
+            if scope == GLOBAL or self.scope_names[scope] is None:
+                raise ValueError("Scope is not open")
+            if self.scope_totals[scope]:
+                raise ValueError(f"Scope still holds {self.scope_totals[scope]} chips")
+            if self.scope_flows[scope]:
+                log.warning("Closing %s with chips not conserved: %+d", self.scope_names[scope],
+                            -self.scope_flows[scope])
+                self.scope_flows[scope] = 0
+            self.scope_names[scope] = None
+            self.free_scopes.append(scope)
+
+    def close_account(self, account):
+        # Frees an empty account for reuse
+        with self.lock:
+            if account == HOUSE or account in self.free_accounts:
+                raise ValueError("Account is not open")
+            if self.balances[account]:
+                raise ValueError(f"Account still holds {self.balances[account]} chips")
+            self.account_scopes[account] = GLOBAL
+            self.free_accounts.add(account)
+
+    def _record(self, source, destination, amount, kind):
+        self.sources.append(source)
+        self.destinations.append(destination)
+        self.amounts.append(amount)
+        self.kinds.append(kind)
+        if len(self.kinds) > self.journal_limit:
+            self._truncate()
+
+    def _truncate(self):
+        half = len(self.kinds) // 2
+        for column in (self.sources, self.destinations, self.amounts, self.kinds):
+            del column[:half]
+        self.dropped += half
+
+    def transfer(self, source, destination, amount, kind):
+        with self.lock:
+            balances = self.balances
+            balances[source] -= amount
+            balances[destination] += amount
+            source_scope = self.account_scopes[source]
+            destination_scope = self.account_scopes[destination]
+            if source_scope != destination_scope:
+                totals, flows = self.scope_totals, self.scope_flows
+                totals[source_scope] -= amount
+                flows[source_scope] -= amount
+                totals[destination_scope] += amount
+                flows[destination_scope] += amount
+            # _record, inlined: this is the hot path
+            self.sources.append(source)
+            self.destinations.append(destination)
+            self.amounts.append(amount)
+            self.kinds.append(kind)
+            if len(self.kinds) > self.journal_limit:
+                self._truncate()
+
+    def move(self, account, scope):
+        # Moves an account, with its chips, into another scope (a stack following its player to a table)
+        with self.lock:
+            old_scope = self.account_scopes[account]
+            if old_scope == scope:
+                return
+            balance = self.balances[account]
+            self.scope_totals[old_scope] -= balance
+            self.scope_flows[old_scope] -= balance
+            self.scope_totals[scope] += balance
+            self.scope_flows[scope] += balance
+            self.account_scopes[account] = scope
+            self._record(account, account, balance, MOVE)
+
+    def adjust(self, account, amount):
+        # One-sided posting: chips appear in (or vanish from) account with no counterpart. Only direct writes to a
+        # balance end up here, and the auditor reports the scope they broke.
+        with self.lock:
+            self.balances[account] += amount
+            self.scope_totals[self.account_scopes[account]] += amount
+            self._record(-1, account, amount, ADJUST)
+
+    def balance(self, account):
+        return self.balances[account]
+
+    def total(self, scope):
+        # Chips held in scope: for a table, its pot plus the stacks seated there
+        return self.scope_totals[scope]
+
+    def discrepancy(self, scope):
+        # Chips created (positive) or destroyed inside scope; 0 while it is conserved
+        return self.scope_totals[scope] - self.scope_flows[scope]
+
+    def conserved(self, scope):
+        return self.scope_totals[scope] == self.scope_flows[scope]
+
+    def find_discrepancies(self, start=0, stop=None):
+        # {scope: discrepancy} for open scopes in [start, stop). The slices compare in C; only a mismatching slice
+        # is walked, and each hit is confirmed under the lock since a transfer may have been halfway through.
+        # A closed scope holds zeros, so it never mismatches.
+        stop = len(self.scope_names) if stop is None else stop
+        totals, flows = self.scope_totals[start:stop], self.scope_flows[start:stop]
+        if totals == flows:
+            return {}
+        found = {}
+        for offset, (total, flow) in enumerate(zip(totals, flows)):
+            if total != flow:
+                with self.lock:
+                    difference = self.discrepancy(start + offset)
+                    closed = self.scope_names[start + offset] is None
+                if difference and not closed:
+                    found[start + offset] = difference
+        return found
+
+    def entries(self, first=None):
+        # Journal entries from index first on, as (index, kind, source, destination, amount)
+        with self.lock:
+            first = self.dropped if first is None else max(first, self.dropped)
+            offset = first - self.dropped
+            rows = zip(self.kinds[offset:], self.sources[offset:], self.destinations[offset:],
+                       self.amounts[offset:])
+            return [(first + i, KINDS[kind], source, destination, amount)
+                    for i, (kind, source, destination, amount) in enumerate(rows)]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'accounts': len(self.balances) - len(self.free_accounts),
+                'scopes': len(self.scope_names) - len(self.free_scopes),
+                'entries': self.dropped + len(self.kinds),
+                'journal_entries': len(self.kinds),
+                'chips_issued': -self.balances[HOUSE],
+                'journal_bytes': sum(column.itemsize * len(column)
+                                     for column in (self.sources, self.destinations, self.amounts, self.kinds)),
+            }
+
+
+class Auditor:
+    # Background conservation check over every scope in the ledger. A pass compares the totals and flows in
+    # slices of chunk scopes and sleeps between slices, so it never holds the lock or the interpreter long
+    # enough to stall play; it only locks to confirm a mismatch.
+    def __init__(self, ledger, interval=5.0, chunk=16384):
+        self.ledger = ledger
+        self.interval = interval
+        self.chunk = chunk
+        self.violations = {}  # scope -> discrepancy found by the last pass
+        self.passes = 0
+        self.last_pass_seconds = 0.0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def audit(self):
+        # One pass over all scopes; returns {scope: discrepancy}
+        start_time = time.perf_counter()
+        found = {}
+        for start in range(0, len(self.ledger.scope_names), self.chunk):
+            found.update(self.ledger.find_discrepancies(start, start + self.chunk))
+            time.sleep(0)
+        for scope, difference in found.items():
+            if self.violations.get(scope) != difference:
+                log.warning("Chips not conserved at %s: %+d", self.ledger.scope_names[scope], difference)
+        self.violations = found
+        self.passes += 1
+        self.last_pass_seconds = time.perf_counter() - start_time
+        return found
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.audit()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="ledger-audit", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+    def gauges(self):
+        # Readings for metrics.Registry.add_collector
+        stats = self.ledger.stats()
+        return [
+            ('poker_ledger_entries', "Chip transfers recorded by the ledger", stats['entries']),
+            ('poker_ledger_chips_issued', "Chips deposited or granted into the game", stats['chips_issued']),
+            ('poker_ledger_unconserved_scopes', "Tables whose chips were not conserved at the last audit",
+             len(self.violations)),
+            ('poker_ledger_audit_seconds', "Duration of the last conservation audit", self.last_pass_seconds),
+        ]
+
+
+ledger = Ledger()
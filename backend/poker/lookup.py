@@ -0,0 +1,137 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .evaluator import CARD_INDEX, POPCOUNT, _flush_strength, _rank_strength
+
+log = logging.getLogger(__name__)
+
+# Precomputed hand-strength table, generated by build_lookup_table.py and memory-mapped read-only, so every
+# process that loads it shares the same pages. Without flushes a hand's strength only depends on its rank
+# multiset, so the table is a DAG over rank multisets of up to seven cards: node 0 is the empty hand and
+# NEXT[node * 13 + rank] is the node with one more card of that rank. VALUES[node] is the non-flush strength of
+# the node's ranks, and FLUSH[suit mask] the strength of a flush in a 13-bit suit mask (0 without five cards of
+# the suit). With seven cards or fewer a flush rules out quads and full houses, so a hand's strength is the
+# larger of its node value and its suits' flush values: one hop per card and five reads.
+TABLE_PATH = os.environ.get('POKER_LOOKUP_TABLE', os.path.join(os.path.dirname(__file__), 'hand_ranks.bin'))
+MAGIC = b'PKRLUT01'
+HEADER = struct.Struct('<8sII')  # magic, number of nodes, number of flush entries
+NUM_FLUSH = 8192
+MAX_CARDS = 7
+
+
+def build_tables():
+    # NEXT, VALUES and FLUSH as int32 arrays; nodes are numbered level by level in sorted multiset order
+    levels = [[(0,) * 13]]
+    for _ in range(MAX_CARDS):
+        following = set()
+        for counts in levels[-1]:
+            for rank in range(13):
+                if counts[rank] < 4:
+                    following.add(counts[:rank] + (counts[rank] + 1,) + counts[rank + 1:])
+        levels.append(sorted(following))
+    node_of = {counts: node for node, counts in enumerate(c for level in levels for c in level)}
+
+    next_nodes = array('i', [-1]) * (len(node_of) * 13)
+    values = array('i', [0]) * len(node_of)
+    for counts, node in node_of.items():
+        rank_mask = sum(1 << rank for rank in range(13) if counts[rank])
+        values[node] = _rank_strength(list(counts), rank_mask)
+        for rank in range(13):
+            following = node_of.get(counts[:rank] + (counts[rank] + 1,) + counts[rank + 1:])
+            if following is not None:
+                next_nodes[node * 13 + rank] = following
+    flush = array('i', [_flush_strength(mask) if POPCOUNT[mask] >= 5 else 0 for mask in range(NUM_FLUSH)])
+    return next_nodes, values, flush
+
+
+def build_table(path=TABLE_PATH):
+    # Written to a temporary file and renamed, so a reader never maps a half-written table
+    next_nodes, values, flush = build_tables()
+    if sys.byteorder != 'little':
+        for table in (next_nodes, values, flush):
+            table.byteswap()
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(values), len(flush)))
+        for table in (next_nodes, values, flush):
+            table.tofile(f)
+    os.replace(temporary, path)
+    return path
+
+
+class LookupTable:
+    def __init__(self, path=TABLE_PATH):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buffer) < HEADER.size:
+            self.buffer.close()
+            raise ValueError(f"{path} is too short to be a hand lookup table")
+        magic, num_nodes, num_flush = HEADER.unpack_from(self.buffer)
+        expected_size = HEADER.size + 4 * (14 * num_nodes + num_flush)
+        if magic != MAGIC or num_flush != NUM_FLUSH or len(self.buffer) != expected_size:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a hand lookup table")
+        self.path = path
+        self.num_nodes = num_nodes
+        self.next_offset = HEADER.size
+        self.values_offset = self.next_offset + 4 * 13 * num_nodes
+        self.flush_offset = self.values_offset + 4 * num_nodes
+        words = memoryview(self.buffer)[HEADER.size:].cast('i')
+        self.next = words[:13 * num_nodes]
+        self.values = words[13 * num_nodes:14 * num_nodes]
+        self.flush = words[14 * num_nodes:]
+
+    def node(self, ranks, node=0):
+        # Node reached from node by adding cards of the given ranks
+        next_nodes = self.next
+        for rank in ranks:
+            node = next_nodes[node * 13 + rank]
+        return node
+
+    def strength(self, cards):
+        # Same result as evaluate_strength for 5 to 7 cards
+        next_nodes = self.next
+        flush = self.flush
+        seen = 0
+        node = 0
+        suit_masks = [0, 0, 0, 0]
+        if len(cards) > MAX_CARDS:
+            raise ValueError("Too many cards in hand")
+        for card in cards:
+            index = CARD_INDEX.get(card)
+            if index is None:
+                raise ValueError("Invalid card in hand")
+            if seen >> index & 1:
+                raise ValueError("Duplicate cards in hand")
+            seen |= 1 << index
+            node = next_nodes[node * 13 + (index >> 2)]
+            suit_masks[index & 3] |= 1 << (index >> 2)
+        return max(self.values[node], flush[suit_masks[0]], flush[suit_masks[1]], flush[suit_masks[2]],
+                   flush[suit_masks[3]])
+
+    def arrays(self):
+        # NEXT, VALUES and FLUSH as NumPy views of the mapped pages (NumPy is only needed here)
+        import numpy as np
+        dtype = np.dtype('<i4')
+        return (np.frombuffer(self.buffer, dtype, 13 * self.num_nodes, self.next_offset),
+                np.frombuffer(self.buffer, dtype, self.num_nodes, self.values_offset),
+                np.frombuffer(self.buffer, dtype, NUM_FLUSH, self.flush_offset))
+
+
+def load_table(path=TABLE_PATH):
+    # The mapped table, or None when the file hasn't been built or can't be used (callers then use the
+    # algorithmic evaluator); a bad file must not stop the package from importing
+    if sys.byteorder != 'little' or not os.path.exists(path):
+        return None
+    try:
+        return LookupTable(path)
+    except (OSError, ValueError, struct.error) as e:
+        log.warning("Ignoring hand lookup table %s (%s); rebuild it with build_lookup_table.py", path, e)
+        return None
+
+
+lookup_table = load_table()
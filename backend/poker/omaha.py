@@ -0,0 +1,94 @@
+from itertools import combinations
+
+from .evaluator import CARD_INDEX, CATEGORY_SHIFT, _flush_strength, _rank_strength, best_five
+
+# Rank multisets as one int: a 3-bit count per rank at bit 3 * rank, so adding two multisets is adding codes
+RANK_CODE = [1 << 3 * rank for rank in range(13)]
+
+
+class _FiveRankStrengths(dict):
+    # Non-flush strength of a five-card rank code, filled in as codes come up (there are only 6,175)
+    def __missing__(self, code):
+        rank_counts = [code >> 3 * rank & 7 for rank in range(13)]
+        rank_mask = sum(1 << rank for rank in range(13) if rank_counts[rank])
+        strength = self[code] = _rank_strength(rank_counts, rank_mask)
+        return strength
+
+
+_FIVE_RANKS = _FiveRankStrengths()
+
+
+def _card_indexes(cards):
+    indexes = [CARD_INDEX.get(card) for card in cards]
+    if None in indexes:
+        raise ValueError("Invalid card in hand")
+    if len(set(indexes)) != len(indexes):
+        raise ValueError("Duplicate cards in hand")
+    return indexes
+
+
+class OmahaBoardEvaluator:
+    # Omaha showdowns use exactly two hole cards and three board cards. The board's three-card subsets are worked
+    # out once per showdown: their distinct rank multisets, and per suit the rank masks of the subsets that are
+    # all that suit. Only those can make a flush, and only with two hole cards of the same suit, so the flush
+    # check is skipped for every other (pair, subset) combination. Non-flush strengths only depend on ranks, so
+    # pairs and subsets with the same ranks are scored once.
+    def __init__(self, board):
+        self.board = list(board)
+        indexes = _card_indexes(board)
+        if len(indexes) < 3:
+            raise ValueError("Omaha showdowns need at least three board cards")
+        self.seen = set(indexes)
+        self.triples = []  # (cards, rank code, suit or -1 when mixed, rank mask)
+        self.flush_triples = [[], [], [], []]
+        for triple in combinations(range(len(indexes)), 3):
+            cards = [indexes[i] for i in triple]
+            code = RANK_CODE[cards[0] >> 2] + RANK_CODE[cards[1] >> 2] + RANK_CODE[cards[2] >> 2]
+            mask = 1 << (cards[0] >> 2) | 1 << (cards[1] >> 2) | 1 << (cards[2] >> 2)
+            suit = cards[0] & 3
+            if cards[1] & 3 != suit or cards[2] & 3 != suit:
+                suit = -1
+            else:
+                self.flush_triples[suit].append(mask)
+            self.triples.append(([self.board[i] for i in triple], code, suit, mask))
+        self.triple_codes = set(triple[1] for triple in self.triples)
+
+    def strength(self, hole):
+        indexes = _card_indexes(hole)
+        if len(indexes) != 4:
+            raise ValueError("Omaha hands have four hole cards")
+        if self.seen.intersection(indexes):
+            raise ValueError("Duplicate cards in hand")
+        best = -1
+        pair_codes = set()
+        for first, second in combinations(indexes, 2):
+            pair_codes.add(RANK_CODE[first >> 2] + RANK_CODE[second >> 2])
+            suit = first & 3
+            if second & 3 == suit:
+                pair_mask = 1 << (first >> 2) | 1 << (second >> 2)
+                for triple_mask in self.flush_triples[suit]:
+                    best = max(best, _flush_strength(triple_mask | pair_mask))
+        five_ranks = _FIVE_RANKS
+        triple_codes = self.triple_codes
+        return max(best, max(five_ranks[pair + triple] for pair in pair_codes for triple in triple_codes))
+
+    def best_five(self, hole, strength):
+        # The five cards (two from hole, three from the board) that make strength, matched with the same tables
+        flush = strength >> CATEGORY_SHIFT in (6, 9, 10)
+        for pair in combinations(hole, 2):
+            first, second = CARD_INDEX[pair[0]], CARD_INDEX[pair[1]]
+            pair_code = RANK_CODE[first >> 2] + RANK_CODE[second >> 2]
+            pair_suit = first & 3 if first & 3 == second & 3 else -2
+            pair_mask = 1 << (first >> 2) | 1 << (second >> 2)
+            for cards, code, suit, mask in self.triples:
+                if flush:
+                    found = suit == pair_suit and _flush_strength(mask | pair_mask) == strength
+                else:
+                    found = _FIVE_RANKS[pair_code + code] == strength
+                if found:
+                    return best_five(list(pair) + cards, strength)
+        raise ValueError("No two-plus-three hand has this strength")
+
+
+def omaha_strength(hole, board):
+    return OmahaBoardEvaluator(board).strength(hole)
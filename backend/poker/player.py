@@ -0,0 +1,131 @@
+from .ledger import BUY_IN, CASH_OUT, COMMIT, DEPOSIT, GLOBAL, HOUSE, WITHDRAW, ledger
+
+
+class Player:
+    __slots__ = ('name', 'bankroll_account', 'stack_account', 'hand', 'bet', 'status', 'seat', 'tables', 'store')
+
+    def __init__(self, name, bankroll):
+        self.name = name
+        # Chips live in the ledger: the bankroll, and the stack in play (in_game_chips)
+        self.bankroll_account = ledger.open_account()
+        self.stack_account = ledger.open_account()
+        self.bankroll = bankroll
+        self.hand = []
+        self.bet = 0  # Chips put in the pot this betting round (they are held by the table's pot account)
+        self.status = "standing"  # "standing", "sitting", "playing", "sitting out"
+        self.seat = None  # Player's seat at the table
+        self.tables = []  # List of tables the player has joined
+        self.store = None  # Store of the PokerGame that owns the player; chip changes are written behind to it
+
+    @property
+    def bankroll(self):
+        return ledger.balances[self.bankroll_account]
+
+    @bankroll.setter
+    def bankroll(self, chips):
+        # Setting the bankroll is a cashier deposit or withdrawal against the house
+        change = chips - ledger.balances[self.bankroll_account]
+        if change > 0:
+            ledger.transfer(HOUSE, self.bankroll_account, change, DEPOSIT)
+        elif change < 0:
+            ledger.transfer(self.bankroll_account, HOUSE, -change, WITHDRAW)
+
+    @property
+    def in_game_chips(self):
+        return ledger.balances[self.stack_account]
+
+    @in_game_chips.setter
+    def in_game_chips(self, chips):
+        # Stacks only change through transfers; a direct write is posted one-sided and the audit flags it
+        ledger.adjust(self.stack_account, chips - ledger.balances[self.stack_account])
+
+    def save(self):
+        if self.store:
+            self.store.save_player(self)
+
+    def place_bet(self, amount, table):
+        if amount > self.in_game_chips:
+            return "Insufficient chips", 400
+        ledger.transfer(self.stack_account, table.pot_account, amount, COMMIT)
+        self.bet += amount
+        return "Bet placed", 200
+
+    def close(self):
+        # Cashes the player out of the game and releases their ledger accounts; they must have left every table
+        if self.seat is not None:
+            raise ValueError("Player is still seated")
+        ledger.transfer(self.stack_account, self.bankroll_account, self.in_game_chips, CASH_OUT)
+        self.bankroll = 0
+        ledger.close_account(self.stack_account)
+        ledger.close_account(self.bankroll_account)
+        self.bankroll_account = self.stack_account = None
+
+    def join_table(self, table):
+        table.add_player(self)
+        self.status = "standing"
+        return "Player joined the table", 200
+
+    def leave_table(self, table):
+        if table in self.tables:
+            table.remove_player(self)
+            if len(self.tables) == 0:
+                self.status = "standing"
+            return "Player left the table", 200
+        return "Player not at the table", 400
+
+    def sit_down(self, table, seat, buy_in):
+        if self.status != "standing":
+            return "Player must be standing to take a seat", 400
+        if table not in self.tables:
+            return "Player must join the table before sitting down", 400
+        if buy_in > self.bankroll:
+            return "Insufficient bankroll for the buy-in", 400
+        if seat < 0 or seat >= table.max_players:
+            return "Invalid seat number", 400
+        if table.seats[seat] is not None:
+            return "Seat already taken", 400
+        if buy_in < table.min_buy_in or buy_in > table.max_buy_in:
+            return "Buy-in amount must be between the minimum and maximum buy-in limits", 400
+
+        table.sit_down(self, seat, buy_in)
+        self.save()
+        return "Player took a seat and bought in", 200
+
+    def stand_up(self, table):
+        if self.status != "playing" and self.status != "sitting out":
+            return "Player is not seated", 400
+        table.fold_out(self.seat)
+        ledger.transfer(self.stack_account, self.bankroll_account, self.in_game_chips, CASH_OUT)
+        ledger.move(self.stack_account, GLOBAL)
+        self.status = "standing"
+        table.seat_ring.discard(self.seat)
+        if table.seats[self.seat] is self:
+            table.seats[self.seat] = None
+        self.seat = None
+        self.save()
+        return "Player stood up", 200
+
+    def sit_out(self, table):
+        if self.status != "playing":
+            return "Player is not playing", 400
+        self.status = "sitting out"
+        table.seat_ring.discard(self.seat)
+        return "Player is sitting out", 200
+
+    def rejoin_game(self, table):
+        if self.status != "sitting out":
+            return "Player is not sitting out", 400
+        self.status = "playing"
+        table.seat_ring.add(self.seat)
+        return "Player rejoined the game", 200
+
+    def add_on(self, amount, table):
+        if self.status != "playing":
+            return "Player must be playing to add on chips", 400
+        if self.in_game_chips + amount > table.max_buy_in:
+            return "Add-on amount exceeds the maximum buy-in limit", 400
+        if amount > self.bankroll:
+            return "Insufficient bankroll for the add-on", 400
+        ledger.transfer(self.bankroll_account, self.stack_account, amount, BUY_IN)
+        self.save()
+        return "Add-on successful", 200
@@ -0,0 +1,162 @@
+import logging
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Pending writes are flushed at least this often (seconds), and as soon as this many rows are waiting
+FLUSH_INTERVAL = 0.05
+FLUSH_THRESHOLD = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    bankroll INTEGER NOT NULL,
+    in_game_chips INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tables (
+    name TEXT PRIMARY KEY,
+    game_type TEXT NOT NULL,
+    max_players INTEGER NOT NULL,
+    min_buy_in INTEGER NOT NULL,
+    max_buy_in INTEGER NOT NULL,
+    small_blind INTEGER NOT NULL,
+    big_blind INTEGER NOT NULL,
+    antee INTEGER NOT NULL
+);
+"""
+UPSERTS = {
+    'players': "INSERT OR REPLACE INTO players VALUES (?, ?, ?)",
+    'tables': "INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+
+class Store:
+    # Write-behind SQLite (WAL mode) persistence for players and table configs. Saving only records a snapshot
+    # row in memory, keyed by name, so repeated changes to the same player between flushes collapse into one
+    # row; a background thread writes everything pending in one transaction every flush_interval seconds, or
+    # sooner once flush_threshold rows are waiting. A crash loses at most the writes since the last flush.
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, flush_threshold=FLUSH_THRESHOLD, synchronous='NORMAL'):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.Lock()  # Guards pending
+        self.db_lock = threading.Lock()  # One user of the connection at a time
+        self.pending = {'players': {}, 'tables': {}}  # name -> row, or None for a delete
+        self.flushes = 0
+        self.rows_written = 0
+        self.coalesced = 0
+        self.last_flush_seconds = 0.0
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="store-flush", daemon=True)
+        self.thread.start()
+
+    def _queue(self, kind, name, row):
+        with self.lock:
+            pending = self.pending[kind]
+            if name in pending:
+                self.coalesced += 1
+            pending[name] = row
+            waiting = len(self.pending['players']) + len(self.pending['tables'])
+        if waiting >= self.flush_threshold:
+            self.wake.set()
+
+    def save_player(self, player):
+        self._queue('players', player.name, (player.name, player.bankroll, player.in_game_chips))
+
+    def delete_player(self, name):
+        self._queue('players', name, None)
+
+    def save_table(self, table):
+        blinds = table.blinds
+        self._queue('tables', table.name, (table.name, table.game_type, table.max_players, table.min_buy_in,
+                                           table.max_buy_in, blinds["small_blind"], blinds["big_blind"],
+                                           blinds["antee"]))
+
+    def delete_table(self, name):
+        self._queue('tables', name, None)
+
+    def flush(self):
+        # Writes every pending row in one transaction; returns the number of rows written
+        with self.db_lock:
+            with self.lock:
+                batch = self.pending
+                self.pending = {'players': {}, 'tables': {}}
+            rows = sum(len(pending) for pending in batch.values())
+            if not rows:
+                return 0
+            start_time = time.perf_counter()
+            try:
+                self.connection.execute("BEGIN")
+                for kind, pending in batch.items():
+                    self.connection.executemany(f"DELETE FROM {kind} WHERE name = ?",
+                                                [(name,) for name, row in pending.items() if row is None])
+                    self.connection.executemany(UPSERTS[kind], [row for row in pending.values() if row is not None])
+                self.connection.execute("COMMIT")
+            except sqlite3.Error:
+                self.connection.execute("ROLLBACK")
+                # Requeue the batch under anything written since, which is newer
+                with self.lock:
+                    for kind, pending in batch.items():
+                        for name, row in pending.items():
+                            self.pending[kind].setdefault(name, row)
+                raise
+            self.flushes += 1
+            self.rows_written += rows
+            self.last_flush_seconds = time.perf_counter() - start_time
+            return rows
+
+    def _run(self):
+        while not self.stopped:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                log.exception("Store flush failed; retrying")
+
+    def close(self):
+        # Stops the flush thread and writes what is left
+        self.stopped = True
+        self.wake.set()
+        self.thread.join()
+        self.flush()
+        with self.db_lock:
+            self.connection.close()
+
+    def load_players(self):
+        # [(name, bankroll, in_game_chips)] as last flushed
+        with self.db_lock:
+            return self.connection.execute("SELECT name, bankroll, in_game_chips FROM players").fetchall()
+
+    def load_tables(self):
+        with self.db_lock:
+            return self.connection.execute("SELECT * FROM tables").fetchall()
+
+    def stats(self):
+        with self.lock:
+            waiting = len(self.pending['players']) + len(self.pending['tables'])
+        return {
+            'pending': waiting,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'coalesced': self.coalesced,
+            'last_flush_seconds': self.last_flush_seconds,
+        }
+
+    def gauges(self):
+        # Readings for metrics.Registry.add_collector
+        stats = self.stats()
+        return [
+            ('poker_store_pending_rows', "Rows waiting for the next store flush", stats['pending']),
+            ('poker_store_flushes', "Store flush transactions committed", stats['flushes']),
+            ('poker_store_rows_written', "Rows written by store flushes", stats['rows_written']),
+            ('poker_store_coalesced_writes', "Saves folded into a row already pending", stats['coalesced']),
+            ('poker_store_last_flush_seconds', "Duration of the last store flush", stats['last_flush_seconds']),
+        ]
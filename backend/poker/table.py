@@ -0,0 +1,633 @@
+import secrets
+import time
+import os
+from collections import Counter
+from itertools import islice
+
+from .evaluator import RANKS, SUITS, CATEGORY_SHIFT, ShowdownResult, BoardEvaluator, best_five
+from .cache import strength_cache
+from .lookup import lookup_table
+from .omaha import OmahaBoardEvaluator
+from .ledger import BUY_IN, COMMIT, GLOBAL, PAYOUT, ledger
+from .timing import timed
+
+HOLDEM = "Texas Hold'em"
+OMAHA = "Pot-Limit Omaha"
+HOLE_CARDS = {HOLDEM: 2, OMAHA: 4}
+
+
+class SeatRing:
+    # Set of seat numbers kept as a bitmask, so membership, removal and clockwise neighbour lookups are O(1)
+    __slots__ = ('mask', 'count')
+
+    def __init__(self, seats=()):
+        self.mask = 0
+        self.count = 0
+        for seat in seats:
+            self.add(seat)
+
+    def add(self, seat):
+        bit = 1 << seat
+        if not self.mask & bit:
+            self.mask |= bit
+            self.count += 1
+
+    def discard(self, seat):
+        bit = 1 << seat
+        if self.mask & bit:
+            self.mask &= ~bit
+            self.count -= 1
+
+    def __contains__(self, seat):
+        return seat is not None and seat >= 0 and bool(self.mask >> seat & 1)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def copy(self):
+        ring = SeatRing()
+        ring.mask = self.mask
+        ring.count = self.count
+        return ring
+
+    def clockwise(self, seat):
+        # Members in dealing order, starting with the first one after seat
+        higher = self.mask >> (seat + 1) << (seat + 1)
+        for mask in (higher, self.mask ^ higher):
+            while mask:
+                low = mask & -mask
+                yield low.bit_length() - 1
+                mask ^= low
+
+    def next(self, seat):
+        # First member clockwise after seat (seat itself need not be a member); -1 starts from seat 0
+        higher = self.mask >> (seat + 1) << (seat + 1)
+        if higher:
+            return (higher & -higher).bit_length() - 1
+        if self.mask:
+            return (self.mask & -self.mask).bit_length() - 1
+        return None
+
+
+class Table:
+    __slots__ = ('name', 'game_type', 'max_players', 'min_buy_in', 'max_buy_in', 'blinds', 'dealer_position', 'players',
+                 'seats', 'seat_ring', 'scope', 'pot_account', 'deck', 'community_cards', 'current_phase',
+                 'last_showdown', 'in_hand', 'action_ring', 'call_only', 'to_act', 'current_bet', 'min_raise',
+                 'pending', 'hand_contributions', 'big_blind_seat')
+
+    def __init__(self, name, game_type=HOLDEM, max_players=9, min_buy_in=50, max_buy_in=500):
+        if game_type not in HOLE_CARDS:
+            raise ValueError(f"Unsupported game type {game_type!r}")
+        self.name = name
+        self.game_type = game_type
+        self.max_players = max_players
+        self.min_buy_in = min_buy_in
+        self.max_buy_in = max_buy_in
+        self.blinds = {"small_blind": 0, "big_blind": 0, "antee": 0}
+        self.dealer_position = -1
+        self.players = {}  # Players who have joined the table, by name
+        self.seats = [None] * max_players  # List to store players based on their seat positions
+        self.seat_ring = SeatRing()  # Seats whose player is in the game (not sitting out)
+        self.scope = ledger.open_scope(name)  # Ledger scope holding the pot and the stacks seated here
+        self.pot_account = ledger.open_account(self.scope)
+        self.deck = []
+        self.community_cards = []
+        self.current_phase = "none"
+        self.last_showdown = None
+        self.reset_hand_state()
+
+    @property
+    def pot(self):
+        return ledger.balances[self.pot_account]
+
+    @pot.setter
+    def pot(self, chips):
+        # The pot only changes through transfers; a direct write is posted one-sided and the audit flags it
+        ledger.adjust(self.pot_account, chips - ledger.balances[self.pot_account])
+
+    def chips_in_play(self):
+        # Pot plus seated stacks, from the ledger's running total
+        return ledger.total(self.scope)
+
+    def chips_conserved(self):
+        # O(1): no chip has been created or destroyed at this table
+        return ledger.conserved(self.scope)
+
+    @property
+    def active_players(self):
+        # Players who have bought in and have chips, derived from the seats instead of kept as a parallel list
+        return [player for player in self.seats if player is not None]
+
+    def reset_hand_state(self):
+        self.in_hand = SeatRing()  # Seats dealt into the current hand that have not folded
+        self.action_ring = SeatRing()  # Seats in the hand that can still act (not all-in)
+        self.call_only = SeatRing()  # Seats that acted before a short all-in: they may call or fold, not raise
+        self.to_act = None  # Seat of the player whose turn it is, None when no betting round is open
+        self.current_bet = 0
+        self.min_raise = 0
+        self.pending = 0  # Players that still have to act before the betting round closes
+        self.hand_contributions = [0] * self.max_players
+        self.big_blind_seat = None
+        for player in self.active_players:
+            player.bet = 0
+
+    def set_blinds(self, small_blind, big_blind, antee=0):
+        self.blinds["small_blind"] = small_blind
+        self.blinds["big_blind"] = big_blind
+        self.blinds["antee"] = antee
+
+    def add_player(self, player):
+        self.players[player.name] = player
+        if self not in player.tables:
+            player.tables.append(self)
+
+    def sit_down(self, player, seat, buy_in):
+        if seat < 0 or seat >= self.max_players:
+            raise ValueError("Invalid seat number")
+        if self.seats[seat] is not None:
+            raise ValueError("Seat already taken")
+        if buy_in < self.min_buy_in or buy_in > self.max_buy_in:
+            raise ValueError("Buy-in amount must be between the minimum and maximum buy-in limits")
+        if buy_in > player.bankroll:
+            raise ValueError("Insufficient bankroll for the buy-in")
+        self.seats[seat] = player
+        player.seat = seat
+        ledger.move(player.stack_account, self.scope)
+        ledger.transfer(player.bankroll_account, player.stack_account, buy_in, BUY_IN)
+        player.status = "playing"
+        self.seat_ring.add(seat)
+
+    def remove_player(self, player):
+        if self.players.get(player.name) is player:
+            del self.players[player.name]
+        if player.seat is not None and self.seats[player.seat] == player:
+            self.fold_out(player.seat)
+            self.seats[player.seat] = None
+            self.seat_ring.discard(player.seat)
+            ledger.move(player.stack_account, GLOBAL)  # The stack leaves with the player
+        player.status = "standing"
+        player.seat = None
+        if self in player.tables:
+            player.tables.remove(self)
+
+    def close(self):
+        # Sends everyone away, their stacks with them, and releases the table's ledger scope; the pot must be empty
+        if self.pot:
+            raise ValueError("Chips are still in the pot")
+        for player in set(self.players.values()) | set(self.active_players):
+            self.remove_player(player)
+        ledger.close_account(self.pot_account)
+        ledger.close_scope(self.scope)
+        self.scope = self.pot_account = None
+
+    def set_dealer_position(self, position):
+        if position < 0 or position >= self.max_players or self.seats[position] is None:
+            raise ValueError("Invalid dealer position")
+        self.dealer_position = position
+
+    def next_dealer(self):
+        if not self.seat_ring:
+            raise ValueError("No players in game")
+        self.dealer_position = self.seat_ring.next(self.dealer_position)
+
+    def collect_blinds(self, allow_short=False):
+        # With allow_short (tournaments) a stack smaller than its blind or ante posts what it has and is all-in
+        if self.dealer_position == -1 or len(self.seat_ring) < 2:
+            raise ValueError("Not enough players to collect blinds")
+
+        if len(self.seat_ring) == 2 and self.dealer_position in self.seat_ring:
+            small_blind_position = self.dealer_position
+        else:
+            small_blind_position = self.seat_ring.next(self.dealer_position)
+        big_blind_position = self.seat_ring.next(small_blind_position)
+
+        small_blind_player = self.seats[small_blind_position]
+        big_blind_player = self.seats[big_blind_position]
+
+        if not allow_short:
+            if small_blind_player.in_game_chips < self.blinds["small_blind"]:
+                raise ValueError("Small blind player does not have enough chips")
+            if big_blind_player.in_game_chips < self.blinds["big_blind"]:
+                raise ValueError("Big blind player does not have enough chips")
+
+        self._commit_chips(small_blind_player, min(self.blinds["small_blind"], small_blind_player.in_game_chips))
+        self._commit_chips(big_blind_player, min(self.blinds["big_blind"], big_blind_player.in_game_chips))
+        self.big_blind_seat = big_blind_position
+
+        for seat in self.seat_ring:
+            antee = self.blinds["antee"]
+            if allow_short:
+                antee = min(antee, self.seats[seat].in_game_chips)
+            ledger.transfer(self.seats[seat].stack_account, self.pot_account, antee, COMMIT)
+            self.hand_contributions[seat] += antee
+
+    def _commit_chips(self, player, amount):
+        ledger.transfer(player.stack_account, self.pot_account, amount, COMMIT)
+        player.bet += amount
+        self.hand_contributions[player.seat] += amount
+
+    def _split(self, amount, players):
+        # Even shares of amount; the odd chips go one each to the first players clockwise from the dealer. A
+        # winner without a seat (a joined player who bet through handle_bet) comes after them, in list order.
+        order = sorted(players, key=lambda player: self.max_players if player.seat is None
+                       else (player.seat - self.dealer_position - 1) % self.max_players)
+        share, odd = divmod(amount, len(order))
+        return [(player, share + (i < odd)) for i, player in enumerate(order)]
+
+    def _pay(self, players, amount, payouts):
+        for player, share in self._split(amount, players):
+            ledger.transfer(self.pot_account, player.stack_account, share, PAYOUT)
+            payouts[player.name] = payouts.get(player.name, 0) + share
+
+    def distribute_pot(self, winners):
+        # Pays the whole pot to winners and returns {name: chips paid}
+        payouts = {}
+        self._pay(winners, self.pot, payouts)
+        return payouts
+
+    @timed('create_deck')
+    def create_deck(self, rng=None):
+        deck = [rank + suit for rank in RANKS for suit in SUITS]
+        if rng is None:  # Simulations pass a seeded random.Random to replay a run
+            seed = secrets.randbits(64) ^ int(time.time() * 1000000) ^ os.getpid()
+            rng = secrets.SystemRandom(seed)
+        rng.shuffle(deck)
+        self.deck = deck
+        self.community_cards = []
+        self.current_phase = "none"
+        self.reset_hand_state()
+
+    def deal_cards(self, num_players):
+        if num_players < 2 or num_players > self.max_players:
+            return "Number of players must be between 2 and " + str(self.max_players), 400
+        hole_cards = HOLE_CARDS[self.game_type]
+        if num_players * hole_cards > len(self.deck):
+            return "Not enough cards in the deck", 400
+
+        if len(self.seat_ring) < num_players:
+            return "Not enough active players", 400
+
+        if self.dealer_position not in self.seat_ring:
+            self.next_dealer()  # Ensure dealer position is set
+        self.in_hand = self.seat_ring.copy()
+        self.action_ring = SeatRing()
+        order = [self.seats[seat] for seat in self.seat_ring.clockwise(self.dealer_position)]
+        for player in order:
+            player.hand = [self.deck.pop()]
+            if player.in_game_chips > 0:
+                self.action_ring.add(player.seat)
+        for _ in range(hole_cards - 1):
+            for player in order:
+                player.hand.append(self.deck.pop())
+        self.current_phase = "pre-flop"
+        self.start_betting_round()
+        return {player.name: {'hand': player.hand, 'bankroll': player.bankroll, 'in_game_chips': player.in_game_chips,
+                              'bet': player.bet} for player in order}
+
+    def deal_flop(self):
+        if self.current_phase != "pre-flop":
+            return "Invalid game phase", 400
+        if self.to_act is not None:
+            return "Betting round still open", 400
+        burn = self.deck.pop()
+        self.community_cards = [self.deck.pop() for _ in range(3)]
+        self.current_phase = "flop"
+        self.start_betting_round()
+        return self.community_cards
+
+    def deal_turn(self):
+        if self.current_phase != "flop":
+            return "Invalid game phase", 400
+        if self.to_act is not None:
+            return "Betting round still open", 400
+        burn = self.deck.pop()
+        self.community_cards.append(self.deck.pop())
+        self.current_phase = "turn"
+        self.start_betting_round()
+        return self.community_cards
+
+    def deal_river(self):
+        if self.current_phase != "turn":
+            return "Invalid game phase", 400
+        if self.to_act is not None:
+            return "Betting round still open", 400
+        burn = self.deck.pop()
+        self.community_cards.append(self.deck.pop())
+        self.current_phase = "river"
+        self.start_betting_round()
+        if not self.active_players:
+            return "No players in game", 400
+        return self.community_cards
+
+    @timed('evaluate_hand')
+    def evaluate_hand(self, hand):
+        values = '--23456789TJQKA'
+        suits = 'CDHS'
+
+        if any(len(card) != 2 or card[0] not in values or card[1] not in suits for card in hand):
+            raise ValueError("Invalid card in hand")
+
+        if len(hand) != len(set(hand)):
+            raise ValueError("Duplicate cards in hand")
+
+        sorted_ranks = sorted([values.index(r) for r, s in hand], reverse=True)
+        rank_counts = Counter(sorted_ranks)
+        sorted_rank_counts = sorted(rank_counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
+
+        is_flush = len(set(s for r, s in hand)) == 1
+
+        is_straight = len(set(sorted_ranks)) == 5 and (sorted_ranks[0] - sorted_ranks[-1] == 4 or sorted_ranks == [14, 5, 4, 3, 2])
+
+        if is_straight and is_flush:
+            if sorted_ranks == [14, 13, 12, 11, 10]:
+                return (10, sorted_ranks)
+            else:
+                return (9, sorted_ranks if sorted_ranks != [14, 5, 4, 3, 2] else [5, 4, 3, 2, 1])
+        elif sorted_rank_counts[0][1] == 4:
+            four_kind = sorted_rank_counts[0][0]
+            kicker = sorted_rank_counts[1][0]
+            return (8, [four_kind, kicker])
+        elif sorted_rank_counts[0][1] == 3 and sorted_rank_counts[1][1] == 2:
+            three_kind = sorted_rank_counts[0][0]
+            pair = sorted_rank_counts[1][0]
+            return (7, [three_kind, pair])
+        elif is_flush:
+            return (6, sorted_ranks)
+        elif is_straight:
+            return (5, sorted_ranks if sorted_ranks != [14, 5, 4, 3, 2] else [5, 4, 3, 2, 1])
+        elif sorted_rank_counts[0][1] == 3:
+            three_kind = sorted_rank_counts[0][0]
+            kickers = [rank for rank, count in sorted_rank_counts if count == 1]
+            return (4, [three_kind] + kickers)
+        elif sorted_rank_counts[0][1] == 2 and sorted_rank_counts[1][1] == 2:
+            pairs = [rank for rank, count in sorted_rank_counts if count == 2]
+            kicker = [rank for rank, count in sorted_rank_counts if count == 1][0]
+            return (3, pairs + [kicker])
+        elif sorted_rank_counts[0][1] == 2:
+            pair = sorted_rank_counts[0][0]
+            kickers = [rank for rank, count in sorted_rank_counts if count == 1]
+            return (2, [pair] + kickers)
+        else:
+            return (1, sorted_ranks)
+
+    @timed('best_hand')
+    def best_hand(self, hand):
+        # The strength comes from the shared cache; the five cards are listed in the order they were given
+        all_cards = hand + self.community_cards
+        if self.game_type == OMAHA:
+            board_evaluator = OmahaBoardEvaluator(self.community_cards)
+            chosen = board_evaluator.best_five(hand, board_evaluator.strength(hand))
+            return tuple(card for card in all_cards if card in chosen)
+        chosen = best_five(all_cards, strength_cache.strength(all_cards))
+        return tuple(card for card in all_cards if card in chosen)
+
+    def showdown(self):
+        # The river's betting round has to close before the hand is shown down
+        if self.current_phase != "river":
+            return "Invalid game phase", 400
+        if self.to_act is not None:
+            return "Betting round still open", 400
+        result = self.determine_winner()
+        if isinstance(result, ShowdownResult):
+            self.current_phase = "finished"
+        return result
+
+    @timed('determine_winner')
+    def determine_winner(self):
+        if not self.active_players:
+            return "No players in game", 400
+
+        if self.game_type == OMAHA:
+            board_evaluator = OmahaBoardEvaluator(self.community_cards)
+        else:
+            board_evaluator = BoardEvaluator(self.community_cards, lookup_table)
+        strengths = {}
+        seat_strengths = {}
+        winners = []
+        best_strength = -1
+        seats = self.seats
+        evaluate = board_evaluator.strength
+        for seat in self.in_hand:
+            player = seats[seat]
+            strength = evaluate(player.hand)
+            strengths[player.name] = strength
+            seat_strengths[seat] = strength
+            if strength > best_strength:
+                best_strength = strength
+                winners = [player]
+            elif strength == best_strength:
+                winners.append(player)
+
+        if not winners:
+            return "No valid hands", 400
+
+        payouts = self.settle_pots(seat_strengths, winners)
+        self.last_showdown = ShowdownResult(winners, strengths, best_strength >> CATEGORY_SHIFT,
+                                            board_evaluator.best_five(winners[0].hand, best_strength), payouts)
+        self.to_act = None
+        return self.last_showdown
+
+    def settle_pots(self, seat_strengths, winners):
+        # Pay each contribution layer (main pot, then side pots) to the best eligible hand; anything not
+        # covered by recorded contributions goes to the overall winners
+        payouts = {}
+        levels = sorted(set(c for c in self.hand_contributions if c > 0))
+        previous = 0
+        for level in levels:
+            contributors = [seat for seat, c in enumerate(self.hand_contributions) if c >= level]
+            eligible = [seat for seat in contributors if seat in seat_strengths]
+            if eligible:
+                best = max(seat_strengths[seat] for seat in eligible)
+                layer_winners = [seat for seat in eligible if seat_strengths[seat] == best]
+                self._pay([self.seats[seat] for seat in layer_winners], (level - previous) * len(contributors),
+                          payouts)
+            previous = level
+        if self.pot > 0:
+            self._pay(winners, self.pot, payouts)
+        return payouts
+
+    def handle_bet(self, player_name, amount):
+        player = self.players.get(player_name)
+        if not player:
+            return "Player not found", 404
+        message, status = player.place_bet(amount, self)
+        if status == 200:
+            if player.seat is not None:
+                self.hand_contributions[player.seat] += amount
+        return message, status
+
+    def start_betting_round(self):
+        if self.current_phase != "pre-flop":
+            for seat in self.in_hand:
+                self.seats[seat].bet = 0
+            self.current_bet = 0
+            start = self.dealer_position
+        else:
+            self.current_bet = max((self.seats[seat].bet for seat in self.in_hand), default=0)
+            start = self.big_blind_seat if self.big_blind_seat is not None else self.dealer_position
+        self.min_raise = max(self.blinds["big_blind"], 1)
+        self.call_only = SeatRing()
+        self.pending = len(self.action_ring)
+        self.to_act = self.action_ring.next(start)
+        if self.pending == 0 or (self.pending == 1 and self.seats[self.to_act].bet >= self.current_bet):
+            self.pending = 0
+            self.to_act = None
+
+    def pot_limit(self, to_call):
+        # Most chips one action may add: calling, then raising the size of the pot after the call. None when
+        # the game is no-limit.
+        if self.game_type != OMAHA:
+            return None
+        return to_call + self.pot + to_call
+
+    def legal_actions(self):
+        state = {'phase': self.current_phase, 'pot': self.pot, 'current_bet': self.current_bet, 'to_act': None,
+                 'actions': []}
+        if self.to_act is None:
+            return state
+        player = self.seats[self.to_act]
+        to_call = self.current_bet - player.bet
+        chips = player.in_game_chips
+        max_raise = chips
+        limit = self.pot_limit(to_call)
+        if limit is not None:
+            max_raise = min(max_raise, limit)
+        actions = ['fold', 'call' if to_call > 0 else 'check']
+        if not self.can_raise(self.to_act, to_call):
+            max_raise = min(max_raise, to_call)
+        elif chips > to_call:
+            actions.append('raise' if self.current_bet > 0 else 'bet')
+        if max_raise == chips:
+            actions.append('all-in')
+        # Raise amounts are the chips added by this action, matching the 'amount' field of /bet
+        state.update({
+            'to_act': player.name,
+            'seat': self.to_act,
+            'actions': actions,
+            'to_call': min(to_call, chips),
+            'min_raise': min(to_call + self.min_raise, max_raise),
+            'max_raise': max_raise,
+        })
+        return state
+
+    def can_raise(self, seat, to_call):
+        # A player held to call or fold by a short all-in may raise again once all-ins add up to a full raise
+        return seat not in self.call_only or to_call >= self.min_raise
+
+    def player_action(self, player_name, action, amount=0):
+        seat = self.to_act
+        if seat is None:
+            if player_name not in self.players:
+                return "Player not found", 404
+            return "No betting round in progress", 400
+        player = self.seats[seat]
+        if player.name != player_name:
+            if player_name not in self.players:
+                return "Player not found", 404
+            return f"It is {player.name}'s turn", 400
+
+        to_call = self.current_bet - player.bet
+        chips = player.in_game_chips
+        reopened = short = False
+        if action == 'fold':
+            self.in_hand.discard(seat)
+            self.action_ring.discard(seat)
+            message = f'{player_name} folded'
+        elif action == 'check':
+            if to_call > 0:
+                return "Cannot check facing a bet", 400
+            message = f'{player_name} checked'
+        elif action == 'call':
+            if to_call == 0:
+                return "Nothing to call", 400
+            self._commit_chips(player, min(to_call, chips))
+            message = f'{player_name} called'
+        elif action in ('bet', 'raise', 'all-in'):
+            if action == 'all-in':
+                amount = chips
+            if not isinstance(amount, int) or amount <= 0:
+                return "Invalid bet amount", 400
+            if amount > chips:
+                return "Insufficient chips", 400
+            limit = self.pot_limit(to_call)
+            if limit is not None and amount > limit:
+                return f"Pot limit is {limit}", 400
+            if amount > to_call and not self.can_raise(seat, to_call):
+                return "Betting was not reopened: call or fold", 400
+            new_total = player.bet + amount
+            if amount < chips:
+                if new_total <= self.current_bet:
+                    return "Raise must exceed the current bet", 400
+                if new_total < self.current_bet + self.min_raise:
+                    return f"Minimum raise is {to_call + self.min_raise}", 400
+            self._commit_chips(player, amount)
+            if new_total > self.current_bet:
+                # Only a full raise reopens the betting; a short all-in still moves the price
+                if new_total - self.current_bet >= self.min_raise:
+                    self.min_raise = new_total - self.current_bet
+                    reopened = True
+                else:
+                    short = True
+                self.current_bet = new_total
+            message = f'{player_name} went all-in' if player.in_game_chips == 0 else f'{player_name} bet {amount}'
+        else:
+            return "Invalid action", 400
+
+        if player.in_game_chips == 0:
+            self.action_ring.discard(seat)
+        self.call_only.discard(seat)
+        if reopened:
+            self.call_only = SeatRing()
+            self.pending = len(self.action_ring) - (1 if seat in self.action_ring else 0)
+        elif short:
+            # The next pending - 1 seats clockwise have yet to act; everyone else already has and now owes the
+            # difference, so they act again with only call or fold
+            waiting = set(islice(self.action_ring.clockwise(seat), self.pending - 1))
+            for other in self.action_ring:
+                if other not in waiting:
+                    self.call_only.add(other)
+            self.pending = len(self.action_ring)
+        else:
+            self.pending -= 1
+
+        if len(self.in_hand) == 1:
+            self._award_uncontested()
+        elif self.pending <= 0 or not self.action_ring:
+            self.to_act = None
+        else:
+            self.to_act = self.action_ring.next(seat)
+        return message, 200
+
+    def fold_out(self, seat):
+        # A player leaving the table mid-hand folds: their chips stay in the pot and the betting moves on without
+        # them. Called before the seat is freed.
+        if seat not in self.in_hand or self.current_phase in ("none", "finished"):
+            return
+        if self.to_act is not None and seat in self.action_ring:
+            waiting = islice(self.action_ring.clockwise(self.to_act), self.pending - 1)
+            if seat == self.to_act or seat in waiting:
+                self.pending -= 1
+        self.in_hand.discard(seat)
+        self.action_ring.discard(seat)
+        self.call_only.discard(seat)
+        if len(self.in_hand) == 1:
+            self._award_uncontested()
+        elif self.to_act is not None:
+            if self.pending <= 0 or not self.action_ring:
+                self.to_act = None
+            elif seat == self.to_act:
+                self.to_act = self.action_ring.next(seat)
+
+    def _award_uncontested(self):
+        winner = self.seats[next(iter(self.in_hand))]
+        payouts = self.distribute_pot([winner])
+        self.last_showdown = ShowdownResult([winner], {}, None, [], payouts)
+        self.to_act = None
+        self.current_phase = "finished"
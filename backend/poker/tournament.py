@@ -0,0 +1,201 @@
+import heapq
+import random
+
+from .evaluator import RANKS
+from .ledger import CASH_OUT, GRANT, HOUSE, ledger
+from .table import Table
+
+# (small blind, big blind, ante) per level; the last level repeats once the schedule runs out
+DEFAULT_LEVELS = [
+    (10, 20, 0), (15, 30, 0), (25, 50, 0), (50, 100, 10), (75, 150, 15), (100, 200, 25), (150, 300, 40),
+    (200, 400, 50), (300, 600, 75), (400, 800, 100), (600, 1200, 150), (800, 1600, 200), (1000, 2000, 300),
+    (1500, 3000, 400), (2000, 4000, 500), (3000, 6000, 750), (4000, 8000, 1000), (6000, 12000, 1500),
+    (8000, 16000, 2000), (12000, 24000, 3000), (16000, 32000, 4000), (25000, 50000, 6000),
+]
+
+
+def push_fold(table, player, state):
+    # Default decision: shove pairs, aces and two broadway cards, call a shove with 77+, AT+ and KQ, else fold
+    # (or check when there is nothing to call)
+    high, low = sorted((RANKS.index(card[0]) for card in player.hand), reverse=True)
+    facing_shove = state['to_call'] > 0 and state['current_bet'] > table.blinds["big_blind"]
+    if facing_shove:
+        play = high == low and high >= RANKS.index('7') or high == 12 and low >= RANKS.index('T') or \
+            (high, low) == (11, 10)
+    else:
+        play = high == low or high == 12 or low >= RANKS.index('T')
+    if play:
+        return 'all-in'
+    return 'fold' if state['to_call'] > 0 else 'check'
+
+
+class Tournament:
+    # A multi-table tournament over ordinary Tables. Every round each table plays one hand; then busted players
+    # are placed, tables are broken or balanced, and the blind level moves on every hands_per_level rounds.
+    # Table occupancy is kept in two heaps (fewest and most players) with lazy invalidation: a table's entries
+    # are pushed again whenever its count changes and stale ones are dropped when they reach the top, so a
+    # balancing decision costs O(log tables) instead of a scan over every table.
+    def __init__(self, name, players, starting_stack=1500, levels=DEFAULT_LEVELS, hands_per_level=10,
+                 seats_per_table=9, decide=push_fold, seed=None):
+        if len(players) < 2:
+            raise ValueError("A tournament needs at least two players")
+        if seats_per_table < 2:
+            raise ValueError("Tournament tables need at least two seats")
+        seated = [player.name for player in players if player.seat is not None]
+        if seated:
+            raise ValueError(f"Players seated at a table can't enter a tournament: {', '.join(seated)}")
+        self.name = name
+        self.levels = levels
+        self.hands_per_level = hands_per_level
+        self.seats_per_table = seats_per_table
+        self.decide = decide
+        self.rng = random.Random(seed)
+        self.level = 0
+        self.rounds = 0
+        self.hands_played = 0
+        self.players_left = len(players)
+        self.finishes = []  # Busted players' names, first out first
+        self.moves = 0  # Players moved by balancing or table breaking
+        self.tables = []
+        self.occupancy = {}  # Index in self.tables -> seated players, for tables still running
+        self.fewest = []  # Heap of (players, table index)
+        self.most = []  # Heap of (-players, table index)
+
+        num_tables = -(-len(players) // seats_per_table)
+        for index in range(num_tables):
+            table = Table(name=f"{name} #{index + 1}", max_players=seats_per_table, min_buy_in=0,
+                          max_buy_in=starting_stack)
+            self.tables.append(table)
+        shuffled = list(players)
+        self.rng.shuffle(shuffled)
+        for i, player in enumerate(shuffled):
+            table = self.tables[i % num_tables]
+            # Chips left in an unseated stack are the player's own: they go back to the bankroll, and the
+            # tournament stack starts empty
+            ledger.transfer(player.stack_account, player.bankroll_account, player.in_game_chips, CASH_OUT)
+            self._seat(table, player, i // num_tables)
+            ledger.transfer(HOUSE, player.stack_account, starting_stack, GRANT)
+        for index, table in enumerate(self.tables):
+            table.set_dealer_position(self.rng.choice(list(table.seat_ring)))
+            self._update(index)
+
+    @property
+    def blinds(self):
+        return self.levels[min(self.level, len(self.levels) - 1)]
+
+    def _seat(self, table, player, seat):
+        # Tournament chips don't come from the bankroll: they are granted once and the stack moves with the player
+        table.add_player(player)
+        table.seats[seat] = player
+        player.seat = seat
+        ledger.move(player.stack_account, table.scope)
+        player.status = "playing"
+        table.seat_ring.add(seat)
+
+    def _update(self, index):
+        count = len(self.tables[index].seat_ring)
+        self.occupancy[index] = count
+        heapq.heappush(self.fewest, (count, index))
+        heapq.heappush(self.most, (-count, index))
+        # Stale entries pile up with every change; rebuild once they dominate the heaps
+        if len(self.fewest) > 4 * len(self.occupancy) + 16:
+            self.fewest = [(count, index) for index, count in self.occupancy.items()]
+            self.most = [(-count, index) for index, count in self.occupancy.items()]
+            heapq.heapify(self.fewest)
+            heapq.heapify(self.most)
+
+    def _top(self, heap, sign):
+        # Table index at the top of heap, skipping entries for broken tables or out-of-date counts
+        while True:
+            key, index = heap[0]
+            if self.occupancy.get(index) == sign * key:
+                return index
+            heapq.heappop(heap)
+
+    def _move(self, source, destination):
+        # Moves the player due to post the big blind next at source to the first free seat at destination
+        table = self.tables[source]
+        seat = table.seat_ring.next(table.seat_ring.next(table.dealer_position))
+        player = table.seats[seat]
+        table.remove_player(player)
+        target = self.tables[destination]
+        self._seat(target, player, target.seats.index(None))
+        self.moves += 1
+
+    def balance(self):
+        # Break the shortest table while the others can hold everyone, then even out counts to within one. A
+        # one-player table can only remain beside other tables when they are all full heads-up tables.
+        while len(self.occupancy) > -(-self.players_left // self.seats_per_table):
+            broken = self._top(self.fewest, 1)
+            del self.occupancy[broken]
+            while self.tables[broken].seat_ring:
+                destination = self._top(self.fewest, 1)
+                self._move(broken, destination)
+                self._update(destination)
+            self.tables[broken].close()
+        while True:
+            fewest, most = self._top(self.fewest, 1), self._top(self.most, -1)
+            if self.occupancy[most] - self.occupancy[fewest] <= 1:
+                return
+            self._move(most, fewest)
+            self._update(most)
+            self._update(fewest)
+
+    def play_hand(self, table):
+        # One hand with the current blinds, driven by self.decide; returns the players it knocked out
+        small_blind, big_blind, antee = self.blinds
+        table.set_blinds(small_blind, big_blind, antee)
+        table.create_deck(self.rng)
+        table.next_dealer()
+        starting_chips = {seat: table.seats[seat].in_game_chips for seat in table.seat_ring}
+        table.collect_blinds(allow_short=True)
+        table.deal_cards(len(table.seat_ring))
+        for deal in (None, table.deal_flop, table.deal_turn, table.deal_river):
+            if deal:
+                deal()
+            while table.to_act is not None:
+                player = table.seats[table.to_act]
+                state = table.legal_actions()
+                action = self.decide(table, player, state)
+                if action not in state['actions']:
+                    action = 'check' if 'check' in state['actions'] else 'fold'
+                table.player_action(player.name, action)
+            if table.current_phase == "finished":
+                break
+        if table.current_phase != "finished":
+            table.determine_winner()
+        busted = [table.seats[seat] for seat in starting_chips if table.seats[seat].in_game_chips == 0]
+        # Players knocked out in the same hand finish in order of the chips they started it with
+        busted.sort(key=lambda player: starting_chips[player.seat])
+        for player in busted:
+            table.remove_player(player)
+        self.hands_played += 1
+        return busted
+
+    def play_round(self):
+        for index in list(self.occupancy):
+            # Heads-up tables can't always seat an odd field in pairs: a table left with one player sits the
+            # round out until balancing brings it an opponent
+            if self.occupancy[index] < 2:
+                continue
+            busted = self.play_hand(self.tables[index])
+            if busted:
+                self.finishes.extend(player.name for player in busted)
+                self.players_left -= len(busted)
+                self._update(index)
+        self.balance()
+        self.rounds += 1
+        if self.rounds % self.hands_per_level == 0:
+            self.level += 1
+        return self.players_left
+
+    def run(self, max_rounds=None):
+        # Plays rounds until one player has every chip; returns the standings, winner first
+        while self.players_left > 1 and (max_rounds is None or self.rounds < max_rounds):
+            self.play_round()
+        return self.standings()
+
+    def standings(self):
+        remaining = [player for index in self.occupancy for player in self.tables[index].active_players]
+        remaining.sort(key=lambda player: player.in_game_chips, reverse=True)
+        return [player.name for player in remaining] + self.finishes[::-1]
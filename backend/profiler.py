@@ -0,0 +1,118 @@
+import inspect
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 60
+DEFAULT_INTERVAL_MS = 10
+
+
+class StackSampler:
+    # Samples every other thread's Python stack at a fixed interval from a background thread and counts
+    # collapsed stacks ("outer;...;leaf"). Stacks running inside a method of `labelled_class` start with
+    # "table:<name>" so a flame graph groups them per table.
+    def __init__(self, interval=DEFAULT_INTERVAL_MS / 1000, labelled_class=None):
+        self.interval = interval
+        self.labelled_class = labelled_class
+        self.label_codes = set()
+        if labelled_class is not None:
+            for _, member in inspect.getmembers(labelled_class, inspect.isfunction):
+                self.label_codes.add(inspect.unwrap(member).__code__)
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.elapsed = 0.0
+        self._ignored = set()
+        self._names = {}
+        self._stop = threading.Event()
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread in threading.enumerate():
+            self._names[thread.ident] = thread.name
+        for ident, frame in frames.items():
+            if ident in self._ignored:
+                continue
+            names = []
+            label = None
+            while frame is not None:
+                code = frame.f_code
+                if label is None and code in self.label_codes:
+                    owner = frame.f_locals.get('self')
+                    if isinstance(owner, self.labelled_class):
+                        label = f"table:{owner.name}"
+                names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            names.append(self._names.get(ident, f"thread-{ident}"))
+            if label:
+                names.append(label)
+            self.stacks[";".join(reversed(names))] += 1
+        self.samples += 1
+
+    def _run(self):
+        self._ignored.add(threading.get_ident())
+        next_sample = time.perf_counter()
+        while not self._stop.is_set():
+            start_time = time.perf_counter()
+            self.sample()
+            self.sampling_time += time.perf_counter() - start_time
+            next_sample += self.interval
+            self._stop.wait(max(next_sample - time.perf_counter(), 0))
+
+    def profile(self, seconds):
+        # Blocks the calling thread (left out of the profile) for `seconds` while the sampler runs
+        self._ignored.add(threading.get_ident())
+        self._stop.clear()
+        sampler = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        start_time = time.perf_counter()
+        sampler.start()
+        self._stop.wait(seconds)
+        self._stop.set()
+        sampler.join()
+        self.elapsed = time.perf_counter() - start_time
+        return self.stacks
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def overhead(self):
+        # Fraction of wall time spent taking samples
+        return self.sampling_time / self.elapsed if self.elapsed else 0.0
+
+
+_profile_lock = threading.Lock()
+
+
+def init_app(app, labelled_class=None):
+    # Enabled only when POKER_ADMIN_TOKEN is set; callers pass it as "Authorization: Bearer <token>"
+    from flask import Response, jsonify, request
+
+    @app.route('/admin/profile', methods=['GET'])
+    def admin_profile():
+        token = os.environ.get('POKER_ADMIN_TOKEN')
+        if not token:
+            return jsonify({'message': 'Profiling is disabled'}), 404
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not secrets.compare_digest(supplied.encode(), token.encode()):
+            return jsonify({'message': 'Forbidden'}), 403
+        try:
+            seconds = float(request.args.get('seconds', 5))
+            interval = float(request.args.get('interval', DEFAULT_INTERVAL_MS)) / 1000
+        except ValueError:
+            return jsonify({'message': 'Invalid seconds or interval'}), 400
+        if not 0 < seconds <= MAX_SECONDS or interval < 0.001:
+            return jsonify({'message': f'seconds must be in (0, {MAX_SECONDS}] and interval at least 1 ms'}), 400
+        if not _profile_lock.acquire(blocking=False):
+            return jsonify({'message': 'A profile is already running'}), 409
+        try:
+            sampler = StackSampler(interval, labelled_class)
+            sampler.profile(seconds)
+        finally:
+            _profile_lock.release()
+        response = Response(sampler.collapsed(), mimetype='text/plain')
+        response.headers['X-Profile-Samples'] = str(sampler.samples)
+        response.headers['X-Profile-Overhead'] = f"{sampler.overhead():.4f}"
+        return response
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from poker import RANKS
+from equity import COMBOS, COMBO_MASKS
+from headless_engine import evaluate_strength_batch
+
+EQUITY_PATH = os.environ.get('POKER_PREFLOP_EQUITY', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                 'Statistics', 'preflop_equity.npz'))
+ITERATIONS = 2000
+
+
+def _hand_classes():
+    # The 169 starting-hand classes in chart order (AA, AKs, AKo, AQs, ... 22) and the class of every combo
+    names = []
+    index = {}
+    for high in range(12, -1, -1):
+        for low in range(high, -1, -1):
+            for suited in ((None,) if high == low else (True, False)):
+                index[high, low, suited] = len(names)
+                names.append(RANKS[high] + RANKS[low] + ('' if suited is None else 's' if suited else 'o'))
+    combo_class = np.empty(len(COMBOS), dtype=np.intp)
+    for i, (a, b) in enumerate(COMBOS.tolist()):
+        high, low = max(a >> 2, b >> 2), min(a >> 2, b >> 2)
+        combo_class[i] = index[high, low, None if high == low else (a & 3) == (b & 3)]
+    return names, combo_class
+
+
+CLASSES, COMBO_CLASS = _hand_classes()
+CLASS_INDEX = {name: i for i, name in enumerate(CLASSES)}
+# (169, 1326) membership matrix: summing combo-pair counts through it gives class-pair counts
+MEMBERSHIP = np.zeros((len(CLASSES), len(COMBOS)), dtype=np.float64)
+MEMBERSHIP[COMBO_CLASS, np.arange(len(COMBOS))] = 1
+
+
+def build_equity_matrix(boards=1000, seed=0):
+    # All-in preflop equity of every class against every class, from boards sampled once and shared by all
+    # 1326 x 1326 combo matchups: per board each combo is evaluated once, and the pairwise comparison of those
+    # strengths scores every matchup that neither the board nor the other hand blocks. Also returns, per class
+    # pair, the number of combo pairs that don't share a card (the card-removal weights).
+    rng = np.random.default_rng(seed)
+    board_cards = np.argsort(rng.random((boards, 52)), axis=1)[:, :5].astype(np.uint8)
+    board_masks = np.bitwise_or.reduce(np.uint64(1) << board_cards.astype(np.uint64), axis=1)
+    score = np.zeros((len(COMBOS), len(COMBOS)), dtype=np.uint32)  # 2 per win, 1 per tie
+    live = np.zeros((boards, len(COMBOS)), dtype=np.float32)
+    for start in range(0, boards, 100):
+        block = board_cards[start:start + 100]
+        seven = np.concatenate([np.repeat(block, len(COMBOS), axis=0), np.tile(COMBOS, (len(block), 1))], axis=1)
+        strengths = evaluate_strength_batch(seven).reshape(len(block), len(COMBOS))
+        for offset, strength in enumerate(strengths):
+            valid = (COMBO_MASKS & board_masks[start + offset]) == 0
+            live[start + offset] = valid
+            pair_valid = valid[:, None] & valid[None, :]
+            score += ((strength[:, None] > strength[None, :]).astype(np.uint32)
+                      + (strength[:, None] >= strength[None, :])) * pair_valid
+    disjoint = (COMBO_MASKS[:, None] & COMBO_MASKS[None, :]) == 0
+    counted = (live.T @ live) * disjoint  # Boards on which each disjoint combo pair was scored
+    equity = (MEMBERSHIP @ (score * disjoint) @ MEMBERSHIP.T) / (2 * MEMBERSHIP @ counted @ MEMBERSHIP.T)
+    weights = MEMBERSHIP @ disjoint.astype(np.float64) @ MEMBERSHIP.T
+    return equity, weights
+
+
+def save_equity_matrix(path, equity, weights):
+    # Written to a temporary file of its own and renamed, so concurrent builds never write the same file
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            np.savez_compressed(f, equity=equity, weights=weights)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def load_equity_matrix(path=None):
+    # The (equity, weights) pair used by solve(). It takes seconds to build, so it is never built here: run
+    # `python pushfold.py build` first. FileNotFoundError while it is missing.
+    global _matrix
+    with np.load(path or EQUITY_PATH) as data:
+        _matrix = data['equity'], data['weights']
+    solve.cache_clear()
+    return _matrix
+
+
+def equity_matrix():
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                load_equity_matrix()
+    return _matrix
+
+
+def _fictitious_play(best_responses, num_strategies, iterations):
+    # Every player best-responds to the others' average strategies; the averages converge to equilibrium
+    average = [np.full(len(CLASSES), 0.5) for _ in range(num_strategies)]
+    for t in range(1, iterations + 1):
+        responses = best_responses(average)
+        for strategy, response in zip(average, responses):
+            strategy += (response - strategy) / (t + 1)
+    return average
+
+
+def solve_heads_up(stack, small_blind, big_blind, antee=0, matrix=None, iterations=ITERATIONS):
+    # Small blind pushes or folds, big blind calls or folds; chip EVs from stacks of stack before the hand.
+    # Rows of conditional are the opponent's class distribution given our class (card removal included), so
+    # each best response is two matrix-vector products.
+    equity, weights = matrix if matrix is not None else equity_matrix()
+    conditional = weights / weights.sum(axis=1, keepdims=True)
+    all_in = conditional * (2 * stack * equity - stack)
+    if stack <= big_blind + antee:
+        raise ValueError("The stack must cover the big blind and ante")
+
+    def best_responses(average):
+        push, call = average
+        push_value = all_in @ call + (big_blind + antee) * (conditional @ (1 - call))
+        call_value = all_in @ push
+        return (push_value > -(small_blind + antee)).astype(float), \
+            (call_value > -(big_blind + antee) * (conditional @ push)).astype(float)
+    push, call = _fictitious_play(best_responses, 2, iterations)
+    return {'sb_push': push, 'bb_call': call}
+
+
+def solve_three_handed(stack, small_blind, big_blind, antee=0, matrix=None, iterations=ITERATIONS):
+    # Button pushes or folds; the small blind calls a push or, after a fold, pushes or folds; the big blind calls
+    # a single push or overcalls two. Opponents' hands are drawn independently given ours, and a three-way pot
+    # is split by the product of the two heads-up equities (the chance to beat each caller), which keeps every
+    # best response to a few matrix-vector products with the pairwise matrix.
+    equity, weights = matrix if matrix is not None else equity_matrix()
+    conditional = weights / weights.sum(axis=1, keepdims=True)
+    winning = conditional * equity
+    if stack <= big_blind + antee:
+        raise ValueError("The stack must cover the big blind and ante")
+
+    def heads_up(strategy, dead):
+        # Unnormalized EV of getting all-in against the hands that play strategy, with dead money in the pot
+        return (2 * stack + dead) * (winning @ strategy) - stack * (conditional @ strategy)
+
+    def three_way(first, second):
+        # Same for a three-way pot of 3 * stack, weighted by the chance that both opponents are in it
+        return (3 * stack * (winning @ first) * (winning @ second)
+                - stack * (conditional @ first) * (conditional @ second))
+
+    def best_responses(average):
+        btn_push, sb_call, sb_push, bb_call_btn, bb_call_sb, bb_overcall = average
+        p_sb_call = conditional @ sb_call
+        p_bb_call = conditional @ bb_call_btn
+        p_overcall = conditional @ bb_overcall
+        p_btn = conditional @ btn_push
+        p_sb_push = conditional @ sb_push
+        p_bb_call_sb = conditional @ bb_call_sb
+
+        btn_value = ((1 - p_sb_call) * (1 - p_bb_call) * (small_blind + big_blind + 2 * antee)
+                     + (1 - p_sb_call) * heads_up(bb_call_btn, small_blind + antee)
+                     + heads_up(sb_call, big_blind + antee) * (1 - p_overcall)
+                     + three_way(sb_call, bb_overcall))
+        sb_call_value = heads_up(btn_push, big_blind + antee) * (1 - p_overcall) + three_way(btn_push, bb_overcall)
+        sb_push_value = heads_up(bb_call_sb, antee) + (1 - p_bb_call_sb) * (big_blind + 2 * antee)
+        bb_call_btn_value = heads_up(btn_push, small_blind + antee)
+        bb_call_sb_value = heads_up(sb_push, antee)
+        bb_overcall_value = three_way(btn_push, sb_call)
+        fold_bb = -(big_blind + antee)
+        return [
+            (btn_value > -antee).astype(float),
+            (sb_call_value > -(small_blind + antee) * p_btn).astype(float),
+            (sb_push_value > -(small_blind + antee)).astype(float),
+            (bb_call_btn_value > fold_bb * p_btn).astype(float),
+            (bb_call_sb_value > fold_bb * p_sb_push).astype(float),
+            (bb_overcall_value > fold_bb * (conditional @ btn_push) * (conditional @ sb_call)).astype(float),
+        ]
+    names = ['btn_push', 'sb_call', 'sb_push', 'bb_call_vs_btn', 'bb_call_vs_sb', 'bb_overcall']
+    return dict(zip(names, _fictitious_play(best_responses, len(names), iterations)))
+
+
+@lru_cache(maxsize=256)
+def solve(num_players, stack, small_blind, big_blind, antee=0):
+    # Equilibrium charts, memoized per spot; the arrays are shared between callers, so they are read-only
+    if num_players == 2:
+        charts = solve_heads_up(stack, small_blind, big_blind, antee)
+    elif num_players == 3:
+        charts = solve_three_handed(stack, small_blind, big_blind, antee)
+    else:
+        raise ValueError("Push/fold charts are for heads-up and 3-handed play")
+    for chart in charts.values():
+        chart.flags.writeable = False
+    return charts
+
+
+def chart_frequencies(charts):
+    # {decision: {hand class: frequency}} with rounded frequencies, the shape served by /pushfold
+    return {name: {hand: round(float(value), 3) for hand, value in zip(CLASSES, chart)}
+            for name, chart in charts.items()}
+
+
+def solve_for_table(table):
+    # Charts for the seated players at table: effective stack (the smallest), blinds and ante from Table.blinds
+    stacks = [table.seats[seat].in_game_chips for seat in table.seat_ring]
+    if len(stacks) not in (2, 3):
+        raise ValueError("Push/fold charts are for heads-up and 3-handed play")
+    blinds = table.blinds
+    return solve(len(stacks), min(stacks), blinds["small_blind"], blinds["big_blind"], blinds["antee"])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Push/fold equilibrium charts")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="precompute the class-vs-class equity matrix")
+    build_parser.add_argument('--boards', type=int, default=1000)
+    build_parser.add_argument('--seed', type=int, default=0)
+    build_parser.add_argument('--output', default=EQUITY_PATH)
+    solve_parser = subparsers.add_parser('solve', help="print the charts for one spot as JSON")
+    solve_parser.add_argument('--players', type=int, default=2, choices=(2, 3))
+    solve_parser.add_argument('--stack', type=int, required=True, help="effective stack in chips")
+    solve_parser.add_argument('--small-blind', type=int, default=10)
+    solve_parser.add_argument('--big-blind', type=int, default=20)
+    solve_parser.add_argument('--antee', type=int, default=0)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if args.command == 'build':
+        save_equity_matrix(args.output, *build_equity_matrix(args.boards, args.seed))
+        print(f"Wrote {args.output} in {time.perf_counter() - start_time:.1f}s")
+    else:
+        charts = solve(args.players, args.stack, args.small_blind, args.big_blind, args.antee)
+        print(json.dumps(chart_frequencies(charts), indent=1))
+        print(f"Solved in {time.perf_counter() - start_time:.2f}s")
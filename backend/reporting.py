@@ -0,0 +1,22 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def use_agg():
+    # Non-interactive backend: workers only write image files
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def render_all(jobs, processes=None):
+    # jobs is a list of (function, args) pairs; the functions must be module-level so they can be pickled.
+    # Each job draws and saves its own figures in a worker process and the results come back in job order.
+    if not jobs:
+        return []
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes <= 1:
+        use_agg()
+        return [function(*args) for function, args in jobs]
+    with ProcessPoolExecutor(max_workers=processes, initializer=use_agg) as executor:
+        futures = [executor.submit(function, *args) for function, args in jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,335 @@
+import copy
+import json
+import multiprocessing
+import os
+import secrets
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+CHECKPOINT_DIR = os.path.join('Statistics', 'checkpoints')
+
+# A job splits a simulation into numbered chunks. Chunk i draws all of its randomness from chunk_rng(seed, i),
+# so a chunk gives the same partial result whenever and wherever it runs, and the merged total only depends on
+# which chunks were merged. Jobs provide:
+#   name, seed, chunk_size    identify the run (a checkpoint is only reused for the same values)
+#   empty()                   the aggregate before any chunk
+#   run_chunk(chunk)          the partial aggregate of one chunk
+#   merge(total, part)        total with part added
+#   to_arrays(total)          dict of NumPy arrays for the checkpoint file (NumPy is only needed here,
+#                             so chunk workers don't have to import it)
+#   from_arrays(arrays)       the aggregate back from those arrays
+
+
+def new_seed():
+    return secrets.randbits(63)
+
+
+def chunk_rng(seed, chunk):
+    # Independent, reproducible stream per (seed, chunk); str seeds hash with SHA-512 on every platform
+    import random
+    return random.Random(f"{seed}:{chunk}")
+
+
+def checkpoint_path(job, num_chunks, directory=CHECKPOINT_DIR):
+    return os.path.join(directory, f"{job.name}_seed{job.seed}_{num_chunks}x{job.chunk_size}.npz")
+
+
+def save_checkpoint(path, job, num_chunks, completed, total):
+    # Written to a temporary file and renamed over the old one, so a crash mid-write keeps the last good checkpoint
+    import numpy as np
+    meta = {'job': job.name, 'seed': job.seed, 'chunk_size': job.chunk_size, 'num_chunks': num_chunks,
+            'saved': time.time()}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), completed=np.array(sorted(completed), dtype=np.int64),
+                            **job.to_arrays(total))
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path, job, num_chunks):
+    # Returns the set of merged chunk numbers and the aggregate
+    import numpy as np
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        completed = set(data['completed'].tolist())
+        arrays = {key: data[key] for key in data.files if key not in ('meta', 'completed')}
+    expected = {'job': job.name, 'seed': job.seed, 'chunk_size': job.chunk_size, 'num_chunks': num_chunks}
+    if any(meta[key] != value for key, value in expected.items()):
+        raise ValueError(f"Checkpoint {path} belongs to a different run: {meta}")
+    return completed, job.from_arrays(arrays)
+
+
+def resume(job, num_chunks, path):
+    if os.path.exists(path):
+        return load_checkpoint(path, job, num_chunks)
+    return set(), job.empty()
+
+
+def _run_chunk(job_and_chunk):
+    job, chunk = job_and_chunk
+    return chunk, job.run_chunk(chunk)
+
+
+def run_job(job, num_chunks, path=None, checkpoint_every=30.0, processes=1, progress=None):
+    # Runs every chunk not yet in the checkpoint at path on local processes, saving a checkpoint at most every
+    # checkpoint_every seconds and once at the end. Returns the merged total.
+    path = path or checkpoint_path(job, num_chunks)
+    completed, total = resume(job, num_chunks, path)
+    if progress:
+        progress(len(completed))
+    last_save = time.monotonic()
+    pool = multiprocessing.Pool(processes) if processes > 1 else None
+    try:
+        jobs = [(job, chunk) for chunk in range(num_chunks) if chunk not in completed]
+        parts = pool.imap(_run_chunk, jobs) if pool else map(_run_chunk, jobs)
+        for chunk, part in parts:
+            total = job.merge(total, part)
+            completed.add(chunk)
+            if time.monotonic() - last_save >= checkpoint_every:
+                save_checkpoint(path, job, num_chunks, completed, total)
+                last_save = time.monotonic()
+            if progress:
+                progress(len(completed))
+    finally:
+        if pool:
+            pool.terminate()
+    save_checkpoint(path, job, num_chunks, completed, total)
+    return total
+
+
+# Distributed mode: a coordinator hands out chunks to workers on any machine over multiprocessing.connection
+# (plain TCP with an HMAC-checked authkey and pickled messages). A chunk is leased to one worker at a time; a lease that isn't
+# completed within lease_timeout seconds, or that the worker reports as failed, goes back in the queue.
+# Because a chunk's result only depends on (seed, chunk), a reassigned or duplicated chunk can't change the total.
+
+WAIT = -1
+
+
+class Coordinator:
+    def __init__(self, job, num_chunks, completed, total, lease_timeout=60.0):
+        self.job = job
+        self.num_chunks = num_chunks
+        self.completed = set(completed)
+        self.total = total
+        self.lease_timeout = lease_timeout
+        self.pending = deque(chunk for chunk in range(num_chunks) if chunk not in self.completed)
+        self.leases = {}  # chunk -> (worker, deadline)
+        self.reassigned = 0
+        self.lock = threading.Lock()
+
+    def get_job(self):
+        return self.job
+
+    def lease(self, worker):
+        # Next chunk number for worker, WAIT while the remaining chunks are leased to others, None when finished
+        with self.lock:
+            now = time.monotonic()
+            for chunk, (_, deadline) in list(self.leases.items()):
+                if deadline < now:
+                    self._requeue(chunk)
+            while self.pending:
+                chunk = self.pending.popleft()
+                if chunk not in self.completed:
+                    self.leases[chunk] = (worker, now + self.lease_timeout)
+                    return chunk
+            return WAIT if self.leases else None
+
+    def complete(self, worker, chunk, part):
+        with self.lock:
+            self.leases.pop(chunk, None)
+            if chunk in self.completed:
+                return False
+            self.total = self.job.merge(self.total, part)
+            self.completed.add(chunk)
+            return True
+
+    def fail(self, worker, chunk):
+        with self.lock:
+            if chunk in self.leases:
+                self._requeue(chunk)
+
+    def _requeue(self, chunk):
+        del self.leases[chunk]
+        self.pending.appendleft(chunk)
+        self.reassigned += 1
+
+    def snapshot(self):
+        # Copy of the completed set and the total, taken under the lock so a checkpoint never mixes two states
+        with self.lock:
+            return set(self.completed), copy.deepcopy(self.total)
+
+    def finished(self):
+        with self.lock:
+            return len(self.completed) == self.num_chunks
+
+
+# Coordinator methods a worker may call
+REMOTE_METHODS = ('get_job', 'lease', 'complete', 'fail')
+
+
+def _serve_connection(coordinator, connection):
+    # One worker's calls: each (method, args) message is answered with ('ok', result) or ('error', exception)
+    with connection:
+        while True:
+            try:
+                method, args = connection.recv()
+            except (EOFError, OSError):
+                return
+            if method not in REMOTE_METHODS:
+                reply = ('error', AttributeError(f"Coordinator has no remote method {method!r}"))
+            else:
+                try:
+                    reply = ('ok', getattr(coordinator, method)(*args))
+                except Exception as e:
+                    reply = ('error', e)
+            try:
+                connection.send(reply)
+            except OSError:
+                return
+
+
+def _accept(listener, coordinator):
+    while True:
+        try:
+            connection = listener.accept()
+        except AuthenticationError:
+            continue  # A node with the wrong key; keep serving the others
+        except OSError:
+            return  # The listener was closed
+        threading.Thread(target=_serve_connection, args=(coordinator, connection), daemon=True).start()
+
+
+class CoordinatorClient:
+    # A worker's handle on the coordinator: every method call is one request and reply over the connection
+    def __init__(self, address, authkey):
+        self.connection = Client(address, authkey=authkey)
+
+    def _call(self, method, *args):
+        self.connection.send((method, args))
+        status, result = self.connection.recv()
+        if status == 'error':
+            raise result
+        return result
+
+    def get_job(self):
+        return self._call('get_job')
+
+    def lease(self, worker):
+        return self._call('lease', worker)
+
+    def complete(self, worker, chunk, part):
+        return self._call('complete', worker, chunk, part)
+
+    def fail(self, worker, chunk):
+        return self._call('fail', worker, chunk)
+
+    def close(self):
+        self.connection.close()
+
+
+def shared_authkey():
+    # The key every node must present; taken from POKER_SIM_AUTHKEY, or made up and printed for the workers
+    key = os.environ.get('POKER_SIM_AUTHKEY')
+    if not key:
+        key = secrets.token_hex(16)
+        print(f"POKER_SIM_AUTHKEY={key}")
+    return key.encode()
+
+
+def coordinator_ready(address):
+    print(f"Coordinator listening on {address[0]}:{address[1]}; start workers with "
+          f"POKER_SIM_AUTHKEY=... python simulation.py HOST:{address[1]}")
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def serve_job(job, num_chunks, address, authkey, path=None, checkpoint_every=30.0, lease_timeout=60.0,
+              progress=None, ready=None):
+    # Coordinator side: serves chunks at address until all are merged and returns the total. ready(address) is
+    # called with the bound address once workers can connect (useful with port 0).
+    path = path or checkpoint_path(job, num_chunks)
+    completed, total = resume(job, num_chunks, path)
+    coordinator = Coordinator(job, num_chunks, completed, total, lease_timeout)
+
+    listener = Listener(address, authkey=authkey)
+    threading.Thread(target=_accept, args=(listener, coordinator), name="chunk-server", daemon=True).start()
+    if ready:
+        ready(listener.address)
+    last_save = time.monotonic()
+    reported = None
+    try:
+        while not coordinator.finished():
+            time.sleep(0.05)
+            done = len(coordinator.completed)
+            if progress and done != reported:
+                progress(done)
+                reported = done
+            if time.monotonic() - last_save >= checkpoint_every:
+                save_checkpoint(path, job, num_chunks, *coordinator.snapshot())
+                last_save = time.monotonic()
+    finally:
+        # Workers still connected are told there is nothing left by lease(), or get EOFError once this process
+        # exits; either ends their run
+        listener.close()
+    if progress:
+        progress(num_chunks)
+    save_checkpoint(path, job, num_chunks, coordinator.completed, coordinator.total)
+    return coordinator.total
+
+
+def run_worker(address, authkey, worker=None, poll=0.2):
+    # Worker side: runs leased chunks until the coordinator has none left or goes away. Returns the chunks run.
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    coordinator = CoordinatorClient(address, authkey)
+    job = coordinator.get_job()
+    chunks_run = 0
+    try:
+        while True:
+            chunk = coordinator.lease(worker)
+            if chunk is None:
+                return chunks_run
+            if chunk == WAIT:
+                time.sleep(poll)
+                continue
+            try:
+                part = job.run_chunk(chunk)
+            except Exception:
+                coordinator.fail(worker, chunk)
+                raise
+            coordinator.complete(worker, chunk, part)
+            chunks_run += 1
+    except (EOFError, ConnectionError):
+        return chunks_run  # The coordinator finished and shut down between two leases
+    finally:
+        coordinator.close()
+
+
+def _worker_process(address, authkey):
+    run_worker(address, authkey)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Run simulation chunks for a coordinator started with --serve")
+    parser.add_argument('address', help="coordinator HOST:PORT")
+    parser.add_argument('--authkey', default=os.environ.get('POKER_SIM_AUTHKEY'), help="shared secret "
+                        "(default: $POKER_SIM_AUTHKEY)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    if not args.authkey:
+        parser.error("an authkey is required (--authkey or POKER_SIM_AUTHKEY)")
+    workers = [multiprocessing.Process(target=_worker_process, args=(parse_address(args.address),
+                                                                     args.authkey.encode()))
+               for _ in range(args.processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
@@ -0,0 +1,82 @@
+import unittest
+from itertools import combinations, product
+
+import numpy as np
+
+from poker import RANKS, SUITS, evaluate_strength
+from equity import COMBOS, parse_range, equity
+
+DECK = [rank + suit for rank in RANKS for suit in SUITS]
+
+
+def combo_names(weights):
+    return {tuple(DECK[card] for card in COMBOS[i]) for i in np.flatnonzero(weights)}
+
+
+def brute_force_equity(hands, board):
+    # Every runout of every matchup of the two hand lists, scored with the scalar evaluator
+    shares = [0.0, 0.0]
+    total = 0
+    for first, second in product(*hands):
+        used = set(first) | set(second) | set(board)
+        if len(used) != 4 + len(board):
+            continue
+        deck = [card for card in DECK if card not in used]
+        for runout in combinations(deck, 5 - len(board)):
+            full = list(board) + list(runout)
+            a, b = evaluate_strength(list(first) + full), evaluate_strength(list(second) + full)
+            shares[0] += 1.0 if a > b else 0.5 if a == b else 0.0
+            shares[1] += 1.0 if b > a else 0.5 if a == b else 0.0
+            total += 1
+    return [share / total for share in shares]
+
+
+class TestEquity(unittest.TestCase):
+
+    def test_parse_range(self):
+        self.assertEqual(np.count_nonzero(parse_range("QQ+")), 18)
+        self.assertEqual(np.count_nonzero(parse_range("AKs")), 4)
+        self.assertEqual(np.count_nonzero(parse_range("AKo")), 12)
+        self.assertEqual(np.count_nonzero(parse_range("KA")), 16)
+        self.assertEqual(np.count_nonzero(parse_range("A2s+")), 48)
+        self.assertEqual(np.count_nonzero(parse_range("99-jj")), 18)
+        self.assertEqual(np.count_nonzero(parse_range("A2s-A5s")), 16)
+        self.assertEqual(np.count_nonzero(parse_range("any")), 1326)
+        self.assertEqual(combo_names(parse_range("AhKh")), {("KH", "AH")})
+        weights = parse_range("QQ+, 76s:0.5, AA:0")
+        self.assertEqual(np.count_nonzero(weights), 16)
+        self.assertEqual(sorted(set(weights[weights > 0])), [0.5, 1.0])
+        for bad in ("AKx", "QQs", "AK:2", "A1"):
+            with self.assertRaises(ValueError):
+                parse_range(bad)
+
+    def test_exact_equity_matches_brute_force(self):
+        board = ['2H', '7H', 'QD', '3C']
+        hands = [[('AH', 'KH'), ('AS', 'KD')], [('QS', 'QC'), ('JH', 'TH')]]
+        result = equity(["AhKh,AsKd", "QsQc,JhTh"], board)
+        self.assertTrue(result.exact)
+        for share, expected in zip(result.equity, brute_force_equity(hands, board)):
+            self.assertAlmostEqual(share, expected)
+
+    def test_card_removal(self):
+        # Every AK combo that shares a card with the board or the dead cards is dropped
+        result = equity(["AK", "QQ"], ['AH', '7D', '2C', '9S', '3H'], dead=['KS'])
+        self.assertTrue(result.exact)
+        self.assertEqual(result.samples, 9 * 6)
+        with self.assertRaises(ValueError):
+            equity(["AhKh", "QQ"], ['AH', '7D', '2C'])
+
+    def test_preflop_sampling(self):
+        result = equity(["AA", "KK"], seed=3)
+        self.assertAlmostEqual(result.equity[0], 0.82, delta=0.015)
+        # Its speed is tracked by the equity_3way_ranges case in bench_evaluator.py
+        result = equity(["QQ+,AKs", "76s:0.5,88-TT", "A2s+,KTo+"], seed=3)
+        self.assertAlmostEqual(sum(result.equity), 1.0)
+        # Few enough assignments to enumerate, but not against thousands of sampled runouts
+        result = equity(["QQ+,AKs", "JJ-88,AQs", "76s:0.5,KQo"], seed=3)
+        self.assertFalse(result.exact)
+        self.assertLessEqual(result.samples, result.runouts * 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+import numpy as np
+
+from app import Table, Player, evaluate_strength
+from poker import StrengthCache, BoardEvaluator, LookupTable, build_table, load_table
+from headless_engine import HeadlessEngine, evaluate_strength_batch, evaluate_strength_batch_cached, card_names
+
+
+class TestHeadlessEngine(unittest.TestCase):
+
+    def test_batch_evaluator_matches_evaluate_strength(self):
+        rng = np.random.default_rng(7)
+        cards = np.argsort(rng.random((3000, 52)), axis=1)[:, :7].astype(np.uint8)
+        for size in (5, 6, 7):
+            strengths = evaluate_strength_batch(cards[:, :size])
+            expected = [evaluate_strength(card_names(hand)) for hand in cards[:, :size]]
+            self.assertEqual(strengths.tolist(), expected)
+
+    def test_cached_batch_matches_batch(self):
+        rng = np.random.default_rng(11)
+        cards = np.argsort(rng.random((500, 52)), axis=1)[:, :7].astype(np.uint8)
+        repeated = np.concatenate([cards, cards[:, ::-1], cards[:100]])
+        cache = StrengthCache(capacity=300)
+        strengths = evaluate_strength_batch_cached(repeated, cache)
+        self.assertEqual(strengths.tolist(), evaluate_strength_batch(repeated).tolist())
+        # Each distinct hand is evaluated once per call; the second call finds the 300 most recent in the cache
+        self.assertEqual(cache.stats()['misses'], 500)
+        evaluate_strength_batch_cached(cards, cache)
+        self.assertEqual(cache.stats()['hits'], 300)
+
+    def test_lookup_table_matches_evaluator(self):
+        import os
+        import subprocess
+        import sys
+        import tempfile
+        rng = np.random.default_rng(13)
+        cards = np.argsort(rng.random((3000, 52)), axis=1)[:, :7].astype(np.uint8)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hand_ranks.bin')
+            self.assertIsNone(load_table(path))
+            table = LookupTable(build_table(path))
+            for size in (5, 6, 7):
+                self.assertEqual(evaluate_strength_batch(cards[:, :size], table).tolist(),
+                                 evaluate_strength_batch(cards[:, :size], None).tolist())
+            for hand in cards[:500]:
+                names = card_names(hand)
+                self.assertEqual(table.strength(names), evaluate_strength(names))
+                board = names[2:]
+                self.assertEqual(BoardEvaluator(board, table).strength(names[:2]), evaluate_strength(names))
+            with self.assertRaises(ValueError):
+                table.strength(['AS', 'AS', 'KD', 'QC', 'JH'])
+            del table
+            # The shared strength cache sits in front of the table once it is loaded
+            code = "import poker; print(poker.strength_cache.evaluator == poker.lookup_table.strength)"
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=dict(os.environ, POKER_LOOKUP_TABLE=path)).stdout
+            self.assertEqual(output.strip(), "True")
+            with open(path, 'r+b') as f:
+                f.write(b'garbage!')
+            with self.assertRaises(ValueError):
+                LookupTable(path)
+            # A bad file falls back to the evaluator instead of failing the import of poker
+            with self.assertLogs('poker.lookup', 'WARNING'):
+                self.assertIsNone(load_table(path))
+            for contents in (b'abc', b''):
+                with open(path, 'wb') as f:
+                    f.write(contents)
+                with self.assertRaises(ValueError):
+                    LookupTable(path)
+                with self.assertLogs('poker.lookup', 'WARNING'):
+                    self.assertIsNone(load_table(path))
+            code = "import poker; print(poker.lookup_table)"
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=dict(os.environ, POKER_LOOKUP_TABLE=path)).stdout
+            self.assertEqual(output.strip(), "None")
+
+    def test_engine_conserves_chips(self):
+        # Split pots hand their odd chips out instead of dropping them
+        engine = HeadlessEngine(num_tables=300, num_seats=6, stack=1000, small_blind=5, big_blind=10, antee=1, seed=9)
+        engine.play(200)
+        self.assertEqual(engine.chips.sum(axis=1).tolist(), [6000] * 300)
+
+    def test_engine_matches_table(self):
+        stacks = [300, 150, 500, 220]
+        engine = HeadlessEngine(num_tables=1, num_seats=len(stacks), small_blind=10, big_blind=20, antee=5, seed=3)
+        engine.chips[0] = stacks
+
+        table = Table(name="Reference", max_players=len(stacks), min_buy_in=1, max_buy_in=1000)
+        table.set_blinds(10, 20, 5)
+        for seat, stack in enumerate(stacks):
+            player = Player(name=f"P{seat}", bankroll=stack)
+            player.join_table(table)
+            player.sit_down(table, seat, stack)
+
+        for _ in range(6):
+            if engine.chips[0].min() < 25:
+                break  # Table refuses blinds from short stacks, the engine posts them all-in
+            engine.play_hand()
+
+            table.create_deck()
+            table.deck = card_names(engine.decks[0])
+            table.next_dealer()
+            table.collect_blinds()
+            table.deal_cards(len(table.seat_ring))
+            for deal_street in (table.deal_flop, table.deal_turn, table.deal_river, None):
+                while table.to_act is not None:
+                    state = table.legal_actions()
+                    action = 'call' if 'call' in state['actions'] else 'check'
+                    table.player_action(state['to_act'], action)
+                if deal_street:
+                    deal_street()
+            table.determine_winner()
+
+            self.assertEqual(engine.dealer[0], table.dealer_position)
+            self.assertEqual(card_names(engine.board[0]), table.community_cards)
+            self.assertEqual(engine.chips[0].tolist(), [p.in_game_chips for p in table.seats])
+
+
+if __name__ == "__main__":
+    unittest.main()
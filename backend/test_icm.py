@@ -0,0 +1,85 @@
+import unittest
+from itertools import permutations
+
+from poker import Player, icm_equity, icm_exact, icm_monte_carlo, table_icm
+
+
+def harville_brute_force(stacks, payouts):
+    # Sums every finishing order directly
+    equity = [0.0] * len(stacks)
+    for order in permutations(range(len(stacks))):
+        probability = 1.0
+        remaining = sum(stacks)
+        for i in order:
+            probability *= stacks[i] / remaining
+            remaining -= stacks[i]
+        for i, payout in zip(order, payouts):
+            equity[i] += probability * payout
+    return equity
+
+
+class TestICM(unittest.TestCase):
+
+    def test_exact_matches_brute_force(self):
+        for stacks, payouts in (([5000, 3000, 2000, 1000, 500], [50, 30, 20]),
+                                ([1200, 1200, 800, 4000, 300, 2500], [60, 25, 10, 5, 0, 0]),
+                                ([100, 200], [70, 30, 10])):
+            for value, expected in zip(icm_exact(stacks, payouts), harville_brute_force(stacks, payouts)):
+                self.assertAlmostEqual(value, expected)
+
+    def test_prize_pool_is_conserved(self):
+        stacks = [18000, 9000, 7000, 6500, 4000, 2500, 1500, 1000, 500]
+        payouts = [40, 25, 15, 10, 5, 3, 1, 1, 0]
+        equity = icm_equity(stacks, payouts)
+        self.assertAlmostEqual(sum(equity), sum(payouts))
+        self.assertEqual(equity, sorted(equity, reverse=True))
+        # A busted player gets nothing and the others share every prize
+        equity = icm_equity([3000, 0, 1000], [70, 30, 10])
+        self.assertEqual(equity[1], 0.0)
+        self.assertAlmostEqual(sum(equity), 100)
+        with self.assertRaises(ValueError):
+            icm_equity([100, -1], [1])
+
+    def test_monte_carlo_agrees_with_exact(self):
+        stacks = [1000 * (i + 1) for i in range(14)]
+        payouts = [30, 20, 15, 10, 8, 6, 5, 4, 2]
+        exact = icm_exact(stacks, payouts)
+        sampled = icm_monte_carlo(stacks, payouts, samples=20000, seed=4)
+        for value, expected in zip(sampled, exact):
+            self.assertAlmostEqual(value, expected, delta=0.5)
+
+    def test_final_table(self):
+        # Nine players are solved exactly; the speed is tracked by icm_final_table_9p in bench_evaluator.py
+        stacks = [51000, 38000, 27500, 22000, 15000, 12000, 8000, 4500, 2000]
+        payouts = [1000, 650, 450, 330, 250, 190, 150, 120, 100]
+        equity = icm_equity(stacks, payouts)
+        self.assertEqual(equity, icm_exact(stacks, payouts))
+        self.assertAlmostEqual(sum(equity), sum(payouts))
+        self.assertEqual(equity, sorted(equity, reverse=True))
+
+    def test_table_icm_and_route(self):
+        from app import app, poker_game
+        table = poker_game.create_table("ICM Table", max_players=6, min_buy_in=1, max_buy_in=5000)
+        for seat, stack in ((0, 3000), (2, 1500), (5, 500)):
+            player = Player(name=f"icm{seat}", bankroll=stack)
+            player.join_table(table)
+            player.sit_down(table, seat, stack)
+        equity = table_icm(table, [60, 30, 10])
+        self.assertEqual(set(equity), {0, 2, 5})
+        self.assertGreater(equity[0], equity[2])
+
+        client = app.test_client()
+        response = client.post('/icm', json={'table_name': "ICM Table", 'payouts': [60, 30, 10]})
+        self.assertEqual(response.status_code, 200)
+        rows = response.get_json()['equity']
+        self.assertEqual([row['player'] for row in rows], ["icm0", "icm2", "icm5"])
+        self.assertAlmostEqual(rows[0]['equity'], equity[0])
+        response = client.post('/icm', json={'stacks': [100, 100], 'payouts': [70, 30]})
+        self.assertEqual(response.get_json()['equity'], [50.0, 50.0])
+        self.assertEqual(client.post('/icm', json={'table_name': "Nowhere", 'payouts': [1]}).status_code, 404)
+        self.assertEqual(client.post('/icm', json={'stacks': [1, 'x'], 'payouts': [1]}).status_code, 400)
+        poker_game.delete_table("ICM Table")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import threading
+import unittest
+
+from poker import Auditor, Ledger, Player, Table, Tournament, ledger
+from poker.ledger import BUY_IN, COMMIT, DEPOSIT, GLOBAL, HOUSE, PAYOUT
+
+
+def seated_table(name, stacks, blinds=(10, 20, 0)):
+    table = Table(name=name, max_players=len(stacks), min_buy_in=1, max_buy_in=10000)
+    table.set_blinds(*blinds)
+    for seat, stack in enumerate(stacks):
+        player = Player(name=f"{name}-{seat}", bankroll=stack)
+        player.join_table(table)
+        player.sit_down(table, seat, stack)
+    return table
+
+
+class TestLedger(unittest.TestCase):
+
+    def test_transfers_keep_scopes_conserved(self):
+        book = Ledger()
+        table_scope = book.open_scope("Table")
+        bankroll, stack = book.open_account(), book.open_account()
+        pot = book.open_account(table_scope)
+        book.transfer(HOUSE, bankroll, 500, DEPOSIT)
+        book.move(stack, table_scope)
+        book.transfer(bankroll, stack, 200, BUY_IN)
+        book.transfer(stack, pot, 50, COMMIT)
+        self.assertEqual((book.balance(bankroll), book.balance(stack), book.balance(pot)), (300, 150, 50))
+        self.assertEqual(book.total(table_scope), 200)
+        self.assertEqual(book.balance(HOUSE), -500)
+        # Moving a stack with chips in it carries them out of the table's scope
+        book.move(stack, GLOBAL)
+        self.assertEqual(book.total(table_scope), 50)
+        self.assertTrue(book.conserved(table_scope) and book.conserved(GLOBAL))
+        self.assertEqual(book.find_discrepancies(), {})
+        # A one-sided posting is the only way to break conservation
+        book.adjust(pot, 7)
+        self.assertFalse(book.conserved(table_scope))
+        self.assertEqual(book.find_discrepancies(), {table_scope: 7})
+        self.assertEqual(book.entries()[-1], (5, 'adjust', -1, pot, 7))
+
+    def test_journal_is_bounded(self):
+        book = Ledger(journal_limit=100)
+        account = book.open_account()
+        for _ in range(250):
+            book.transfer(HOUSE, account, 1, DEPOSIT)
+        self.assertEqual(book.balance(account), 250)
+        self.assertLessEqual(len(book.entries()), 100)
+        self.assertEqual(book.entries()[-1][0], 249)
+        self.assertEqual(book.stats()['entries'], 250)
+
+    def test_split_pot_odd_chip_goes_clockwise_from_the_dealer(self):
+        table = seated_table("Odd Chip", [100, 100, 100])
+        table.set_dealer_position(1)
+        table.create_deck()
+        table.deal_cards(3)
+        for player in table.active_players:
+            player.place_bet(33, table)
+            table.hand_contributions[player.seat] += 33
+        table.community_cards = ['QH', 'JH', 'TH', '2S', '3D']
+        table.seats[0].hand, table.seats[1].hand, table.seats[2].hand = ['AS', 'KD'], ['4C', '5C'], ['AC', 'KC']
+        result = table.determine_winner()
+        # 99 chips split between seats 0 and 2: seat 2 is first after the dealer and gets the odd chip
+        self.assertEqual(result.payouts, {"Odd Chip-2": 50, "Odd Chip-0": 49})
+        self.assertEqual([player.in_game_chips for player in table.seats], [116, 67, 117])
+        self.assertEqual((table.pot, table.chips_in_play()), (0, 300))
+        self.assertTrue(table.chips_conserved())
+
+    def test_unseated_winner_is_paid_after_seated_ones(self):
+        table = seated_table("Unseated", [100])
+        joined = Player(name="joined", bankroll=0)
+        joined.join_table(table)
+        table.handle_bet("Unseated-0", 31)
+        payouts = table.distribute_pot([joined, table.seats[0]])
+        self.assertEqual(payouts, {"Unseated-0": 16, "joined": 15})
+        self.assertEqual((joined.in_game_chips, table.pot), (15, 0))
+        self.assertTrue(table.chips_conserved())
+
+    def test_tournament_conserves_every_chip(self):
+        players = [Player(name=f"c{i}", bankroll=0) for i in range(60)]
+        tournament = Tournament("Conserved", players, starting_stack=1000, seed=2)
+        tournament.run()
+        self.assertEqual(sum(player.in_game_chips for player in players), 60000)
+        # Broken tables have been closed; the final one is still open
+        self.assertEqual([table for table in tournament.tables if table.scope is not None],
+                         [tournament.tables[index] for index in tournament.occupancy])
+        self.assertTrue(all(tournament.tables[index].chips_conserved() for index in tournament.occupancy))
+
+    def test_closed_scopes_and_accounts_are_reused(self):
+        book = Ledger()
+        scope = book.open_scope("Table")
+        pot, stack = book.open_account(scope), book.open_account(scope)
+        book.transfer(HOUSE, stack, 100, DEPOSIT)
+        with self.assertRaises(ValueError):
+            book.close_scope(scope)
+        with self.assertRaises(ValueError):
+            book.close_account(stack)
+        book.move(stack, GLOBAL)
+        book.close_account(pot)
+        book.close_scope(scope)
+        with self.assertRaises(ValueError):
+            book.close_scope(scope)
+        self.assertEqual(book.stats()['scopes'], 1)
+        self.assertEqual((book.open_scope("Next"), book.open_account(scope)), (scope, pot))
+        self.assertEqual(book.total(scope), 0)
+        self.assertEqual(len(book.scope_names), 2)
+
+        # A scope closed while unconserved is reported once, then no longer audited
+        book.adjust(pot, 5)
+        book.transfer(pot, stack, 5, PAYOUT)
+        with self.assertLogs('poker.ledger', 'WARNING'):
+            book.close_scope(scope)
+        self.assertEqual(Auditor(book).audit(), {})
+
+    def test_deleting_tables_and_players_releases_the_ledger(self):
+        from poker import PokerGame
+        game = PokerGame()
+        before = ledger.stats()
+        for _ in range(50):
+            table = game.create_table("Released", min_buy_in=1, max_buy_in=1000)
+            player = game.create_player("released", 500)
+            player.join_table(table)
+            player.sit_down(table, 0, 200)
+            self.assertEqual(game.delete_table("Released"), ("Table removed", 200))
+            self.assertEqual(player.in_game_chips, 200)  # The stack left the table with the player
+            game.delete_player("released")
+        after = ledger.stats()
+        self.assertEqual((after['scopes'], after['accounts']), (before['scopes'], before['accounts']))
+        self.assertEqual(after['chips_issued'], before['chips_issued'])
+
+    def test_auditor_runs_beside_play(self):
+        tables = [seated_table(f"Audit {i}", [200, 200]) for i in range(20000)]
+        scopes = {table.scope for table in tables}
+        auditor = Auditor(ledger)  # The shared ledger may hold other tests' tables; only these are checked
+        # Its speed is tracked by the ledger_audit_50k_scopes case in bench_evaluator.py
+        self.assertFalse(scopes & set(auditor.audit()))
+
+        auditor.interval = 0.001
+        auditor.start()
+        done = threading.Event()
+
+        def play():
+            for table in tables[:200]:
+                table.create_deck()
+                table.next_dealer()
+                table.collect_blinds()
+                table.deal_cards(2)
+                while table.to_act is not None:
+                    table.player_action(table.legal_actions()['to_act'], 'all-in' if table.current_bet == 20
+                                        else 'call')
+                for deal in (table.deal_flop, table.deal_turn, table.deal_river):
+                    deal()
+                table.determine_winner()
+            done.set()
+        player_thread = threading.Thread(target=play)
+        player_thread.start()
+        player_thread.join(timeout=30)
+        auditor.stop()
+        self.assertTrue(done.is_set())
+        self.assertGreater(auditor.passes, 0)
+        self.assertFalse(scopes & set(auditor.violations))
+        self.assertTrue(all(table.chips_in_play() == 400 for table in tables[:200]))
+
+        tables[123].seats[0].in_game_chips += 5
+        self.assertEqual(scopes & set(auditor.audit()), {tables[123].scope})
+        self.assertEqual(auditor.violations[tables[123].scope], 5)
+        tables[123].seats[0].in_game_chips -= 5
+        self.assertFalse(scopes & set(auditor.audit()))
+
+    def test_audit_route(self):
+        from app import app, poker_game
+        table = poker_game.create_table("Audit Route", min_buy_in=1, max_buy_in=1000)
+        player = Player(name="audited", bankroll=300)
+        player.join_table(table)
+        player.sit_down(table, 0, 300)
+        client = app.test_client()
+        response = client.get('/audit?table_name=Audit Route')
+        self.assertEqual(response.get_json(), {'table': "Audit Route", 'conserved': True, 'discrepancy': 0,
+                                               'chips_in_play': 300})
+        table.pot = 10
+        self.assertEqual(client.get('/audit?table_name=Audit Route').get_json()['discrepancy'], 10)
+        table.pot = 0
+        self.assertEqual(client.get('/audit?table_name=Nowhere').status_code, 404)
+        self.assertIn('violations', client.get('/audit').get_json())
+        poker_game.delete_table("Audit Route")
+
+
+if __name__ == "__main__":
+    unittest.main()
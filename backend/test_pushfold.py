@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+import pushfold
+from pushfold import CLASSES, CLASS_INDEX, COMBO_CLASS, build_equity_matrix, save_equity_matrix
+from poker import Player
+
+
+class TestPushFold(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # A coarse matrix keeps the tests quick; the charts only need the right ordering of hands
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, 'preflop_equity.npz')
+        save_equity_matrix(path, *build_equity_matrix(boards=300, seed=1))
+        cls.matrix = pushfold.load_equity_matrix(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        pushfold._matrix = None
+        pushfold.solve.cache_clear()
+        cls.directory.cleanup()
+
+    def test_classes_and_matrix(self):
+        self.assertEqual(len(CLASSES), 169)
+        self.assertEqual(CLASSES[:3], ['AA', 'AKs', 'AKo'])
+        counts = [list(COMBO_CLASS).count(CLASS_INDEX[name]) for name in ('AA', 'AKs', 'AKo')]
+        self.assertEqual(counts, [6, 4, 12])
+        equity, weights = self.matrix
+        self.assertTrue((abs(equity + equity.T - 1) < 1e-9).all())
+        self.assertGreater(equity[CLASS_INDEX['AA'], CLASS_INDEX['72o']], 0.8)
+        self.assertAlmostEqual(equity[CLASS_INDEX['AKs'], CLASS_INDEX['QQ']], 0.46, delta=0.05)
+        # Blocked combos are left out: each AA combo only meets the one AA combo it shares no card with
+        self.assertEqual(weights[CLASS_INDEX['AA'], CLASS_INDEX['AA']], 6)
+        self.assertEqual(weights[CLASS_INDEX['AKs'], CLASS_INDEX['AKo']], 4 * 6)
+
+    def test_heads_up(self):
+        charts = pushfold.solve(2, 200, 10, 20, 0)
+        push, call = charts['sb_push'], charts['bb_call']
+        self.assertEqual(round(push[CLASS_INDEX['AA']]), 1)
+        self.assertEqual(round(call[CLASS_INDEX['AA']]), 1)
+        self.assertEqual(round(push[CLASS_INDEX['72o']]), 0)
+        self.assertEqual(round(call[CLASS_INDEX['32o']]), 0)
+        # Shorter stacks shove and call wider
+        short = pushfold.solve(2, 60, 10, 20, 0)
+        self.assertGreater(short['sb_push'].sum(), push.sum())
+        self.assertGreater(short['bb_call'].sum(), call.sum())
+        # Charts are cached per spot and shared read-only
+        self.assertIs(pushfold.solve(2, 200, 10, 20, 0), charts)
+        self.assertFalse(push.flags.writeable)
+        with self.assertRaises(ValueError):
+            pushfold.solve(2, 20, 10, 20, 0)
+
+    def test_three_handed(self):
+        charts = pushfold.solve(3, 200, 10, 20, 5)
+        self.assertEqual(set(charts), {'btn_push', 'sb_call', 'sb_push', 'bb_call_vs_btn', 'bb_call_vs_sb',
+                                       'bb_overcall'})
+        for chart in charts.values():
+            self.assertEqual(round(chart[CLASS_INDEX['AA']]), 1)
+        # Two players left to act behind the button make it shove tighter than the small blind, and calling
+        # two all-in players takes a stronger hand than calling one
+        self.assertLess(charts['btn_push'].sum(), charts['sb_push'].sum())
+        self.assertLess(charts['bb_overcall'].sum(), charts['bb_call_vs_btn'].sum())
+
+    def test_table_and_route(self):
+        from app import app, poker_game
+        table = poker_game.create_table("Push Fold Table", max_players=6, min_buy_in=1, max_buy_in=5000)
+        table.set_blinds(10, 20)
+        for seat, stack in ((1, 400), (4, 250)):
+            player = Player(name=f"pf{seat}", bankroll=stack)
+            player.join_table(table)
+            player.sit_down(table, seat, stack)
+        self.assertIs(pushfold.solve_for_table(table), pushfold.solve(2, 250, 10, 20, 0))
+
+        client = app.test_client()
+        response = client.post('/pushfold', json={'table_name': "Push Fold Table"})
+        self.assertEqual(response.status_code, 200)
+        charts = response.get_json()['charts']
+        self.assertEqual(set(charts), {'sb_push', 'bb_call'})
+        self.assertEqual(charts['sb_push']['AA'], 1.0)
+        response = client.post('/pushfold', json={'players': 3, 'stack': 200, 'small_blind': 10, 'big_blind': 20})
+        self.assertEqual(len(response.get_json()['charts']), 6)
+        self.assertEqual(client.post('/pushfold', json={'table_name': "Nowhere"}).status_code, 404)
+        self.assertEqual(client.post('/pushfold', json={'stack': 200}).status_code, 400)
+        self.assertEqual(client.post('/pushfold', json={'players': 5, 'stack': 200, 'small_blind': 10,
+                                                        'big_blind': 20}).status_code, 400)
+        poker_game.delete_table("Push Fold Table")
+
+    def test_missing_matrix_is_not_built_on_request(self):
+        from app import app
+        matrix, path = pushfold._matrix, pushfold.EQUITY_PATH
+        pushfold._matrix, pushfold.EQUITY_PATH = None, os.path.join(self.directory.name, 'missing.npz')
+        pushfold.solve.cache_clear()
+        try:
+            response = app.test_client().post('/pushfold', json={'stack': 200, 'small_blind': 10, 'big_blind': 20})
+            self.assertEqual(response.status_code, 503)
+            self.assertFalse(os.path.exists(pushfold.EQUITY_PATH))
+        finally:
+            pushfold._matrix, pushfold.EQUITY_PATH = matrix, path
+        # Saving leaves no temporary file behind
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['preflop_equity.npz'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import unittest
+
+import numpy as np
+
+from Random_Shuffler_Sim import (Deck, CARDS, run_simulation, merge_results, position_moments,
+                                 save_avg_location_to_csv)
+
+
+class NullProgress:
+    def update(self, _):
+        pass
+
+
+class TestShuffleAnalyzer(unittest.TestCase):
+
+    def test_position_matrix(self):
+        results = [run_simulation(Deck(), 200, NullProgress(), threading.Lock()) for _ in range(3)]
+        card_positions = merge_results(results)
+        self.assertEqual(card_positions.shape, (52, 53))
+        self.assertEqual(card_positions.dtype, np.int64)
+        self.assertFalse(card_positions[:, 0].any())
+        # Every card lands somewhere once per deck, and every position holds one card per deck
+        self.assertTrue((card_positions.sum(axis=1) == 600).all())
+        self.assertTrue((card_positions[:, 1:].sum(axis=0) == 600).all())
+        self.assertTrue((card_positions == sum(results)).all())
+
+    def test_moments_match_weighted_average(self):
+        rng = np.random.default_rng(5)
+        card_positions = np.zeros((52, 53), dtype=np.int64)
+        card_positions[:, 1:] = rng.integers(0, 50, size=(52, 52))
+        means, variances = position_moments(card_positions)
+        positions = np.arange(1, 53)
+        for row, mean, variance in zip(card_positions, means, variances):
+            expected_mean = np.average(positions, weights=row[1:])
+            self.assertAlmostEqual(mean, expected_mean)
+            self.assertAlmostEqual(variance, np.average((positions - expected_mean) ** 2, weights=row[1:]))
+
+    def test_avg_location_csv(self):
+        import os
+        import tempfile
+        card_positions = np.zeros((52, 53), dtype=np.int64)
+        card_positions[np.arange(52), np.arange(1, 53)] = 1  # Card i always at position i + 1
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'avg.csv')
+            save_avg_location_to_csv(card_positions, path)
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0], "Card,Avg Location")
+        self.assertEqual(lines[1], f"{CARDS[0]},0.5")
+        self.assertEqual(lines[52], f"{CARDS[51]},51.5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import unittest
+
+from simulation import run_job, serve_job, run_worker, CoordinatorClient
+from Random_Shuffler_Sim import ShuffleJob
+from MultiRunHands import HandsJob
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_after(chunks):
+    def progress(done):
+        if done >= chunks:
+            raise Crash()
+    return progress
+
+
+def abandon_lease(address, authkey):
+    # A node that takes a chunk and dies without reporting back
+    CoordinatorClient(address, authkey).lease("crashed-node")
+    os._exit(1)
+
+
+class TestResumableSimulation(unittest.TestCase):
+
+    def assert_resume_matches(self, make_job, num_chunks, same):
+        with tempfile.TemporaryDirectory() as directory:
+            uninterrupted = run_job(make_job(), num_chunks, os.path.join(directory, 'full.npz'))
+            path = os.path.join(directory, 'resumed.npz')
+            with self.assertRaises(Crash):
+                run_job(make_job(), num_chunks, path, checkpoint_every=0, progress=crash_after(2))
+            with self.assertRaises(Crash):
+                run_job(make_job(), num_chunks, path, checkpoint_every=0, progress=crash_after(4))
+            resumed = run_job(make_job(), num_chunks, path, checkpoint_every=0)
+            same(uninterrupted, resumed)
+            # A finished checkpoint gives the result back without running anything
+            same(uninterrupted, run_job(make_job(), num_chunks, path, progress=crash_after(num_chunks + 1)))
+
+    def test_shuffle_job_resumes_identically(self):
+        def same(a, b):
+            self.assertTrue((a == b).all())
+            self.assertEqual(int(a.sum()), 6 * 40 * 52)
+        self.assert_resume_matches(lambda: ShuffleJob(seed=99, chunk_size=40), 6, same)
+
+    def test_hands_job_resumes_identically(self):
+        def same(a, b):
+            self.assertEqual(a['winners'], b['winners'])
+            self.assertEqual(a['categories'], b['categories'])
+            self.assertEqual(sum(a['categories'].values()), 5 * 20)
+        self.assert_resume_matches(lambda: HandsJob(seed=7, chunk_size=20, num_players=4), 5, same)
+
+    def test_checkpoint_from_another_run_is_refused(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.npz')
+            run_job(ShuffleJob(seed=1, chunk_size=10), 2, path)
+            with self.assertRaises(ValueError):
+                run_job(ShuffleJob(seed=2, chunk_size=10), 2, path)
+
+    def test_distributed_run_matches_local_run(self):
+        num_chunks = 12
+        context = multiprocessing.get_context('spawn')
+        with tempfile.TemporaryDirectory() as directory:
+            expected = run_job(ShuffleJob(seed=11, chunk_size=30), num_chunks, os.path.join(directory, 'local.npz'))
+            addresses = queue.Queue()
+            results = []
+            coordinator = threading.Thread(target=lambda: results.append(serve_job(
+                ShuffleJob(seed=11, chunk_size=30), num_chunks, ('127.0.0.1', 0), b'test-key',
+                os.path.join(directory, 'distributed.npz'), lease_timeout=0.5, ready=addresses.put)))
+            coordinator.start()
+            address = addresses.get(timeout=10)
+
+            crashed = context.Process(target=abandon_lease, args=(address, b'test-key'))
+            crashed.start()
+            crashed.join()
+            workers = [context.Process(target=run_worker, args=(address, b'test-key', f"node{i}"))
+                       for i in range(3)]
+            for worker in workers:
+                worker.start()
+            coordinator.join(timeout=60)
+            for worker in workers:
+                worker.join(timeout=10)
+            self.assertFalse(coordinator.is_alive())
+            self.assertTrue((results[0] == expected).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
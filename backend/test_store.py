@@ -0,0 +1,149 @@
+import os
+import tempfile
+import time
+import unittest
+
+from poker import Player, PokerGame, Store
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'poker.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def stored_players(self):
+        # What a fresh process would load from the file
+        store = Store(self.path)
+        rows = store.load_players()
+        store.close()
+        return rows
+
+    def test_saves_coalesce_into_one_flush(self):
+        store = Store(self.path, flush_interval=60)
+        player = Player("alice", 1000)
+        for bankroll in range(1000, 1100):
+            player.bankroll = bankroll
+            store.save_player(player)
+        store.save_player(Player("bob", 50))
+        store.delete_player("bob")
+        self.assertEqual(store.stats()['pending'], 2)
+        self.assertEqual(store.stats()['coalesced'], 100)
+        self.assertEqual(store.flush(), 2)
+        self.assertEqual(store.load_players(), [("alice", 1099, 0)])
+        self.assertEqual(store.flush(), 0)
+        store.close()
+
+    def test_threshold_wakes_the_flusher(self):
+        store = Store(self.path, flush_interval=60, flush_threshold=10)
+        for i in range(10):
+            store.save_player(Player(f"p{i}", i))
+        deadline = time.monotonic() + 5
+        while store.stats()['flushes'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(store.stats()['rows_written'], 10)
+        store.close()
+
+    def test_saving_never_waits_for_a_flush(self):
+        store = Store(self.path, flush_interval=60)
+        with store.db_lock:  # As if a flush were stuck on disk
+            start_time = time.perf_counter()
+            for i in range(1000):
+                store.save_player(Player(f"p{i}", i))
+            self.assertLess(time.perf_counter() - start_time, 0.5)
+        store.close()
+        self.assertEqual(len(self.stored_players()), 1000)
+
+    def test_restart_restores_players_and_tables(self):
+        game = PokerGame(Store(self.path, flush_interval=60))
+        table = game.create_table("Main", max_players=6, min_buy_in=100, max_buy_in=1000)
+        table.set_blinds(5, 10, 1)
+        game.save_table(table)
+        alice = game.create_player("alice", 800)
+        game.create_player("bob", 300)
+        alice.join_table(table)
+        alice.sit_down(table, 2, 500)
+        game.save_player(alice)
+        game.update_player_chips("bob", 250)
+        game.create_player("carol", 10)
+        game.delete_player("carol")
+        game.store.close()
+
+        restored = PokerGame(Store(self.path))
+        self.assertEqual({p.name: p.bankroll for p in restored.players}, {"alice": 800, "bob": 250})
+        self.assertEqual([t.name for t in restored.tables], ["Main"])
+        table = restored.tables[0]
+        self.assertEqual((table.max_players, table.min_buy_in, table.max_buy_in), (6, 100, 1000))
+        self.assertEqual(table.blinds, {"small_blind": 5, "big_blind": 10, "antee": 1})
+        restored.store.close()
+
+    def test_add_on_and_stand_up_survive_a_restart(self):
+        import app
+        game = PokerGame(Store(self.path, flush_interval=60))
+        table = game.create_table("Main", min_buy_in=100, max_buy_in=1000)
+        alice, bob = game.create_player("alice", 1000), game.create_player("bob", 1000)
+        for seat, player in enumerate((alice, bob)):
+            player.join_table(table)
+            player.sit_down(table, seat, 300)
+        alice.add_on(200, table)
+        game.store.flush()
+        self.assertEqual(sorted(game.store.load_players()), [("alice", 500, 500), ("bob", 700, 300)])
+        alice.stand_up(table)
+        original = app.poker_game
+        app.poker_game = game
+        try:
+            client = app.app.test_client()
+            client.post('/remove_player_from_table', json={'player_name': "bob", 'table_name': "Main"})
+        finally:
+            app.poker_game = original
+        # Bob's stack left the table with him
+        self.assertEqual((bob.bankroll, bob.in_game_chips), (700, 300))
+        self.assertEqual(game.store.stats()['pending'], 2)  # Both saved themselves, nobody called save_player
+        game.store.close()
+
+        restored = PokerGame(Store(self.path))
+        self.assertEqual(sorted(restored.store.load_players()), [("alice", 1000, 0), ("bob", 700, 300)])
+        self.assertEqual({p.name: p.bankroll for p in restored.players}, {"alice": 1000, "bob": 1000})
+        restored.store.close()
+
+    def test_crash_loses_only_unflushed_writes(self):
+        store = Store(self.path, flush_interval=60)
+        player = Player("alice", 100)
+        store.save_player(player)
+        store.flush()
+        player.bankroll = 200
+        store.save_player(player)
+        # A second connection sees what a restart after a crash here would: the last flushed state
+        self.assertEqual(self.stored_players(), [("alice", 100, 0)])
+        store.close()
+
+    def test_app_routes_write_behind(self):
+        import app
+        store = Store(self.path, flush_interval=60)
+        original = app.poker_game.store
+        app.poker_game.store = store
+        try:
+            client = app.app.test_client()
+            client.post('/add_player', json={'name': "stored", 'bankroll': 900})
+            client.post('/create_table', json={'name': "Stored Table", 'small_blind': 25, 'big_blind': 50})
+            client.post('/add_player_to_table', json={'player_name': "stored", 'table_name': "Stored Table"})
+            client.post('/sit_down', json={'player_name': "stored", 'table_name': "Stored Table", 'seat': 0,
+                                           'buy_in': 400})
+            store.flush()
+            self.assertEqual(store.load_players(), [("stored", 500, 400)])
+            self.assertEqual(store.load_tables()[0][:2], ("Stored Table", "Texas Hold'em"))
+            self.assertEqual(store.load_tables()[0][5:], (25, 50, 0))
+            client.post('/delete_table', json={'name': "Stored Table"})
+            client.post('/remove_player', json={'name': "stored"})
+            store.flush()
+            self.assertEqual((store.load_players(), store.load_tables()), ([], []))
+        finally:
+            app.poker_game.store = original
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from poker import Player, PokerGame, Tournament
+
+
+class TestTournament(unittest.TestCase):
+
+    def assert_balanced(self, tournament):
+        running = [tournament.tables[index] for index in tournament.occupancy]
+        counts = [len(table.seat_ring) for table in running]
+        self.assertEqual(len(running), -(-tournament.players_left // tournament.seats_per_table))
+        self.assertLessEqual(max(counts) - min(counts), 1)
+        self.assertEqual(sum(counts), tournament.players_left)
+        self.assertEqual(counts, [tournament.occupancy[index] for index in tournament.occupancy])
+
+    def test_initial_seating(self):
+        players = [Player(name=f"p{i}", bankroll=0) for i in range(40)]
+        tournament = Tournament("Seating", players, starting_stack=2000, seed=3)
+        self.assertEqual(len(tournament.tables), 5)
+        self.assert_balanced(tournament)
+        self.assertTrue(all(player.in_game_chips == 2000 and player.bankroll == 0 for player in players))
+
+    def test_breaking_and_balancing(self):
+        players = [Player(name=f"p{i}", bankroll=0) for i in range(27)]
+        tournament = Tournament("Break", players, seed=5)
+        # Four players bust at one table (9-9-5): balancing evens the counts out to within one
+        table = tournament.tables[0]
+        for seat in list(table.seat_ring)[:4]:
+            player = table.seats[seat]
+            table.remove_player(player)
+            tournament.finishes.append(player.name)
+        tournament.players_left -= 4
+        tournament._update(0)
+        tournament.balance()
+        self.assert_balanced(tournament)
+        # Down to 17 players two tables can seat everyone, so the shortest table is broken
+        for index in list(tournament.occupancy)[:2]:
+            table = tournament.tables[index]
+            for seat in list(table.seat_ring)[:3]:
+                table.remove_player(table.seats[seat])
+            tournament.players_left -= 3
+            tournament._update(index)
+        tournament.balance()
+        self.assertEqual(len(tournament.occupancy), 2)
+        self.assert_balanced(tournament)
+
+    def test_entrants_start_from_an_empty_stack(self):
+        game = PokerGame()
+        cash = game.create_table("Cash", min_buy_in=100, max_buy_in=500)
+        seated, left, fresh = (game.create_player(name, 1000) for name in ("seated", "left", "fresh"))
+        for seat, player in enumerate((seated, left)):
+            player.join_table(cash)
+            player.sit_down(cash, seat, 300)
+        cash.remove_player(left)  # Unseated, but the 300 stayed in the stack
+        with self.assertRaises(ValueError):
+            game.create_tournament("Mixed", ["seated", "left", "fresh"], starting_stack=1500)
+        self.assertEqual((seated.in_game_chips, cash.chips_in_play()), (300, 300))
+        game.create_tournament("Clean", ["left", "fresh"], starting_stack=1500)
+        self.assertEqual([(p.bankroll, p.in_game_chips) for p in (left, fresh)], [(1000, 1500), (1000, 1500)])
+
+    def test_odd_field_at_heads_up_tables(self):
+        players = [Player(name=f"p{i}", bankroll=0) for i in range(7)]
+        tournament = Tournament("Odd", players, seats_per_table=2, seed=7)
+        while tournament.players_left > 1:
+            lone = [index for index, count in tournament.occupancy.items() if count == 1]
+            self.assertLessEqual(len(lone), 1)
+            if lone:
+                # The player without an opponent waits out the round instead of failing to post blinds
+                table = tournament.tables[lone[0]]
+                chips = table.seats[next(iter(table.seat_ring))].in_game_chips
+                tournament.play_round()
+                if lone[0] in tournament.occupancy and tournament.occupancy[lone[0]] == 1:
+                    self.assertEqual(table.seats[next(iter(table.seat_ring))].in_game_chips, chips)
+            else:
+                tournament.play_round()
+            self.assert_balanced(tournament)
+        self.assertEqual(sorted(tournament.standings()), sorted(player.name for player in players))
+        with self.assertRaises(ValueError):
+            Tournament("Solo", [Player(name=f"s{i}", bankroll=0) for i in range(3)], seats_per_table=1)
+
+    def test_runs_to_completion(self):
+        game = PokerGame()
+        for i in range(120):
+            game.create_player(f"p{i}", 0)
+        tournament = game.create_tournament("Sunday", [f"p{i}" for i in range(120)], seed=11)
+        self.assertIn(tournament, game.tournaments)
+        while tournament.players_left > 1:
+            tournament.play_round()
+            self.assert_balanced(tournament)
+        standings = tournament.standings()
+        self.assertEqual(sorted(standings), sorted(player.name for player in game.players))
+        winner = next(player for player in game.players if player.name == standings[0])
+        self.assertGreater(winner.in_game_chips, 0)
+        self.assertEqual(sum(player.in_game_chips > 0 for player in game.players), 1)
+        with self.assertRaises(ValueError):
+            game.create_tournament("Nobody", ["p0", "ghost"])
+
+
+if __name__ == "__main__":
+    unittest.main()
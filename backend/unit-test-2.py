@@ -12,14 +12,14 @@ class TestPokerApp(unittest.TestCase):
         player1 = Player(name="Alice", bankroll=1000)
         response, status = player1.join_table(table)
         self.assertEqual(status, 200)
-        self.assertIn(player1, table.players)
+        self.assertIs(table.players["Alice"], player1)
 
     def test_add_player_to_table(self):
         poker_game = PokerGame()
         table = poker_game.create_table(name="Test Table", min_buy_in=50, max_buy_in=500)
         player1 = poker_game.create_player(name="Alice", bankroll=1000)
         table.add_player(player1)
-        self.assertIn(player1, table.players)
+        self.assertIs(table.players["Alice"], player1)
     def test_sit_down(self):
         table = Table(name="Test Table", min_buy_in=50, max_buy_in=500)
         player1 = Player(name="Alice", bankroll=1000)
@@ -94,11 +94,11 @@ class TestPokerApp(unittest.TestCase):
         player1 = Player(name="Alice", bankroll=1000)
         response, status = player1.join_table(table)
         self.assertEqual(status, 200)
-        self.assertIn(player1, table.players)
+        self.assertIs(table.players["Alice"], player1)
 
         response, status = player1.leave_table(table)
         self.assertEqual(status, 200)
-        self.assertNotIn(player1, table.players)
+        self.assertNotIn("Alice", table.players)
 
     def test_player_rejoin_game(self):
         table = Table(name="Test Table", min_buy_in=50, max_buy_in=500)
@@ -193,11 +193,15 @@ class TestPokerApp(unittest.TestCase):
         poker_game.table = table
         table.create_deck()
         table.deal_cards(2)
-        table.deal_flop()
-        table.deal_turn()
-        table.deal_river()
-        winner, winning_hand, hand_evaluation = table.determine_winner()
-        self.assertIn(winner.name, ["tie","Alice", "Bob","tie"])
+        for deal in (table.deal_flop, table.deal_turn, table.deal_river, None):
+            table.player_action("Bob", 'check')
+            table.player_action("Alice", 'check')
+            if deal:
+                deal()
+        result = table.showdown()
+        self.assertTrue(set(result.winners) <= {player1, player2})
+        self.assertEqual(set(result.strengths), {"Alice", "Bob"})
+        self.assertEqual(len(result.best_five), 5)
 
     def test_exceeding_max_buy_in_with_add_on(self):
         table = Table(name="Test Table", min_buy_in=50, max_buy_in=500)
@@ -272,43 +276,428 @@ class TestPokerApp(unittest.TestCase):
         table.deal_cards(2)
 
         # Pre-flop betting round
-        table.handle_bet(player1.name, 20)
-        table.handle_bet(player2.name, 20)
+        table.player_action(player2.name, 'bet', 20)
+        table.player_action(player1.name, 'call')
         self.assertEqual(table.pot, 40)
 
         # Flop
         table.deal_flop()
-        table.handle_bet(player1.name, 10)
-        table.handle_bet(player2.name, 10)
+        table.player_action(player2.name, 'bet', 10)
+        table.player_action(player1.name, 'call')
         self.assertEqual(table.pot, 60)
 
         # Turn
         table.deal_turn()
-        table.handle_bet(player1.name, 10)
-        table.handle_bet(player2.name, 10)
+        table.player_action(player2.name, 'bet', 10)
+        table.player_action(player1.name, 'call')
         self.assertEqual(table.pot, 80)
 
         # River
         table.deal_river()
-        table.handle_bet(player1.name, 10)
-        table.handle_bet(player2.name, 10)
+        table.player_action(player2.name, 'bet', 10)
+        table.player_action(player1.name, 'call')
         self.assertEqual(table.pot, 100)
 
         # Determine the winner
-        winner, winning_hand, hand_evaluation = table.determine_winner()
-        self.assertIn(winner.name, ["Alice", "Bob", "tie"])
+        result = table.showdown()
+        self.assertTrue(set(result.winners) <= {player1, player2})
         self.assertEqual(table.pot, 0)
 
         # Ensure the winner's in-game chips are updated
-        if winner.name == "Alice":
+        if result.winners == [player1]:
             self.assertEqual(player1.in_game_chips, 150)
             self.assertEqual(player2.in_game_chips, 50)
-        elif winner.name == "Bob":
+        elif result.winners == [player2]:
             self.assertEqual(player2.in_game_chips, 150)
             self.assertEqual(player1.in_game_chips, 50)
         else:  # in case of a tie
             self.assertEqual(player1.in_game_chips, 100)
             self.assertEqual(player2.in_game_chips, 100)
 
+    def test_determine_winner_single_pass(self):
+        table = Table(name="Test Table", min_buy_in=50, max_buy_in=500)
+        players = [Player(name=name, bankroll=1000) for name in ("Alice", "Bob", "Carol")]
+        for seat, player in enumerate(players):
+            player.join_table(table)
+            player.sit_down(table, seat=seat, buy_in=100)
+        table.create_deck()
+        table.deal_cards(3)
+        table.community_cards = ['QH', 'JH', 'TH', '2S', '3D']
+        players[0].hand = ['AS', 'KD']
+        players[1].hand = ['AC', 'KC']
+        players[2].hand = ['QS', 'QC']
+        table.pot = 301
+        result = table.determine_winner()
+        self.assertEqual(result.winners, [players[0], players[1]])
+        self.assertEqual(result.category, 5)
+        self.assertEqual(sorted(result.best_five), sorted(['AS', 'KD', 'QH', 'JH', 'TH']))
+        self.assertGreater(result.strengths["Alice"], result.strengths["Carol"])
+        self.assertIs(table.last_showdown, result)
+        self.assertEqual(players[0].in_game_chips, 250)
+
+    def test_evaluate_strength_matches_evaluate_hand(self):
+        import random
+        from itertools import combinations
+        from app import evaluate_strength, decode_strength
+        table = Table(name="Test Table")
+        deck = [rank + suit for rank in '23456789TJQKA' for suit in 'HDCS']
+        rng = random.Random(2024)
+        for _ in range(500):
+            cards = rng.sample(deck, 7)
+            expected = max(table.evaluate_hand(comb) for comb in combinations(cards, 5))
+            self.assertEqual(decode_strength(evaluate_strength(cards)), expected)
+        with self.assertRaises(ValueError):
+            evaluate_strength(['AS', 'AS', 'KD', 'QC', 'JH'])
+
+    def test_board_evaluator_matches_evaluate_strength(self):
+        import random
+        from poker import BoardEvaluator, evaluate_strength
+        deck = [rank + suit for rank in '23456789TJQKA' for suit in 'HDCS']
+        rng = random.Random(42)
+        # Mostly one-suit decks too, so flushes and straight flushes come up often
+        suited = [rank + suit for rank in '23456789TJQKA' for suit in 'HH' + rng.choice('DCS')]
+        for board_size in (3, 4, 5):
+            for cards_from in (deck, suited):
+                for _ in range(300):
+                    cards = rng.sample(sorted(set(cards_from)), board_size + 6)
+                    board = BoardEvaluator(cards[:board_size])
+                    for i in range(board_size, len(cards), 2):
+                        hole = cards[i:i + 2]
+                        self.assertEqual(board.strength(hole), evaluate_strength(hole + cards[:board_size]))
+        board = BoardEvaluator(['AS', 'KD', 'QC', 'JH', '2C'])
+        for hole in (['AS', '3D'], ['3D', '3D'], ['XX', '3D'], ['3D']):
+            with self.assertRaises(ValueError):
+                board.strength(hole)
+
+    def test_strength_cache(self):
+        from poker import StrengthCache, card_mask, evaluate_strength
+        cache = StrengthCache(capacity=2)
+        hands = [['AH', 'KH', 'QH', 'JH', 'TH'], ['2C', '2D', '5S', '9H', 'JD'], ['3C', '4D', '5S', '6H', '7D']]
+        self.assertEqual(cache.strength(hands[0]), evaluate_strength(hands[0]))
+        self.assertEqual(cache.strength(list(reversed(hands[0]))), evaluate_strength(hands[0]))
+        cache.strength(hands[1])
+        cache.strength(hands[0])
+        cache.strength(hands[2])  # Evicts hands[1], the least recently used
+        self.assertIsNone(cache.get(card_mask(hands[1])))
+        self.assertEqual(cache.get(card_mask(hands[0])), evaluate_strength(hands[0]))
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses'], stats['evictions']), (2, 3, 4, 1))
+        self.assertGreater(stats['memory_bytes'], 0)
+        # A repeated card must not hit the entry of the smaller set it collapses to
+        with self.assertRaises(ValueError):
+            cache.strength(hands[0] + ['AH'])
+
+    def test_best_hand_picks_best_five(self):
+        table = Table(name="Test Table")
+        table.community_cards = ['2H', '7H', 'QH', 'KD', 'KC']
+        self.assertEqual(table.best_hand(['AH', '3H']), ('AH', '3H', '2H', '7H', 'QH'))
+        self.assertEqual(table.best_hand(['KS', '7D']), ('KS', '7D', '7H', 'KD', 'KC'))
+
+    def _betting_table(self, stacks, game_type="Texas Hold'em"):
+        table = Table(name="Test Table", game_type=game_type, min_buy_in=50, max_buy_in=500)
+        table.set_blinds(small_blind=10, big_blind=20)
+        players = []
+        for seat, (name, stack) in enumerate(stacks):
+            player = Player(name=name, bankroll=1000)
+            player.join_table(table)
+            player.sit_down(table, seat=seat, buy_in=stack)
+            players.append(player)
+        table.create_deck()
+        table.set_dealer_position(0)
+        table.collect_blinds()
+        table.deal_cards(len(stacks))
+        return table, players
+
+    def test_omaha_strength_matches_brute_force(self):
+        import random
+        from itertools import combinations
+        from poker import OmahaBoardEvaluator, evaluate_strength
+        rng = random.Random(9)
+        deck = [rank + suit for rank in '23456789TJQKA' for suit in 'HDCS']
+        two_suits = [rank + suit for rank in '23456789TJQKA' for suit in 'HS']
+        for cards_from in (deck, two_suits):
+            for _ in range(300):
+                cards = rng.sample(cards_from, 9)
+                hole, board = cards[:4], cards[4:]
+                expected = max(evaluate_strength(list(pair) + list(triple))
+                               for pair in combinations(hole, 2) for triple in combinations(board, 3))
+                evaluator = OmahaBoardEvaluator(board)
+                self.assertEqual(evaluator.strength(hole), expected)
+                best = evaluator.best_five(hole, expected)
+                self.assertEqual(len(set(best) & set(hole)), 2)
+        with self.assertRaises(ValueError):
+            OmahaBoardEvaluator(['AH', 'KH', '2C', '3D', '9S']).strength(['QH', 'JH', 'TH'])
+
+    def test_omaha_deal_and_showdown(self):
+        with self.assertRaises(ValueError):
+            Table(name="Test Table", game_type="Razz")
+        table, (alice, bob) = self._betting_table([("Alice", 100), ("Bob", 100)], game_type="Pot-Limit Omaha")
+        self.assertEqual([len(alice.hand), len(bob.hand)], [4, 4])
+        self.assertEqual(len(table.deck), 52 - 8)
+        # Alice's single heart makes a flush in hold'em but not in Omaha, where two hole cards must play
+        table.community_cards = ['2H', '7H', '9H', 'KH', 'QC']
+        alice.hand = ['AH', '3C', '4D', '8S']
+        bob.hand = ['QD', 'QS', '5C', '6D']
+        result = table.determine_winner()
+        self.assertEqual(result.winners, [bob])
+        self.assertEqual(result.category, 4)
+        self.assertEqual(sorted(result.best_five), sorted(['QD', 'QS', 'QC', 'KH', '9H']))
+        self.assertEqual(sorted(table.best_hand(alice.hand)), sorted(['AH', '8S', 'KH', 'QC', '9H']))
+
+    def test_pot_limit_betting(self):
+        table, _ = self._betting_table([("Alice", 500), ("Bob", 500), ("Carol", 500)], game_type="Pot-Limit Omaha")
+        # 30 in the pot: Alice may call 20 and raise the 50 that are then in the pot
+        state = table.legal_actions()
+        self.assertEqual(state['actions'], ['fold', 'call', 'raise'])
+        self.assertEqual((state['min_raise'], state['max_raise']), (40, 70))
+        self.assertEqual(table.player_action("Alice", 'raise', 71), ("Pot limit is 70", 400))
+        self.assertEqual(table.player_action("Alice", 'all-in'), ("Pot limit is 70", 400))
+        self.assertEqual(table.player_action("Alice", 'raise', 70), ("Alice bet 70", 200))
+        # Bob faces 60 more with 100 in the pot: the most he can put in is 60 + 160
+        self.assertEqual(table.legal_actions()['max_raise'], 220)
+
+    def test_betting_round_state_machine(self):
+        table, (alice, bob, carol) = self._betting_table([("Alice", 100), ("Bob", 100), ("Carol", 100)])
+        state = table.legal_actions()
+        self.assertEqual(state['to_act'], "Alice")  # Dealer acts first after the big blind three-handed
+        self.assertEqual(state['actions'], ['fold', 'call', 'raise', 'all-in'])
+        self.assertEqual((state['to_call'], state['min_raise']), (20, 40))
+        self.assertEqual(table.player_action("Bob", 'call'), ("It is Alice's turn", 400))
+        self.assertEqual(table.player_action("Alice", 'raise', 30)[1], 400)
+        self.assertEqual(table.player_action("Alice", 'raise', 40), ("Alice bet 40", 200))
+        self.assertEqual(table.player_action("Bob", 'call'), ("Bob called", 200))
+        self.assertEqual(table.player_action("Carol", 'check'), ("Cannot check facing a bet", 400))
+        self.assertEqual(table.player_action("Carol", 'fold'), ("Carol folded", 200))
+        self.assertIsNone(table.legal_actions()['to_act'])
+        self.assertEqual(table.pot, 100)
+
+        table.deal_flop()
+        self.assertEqual(table.legal_actions()['to_act'], "Bob")
+        self.assertEqual(table.player_action("Bob", 'check'), ("Bob checked", 200))
+        self.assertEqual(table.player_action("Alice", 'bet', 20), ("Alice bet 20", 200))
+        self.assertEqual(table.player_action("Bob", 'fold'), ("Bob folded", 200))
+        self.assertEqual(table.current_phase, "finished")
+        self.assertEqual(table.last_showdown.winners, [alice])
+        self.assertEqual(alice.in_game_chips, 160)
+        self.assertEqual(table.pot, 0)
+
+    def test_streets_wait_for_the_betting_round(self):
+        table, (alice, bob, carol) = self._betting_table([("Alice", 100), ("Bob", 100), ("Carol", 100)])
+        # Alice still owes the big blind: no flop, and her call is not lost
+        self.assertEqual(table.deal_flop(), ("Betting round still open", 400))
+        self.assertEqual((table.community_cards, table.current_phase), ([], "pre-flop"))
+        table.player_action("Alice", 'call')
+        table.player_action("Bob", 'call')
+        table.player_action("Carol", 'check')
+        self.assertEqual(len(table.deal_flop()), 3)
+        self.assertEqual(table.deal_turn(), ("Betting round still open", 400))
+        for deal in (table.deal_turn, table.deal_river):
+            for name in ("Bob", "Carol", "Alice"):
+                table.player_action(name, 'check')
+            deal()
+        self.assertEqual(table.showdown(), ("Betting round still open", 400))
+        self.assertEqual(table.player_action("Bob", 'bet', 20), ("Bob bet 20", 200))
+        table.player_action("Carol", 'fold')
+        self.assertEqual(table.showdown(), ("Betting round still open", 400))
+        table.player_action("Alice", 'call')
+        result = table.showdown()
+        self.assertTrue(set(result.winners) <= {alice, bob})
+        self.assertEqual(table.current_phase, "finished")
+        self.assertEqual(table.showdown(), ("Invalid game phase", 400))
+        self.assertEqual(sum(player.in_game_chips for player in (alice, bob, carol)), 300)
+
+    def test_river_route_only_deals(self):
+        from app import app, poker_game
+        table = poker_game.create_table("River Route", min_buy_in=50, max_buy_in=500)
+        table.set_blinds(small_blind=10, big_blind=20)
+        for seat, name in enumerate(("River Alice", "River Bob")):
+            player = poker_game.create_player(name, 1000)
+            player.join_table(table)
+            player.sit_down(table, seat=seat, buy_in=100)
+        table.create_deck()
+        table.set_dealer_position(0)
+        table.collect_blinds()
+        table.deal_cards(2)
+        client = app.test_client()
+        body = {'table_name': "River Route"}
+        self.assertEqual(client.post('/community/flop', json=body).status_code, 400)
+        table.player_action("River Alice", 'call')
+        table.player_action("River Bob", 'check')
+        for street in ('flop', 'turn'):
+            client.post(f'/community/{street}', json=body)
+            table.player_action("River Bob", 'check')
+            table.player_action("River Alice", 'check')
+        response = client.post('/community/river', json=body)
+        self.assertEqual(len(response.get_json()), 5)
+        self.assertEqual(table.legal_actions()['to_act'], "River Bob")  # The river is bet like any street
+        self.assertEqual(client.post('/determine_winner', json=body).status_code, 400)
+        client.post('/bet', json={'table_name': "River Route", 'player': "River Bob", 'action': 'check'})
+        client.post('/bet', json={'table_name': "River Route", 'player': "River Alice", 'action': 'check'})
+        response = client.post('/determine_winner', json=body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['community']), 5)
+        self.assertEqual(client.post('/determine_winner', json=body).status_code, 400)
+        poker_game.delete_table("River Route")
+        for name in ("River Alice", "River Bob"):
+            poker_game.delete_player(name)
+
+    def test_short_all_in_does_not_reopen_betting(self):
+        table, (alice, bob, carol) = self._betting_table([("Alice", 200), ("Bob", 200), ("Carol", 65)])
+        self.assertEqual(table.player_action("Alice", 'raise', 50), ("Alice bet 50", 200))
+        self.assertEqual(table.player_action("Bob", 'call'), ("Bob called", 200))
+        # Carol's all-in is 15 over a 30 raise: Alice and Bob may only call the 15 or fold
+        self.assertEqual(table.player_action("Carol", 'all-in'), ("Carol went all-in", 200))
+        state = table.legal_actions()
+        self.assertEqual((state['to_act'], state['actions'], state['to_call']), ("Alice", ['fold', 'call'], 15))
+        self.assertEqual(table.player_action("Alice", 'raise', 60), ("Betting was not reopened: call or fold", 400))
+        self.assertEqual(table.player_action("Alice", 'call'), ("Alice called", 200))
+        self.assertEqual(table.player_action("Bob", 'call'), ("Bob called", 200))
+        self.assertIsNone(table.to_act)
+        self.assertEqual(table.pot, 195)
+
+        # A full-sized all-in does reopen it
+        table, _ = self._betting_table([("Alice", 200), ("Bob", 200), ("Carol", 85)])
+        table.player_action("Alice", 'raise', 50)
+        table.player_action("Bob", 'call')
+        table.player_action("Carol", 'all-in')
+        self.assertIn('raise', table.legal_actions()['actions'])
+        self.assertEqual(table.player_action("Alice", 'raise', 100), ("Alice bet 100", 200))
+
+    def test_leaving_mid_hand_folds_the_seat(self):
+        table, (alice, bob, carol) = self._betting_table([("Alice", 100), ("Bob", 100), ("Carol", 100)])
+        # Bob leaves out of turn: his small blind stays in the pot and the hand plays on without him
+        self.assertEqual(bob.stand_up(table), ("Player stood up", 200))
+        self.assertEqual((bob.in_game_chips, bob.bankroll), (0, 990))
+        self.assertEqual(table.player_action("Alice", 'call'), ("Alice called", 200))
+        self.assertEqual(table.player_action("Carol", 'check'), ("Carol checked", 200))
+        self.assertEqual(table.pot, 50)
+        for deal in (table.deal_flop, table.deal_turn, table.deal_river):
+            deal()
+            table.player_action("Carol", 'check')
+            table.player_action("Alice", 'check')
+        result = table.showdown()
+        self.assertTrue(set(result.winners) <= {alice, carol})
+        self.assertEqual(alice.in_game_chips + carol.in_game_chips, 210)
+        self.assertTrue(table.chips_conserved())
+
+        # The player to act is removed: the turn passes on, and the last player left takes the pot
+        table, (alice, bob, carol) = self._betting_table([("Alice", 100), ("Bob", 100), ("Carol", 100)])
+        table.player_action("Alice", 'raise', 40)
+        table.remove_player(bob)
+        self.assertEqual(table.legal_actions()['to_act'], "Carol")
+        self.assertEqual(table.player_action("Carol", 'fold'), ("Carol folded", 200))
+        self.assertEqual(table.current_phase, "finished")
+        self.assertEqual(alice.in_game_chips, 130)
+
+    def test_all_in_side_pot(self):
+        table, (alice, bob, carol) = self._betting_table([("Alice", 50), ("Bob", 200), ("Carol", 200)])
+        self.assertEqual(table.player_action("Alice", 'all-in'), ("Alice went all-in", 200))
+        self.assertEqual(table.player_action("Bob", 'raise', 140)[1], 200)
+        self.assertEqual(table.player_action("Carol", 'call'), ("Carol called", 200))
+        self.assertEqual(table.player_action("Alice", 'check'), ("No betting round in progress", 400))
+        table.deal_flop()
+        table.deal_turn()
+        table.deal_river()
+        table.community_cards = ['2C', '7D', '9H', 'JS', '4C']
+        alice.hand, bob.hand, carol.hand = ['AS', 'AD'], ['KS', 'KD'], ['QS', 'QD']
+        result = table.determine_winner()
+        self.assertEqual(result.winners, [alice])
+        self.assertEqual(result.payouts, {"Alice": 150, "Bob": 200})
+        self.assertEqual((alice.in_game_chips, bob.in_game_chips, carol.in_game_chips), (150, 250, 50))
+
+    def test_seat_ring_rotation_and_blinds(self):
+        table = Table(name="Test Table", min_buy_in=50, max_buy_in=500)
+        table.set_blinds(small_blind=10, big_blind=20)
+        players = {}
+        for seat, name in ((0, "Alice"), (3, "Bob"), (5, "Carol")):
+            players[name] = Player(name=name, bankroll=1000)
+            players[name].join_table(table)
+            players[name].sit_down(table, seat=seat, buy_in=100)
+        players["Bob"].sit_out(table)
+        table.next_dealer()
+        self.assertEqual(table.dealer_position, 0)
+        table.next_dealer()
+        self.assertEqual(table.dealer_position, 5)
+        table.next_dealer()
+        self.assertEqual(table.dealer_position, 0)
+        table.collect_blinds()  # Heads-up: the dealer posts the small blind
+        self.assertEqual((players["Alice"].in_game_chips, players["Carol"].in_game_chips), (90, 80))
+
+        players["Bob"].rejoin_game(table)
+        table.create_deck()
+        table.collect_blinds()
+        self.assertEqual((players["Bob"].bet, players["Carol"].bet), (10, 20))
+        hands = table.deal_cards(3)
+        self.assertEqual(list(hands), ["Bob", "Carol", "Alice"])
+        self.assertEqual(table.legal_actions()['to_act'], "Alice")
+
+        players["Carol"].stand_up(table)
+        self.assertIsNone(table.seats[5])
+        table.next_dealer()
+        self.assertEqual(table.dealer_position, 3)
+
+    def test_metrics_endpoint(self):
+        import metrics
+        from app import app
+        metrics.registry.reset()
+        client = app.test_client()
+        client.post('/create_table', json={'name': "Metrics Table"})
+        Table(name="Timed").evaluate_hand(['AH', 'KH', 'QH', 'JH', 'TH'])
+        text = client.get('/metrics').get_data(as_text=True)
+        self.assertIn('poker_requests_total{route="/create_table",method="POST",status="200"} 1', text)
+        self.assertIn('poker_request_duration_seconds_count{route="/create_table",method="POST"} 1', text)
+        self.assertIn('poker_request_duration_seconds_bucket{route="/create_table",method="POST",le="+Inf"} 1', text)
+        if metrics.ENABLED:
+            self.assertIn('poker_function_duration_seconds_count{function="evaluate_hand"} 1', text)
+        self.assertIn('# TYPE poker_strength_cache_hit_ratio gauge', text)
+
+    def test_log_sampling_holds_across_threads(self):
+        import logging
+        import threading
+        from metrics import SampledFilter
+        sampler = SampledFilter(10)
+        record = logging.LogRecord('poker.requests', logging.INFO, __file__, 0, "request", None, None)
+        passed = []
+
+        def log_requests():
+            passed.append(sum(sampler.filter(record) for _ in range(5000)))
+        threads = [threading.Thread(target=log_requests) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((sampler.seen, sum(passed)), (40000, 4000))
+
+    def test_poker_package_imports_no_app_modules(self):
+        import os
+        import subprocess
+        import sys
+        # Importing the game core must not pull in the app's metrics (or its log filter) or Flask
+        code = "import sys, poker; print(sorted({'metrics', 'flask', 'app'} & set(sys.modules)))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_profiler_labels_table_stacks(self):
+        import threading
+        from profiler import StackSampler
+        table = Table(name="Hot Table")
+        done = threading.Event()
+
+        def busy():
+            while not done.is_set():
+                table.evaluate_hand(['AH', 'KH', 'QH', 'JH', '9S'])
+        worker = threading.Thread(target=busy)
+        worker.start()
+        try:
+            sampler = StackSampler(interval=0.002, labelled_class=Table)
+            stacks = sampler.profile(0.2)
+        finally:
+            done.set()
+            worker.join()
+        self.assertGreater(sampler.samples, 0)
+        self.assertTrue(any(stack.startswith("table:Hot Table;") for stack in stacks))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in sampler.collapsed().splitlines()))
+
 if __name__ == "__main__":
     unittest.main()